@@ -1,5 +1,6 @@
 import { Link, useLocation, useNavigate } from 'react-router-dom';
 import { logout } from '../auth';
+import api from '../services/api';
 
 const links = [
   { to: '/dashboard', label: '📊 Dashboard' },
@@ -14,7 +15,12 @@ export default function Sidebar() {
   const location = useLocation();
   const navigate = useNavigate();
 
-  const handleLogout = () => {
+  const handleLogout = async () => {
+    try {
+      await api.post('/logout/');   // ακυρώνει το token και στον server
+    } catch (err) {
+      console.error('Σφάλμα αποσύνδεσης:', err);
+    }
     logout();                 // 🔐 Καθαρίζει το token
     navigate('/');            // ⏩ Redirect στο login
   };
@@ -4,11 +4,21 @@ import { useParams } from 'react-router-dom';
 import * as XLSX from 'xlsx';
 import api from '../services/api';
 
+// Η καρτέλα έρχεται σε σελίδες (χρονολογικά, από την παλαιότερη κίνηση)· φορτώνονται
+// διαδοχικά έως STATEMENT_MAX_PAGES σελίδες κάθε φορά και οι υπόλοιπες με "Περισσότερες"
+const STATEMENT_PAGE_SIZE = 500;
+const STATEMENT_MAX_PAGES = 10;
+
 export default function CustomerDetail() {
   const { id } = useParams();
   const [customer, setCustomer] = useState(null);
   const [orders, setOrders] = useState([]);
   const [payments, setPayments] = useState([]);
+  const [closingBalance, setClosingBalance] = useState(0);
+  const [entries, setEntries] = useState([]);
+  const [entryCount, setEntryCount] = useState(0);
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [expandedOrders, setExpandedOrders] = useState({});
   const [newPaymentAmounts, setNewPaymentAmounts] = useState({});
@@ -17,22 +27,56 @@ export default function CustomerDetail() {
     fetchData();
   }, [id]);
 
+  const fetchStatement = async (firstPage, previous) => {
+    // Ακολουθεί τις σελίδες μέχρι να φορτωθούν όλες οι κινήσεις (ή το όριο σελίδων)
+    const rows = [...previous];
+    let data = null;
+    let page = firstPage;
+    for (let fetched = 0; fetched < STATEMENT_MAX_PAGES; fetched += 1) {
+      const res = await api.get(`/customers/${id}/statement/`, {
+        params: { page, page_size: STATEMENT_PAGE_SIZE },
+      });
+      data = res.data;
+      rows.push(...data.results);
+      page += 1;
+      if (!data.results.length || rows.length >= data.count) break;
+    }
+
+    setEntries(rows);
+    setEntryCount(data.count);
+    setNextPage(rows.length < data.count ? page : null);
+    setOrders(rows
+      .filter((r) => r.type === 'order')
+      .map((r) => ({ id: r.id, date: r.date, total_amount: r.debit })));
+    setPayments(rows
+      .filter((r) => r.type === 'payment')
+      .map((r) => ({ id: r.id, order: r.order, date: r.date, amount: r.credit })));
+    setClosingBalance(parseFloat(data.closing_balance) || 0);
+  };
+
   const fetchData = async () => {
     try {
-      const [customerRes, ordersRes, paymentsRes] = await Promise.all([
-        api.get(`/customers/${id}/`),
-        api.get(`/orders/?customer=${id}`),
-        api.get(`/payments/?customer=${id}`),
-      ]);
+      // Η καρτέλα (παραγγελίες + πληρωμές με τρέχον υπόλοιπο) έρχεται από ένα endpoint
+      const customerRes = await api.get(`/customers/${id}/`);
       setCustomer(customerRes.data);
-      setOrders(ordersRes.data);
-      setPayments(paymentsRes.data);
+      await fetchStatement(1, []);
       setLoading(false);
     } catch (err) {
       console.error('Σφάλμα φόρτωσης δεδομένων:', err);
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      await fetchStatement(nextPage, entries);
+    } catch (err) {
+      console.error('Σφάλμα φόρτωσης κινήσεων:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const toggleExpand = (orderId) => {
     setExpandedOrders((prev) => ({
       ...prev,
@@ -73,14 +117,7 @@ export default function CustomerDetail() {
     return acc;
   }, {});
 
-  const totalOrders = orders.reduce((sum, o) => sum + (parseFloat(o.total_amount) || 0), 0);
-
-  const validOrderIds = new Set(orders.map(o => o.id));
-  const totalPayments = payments.reduce((sum, p) => {
-    return validOrderIds.has(p.order) ? sum + (parseFloat(p.amount) || 0) : sum;
-  }, 0);
-
-  const balance = totalOrders - totalPayments;
+  const balance = closingBalance;
 
   const formatBalance = (amount) => {
     if (amount > 0) return `${amount.toFixed(2)} € 🔴 (χρέος)`;
@@ -152,6 +189,21 @@ export default function CustomerDetail() {
         </div>
 
         <h3 className="text-lg font-semibold mt-6 mb-1">📋 Παραγγελίες & Πληρωμές</h3>
+        {nextPage && (
+          <div className="flex justify-between items-center bg-yellow-50 border border-yellow-300 text-sm p-2 mb-2 no-print">
+            <span>
+              ⚠️ Εμφανίζονται οι {entries.length} παλαιότερες από {entryCount} κινήσεις· οι πληρωμές
+              και τα υπόλοιπα των παραγγελιών αφορούν μόνο όσες κινήσεις φορτώθηκαν.
+            </span>
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="bg-gray-200 px-3 py-1 rounded hover:bg-gray-300 disabled:opacity-50"
+            >
+              {loadingMore ? 'Φόρτωση...' : 'Περισσότερες'}
+            </button>
+          </div>
+        )}
         <table className="w-full text-sm border">
           <thead className="bg-gray-100 text-left">
             <tr>
@@ -3,41 +3,25 @@ import { Link } from 'react-router-dom';
 import api from '../services/api';
 
 export default function Dashboard() {
-  const [dailyOrders, setDailyOrders] = useState([]);
-  const [dailyPayments, setDailyPayments] = useState([]);
-  const [topItems, setTopItems] = useState([]);
-  const [topDebtors, setTopDebtors] = useState([]);
-  const [unpaidOrders, setUnpaidOrders] = useState([]);
-  const [loading, setLoading] = useState(true);
+  const [snapshot, setSnapshot] = useState(null);
 
   useEffect(() => {
     fetchDashboardData();
   }, []);
 
+  // Ένα request για όλη τη σελίδα· ο browser ξαναχρησιμοποιεί την απάντηση όσο ισχύει το ETag
   const fetchDashboardData = async () => {
     try {
-      const [ordersRes, paymentsRes, itemsRes, debtorsRes, unpaidRes] = await Promise.all([
-        api.get('/orders/today/'),
-        api.get('/payments/today/'),
-        api.get('/items/top_selling/'),
-        api.get('/dashboard/top_debtors/'),
-        api.get('/orders/?is_paid=false')
-      ]);
-
-      setDailyOrders(ordersRes.data);
-      setDailyPayments(paymentsRes.data);
-      setTopItems(Object.entries(itemsRes.data));
-      setTopDebtors(debtorsRes.data);
-      setUnpaidOrders(unpaidRes.data.slice(0, 5));
-      setLoading(false);
+      const res = await api.get('/dashboard/snapshot/');
+      setSnapshot(res.data);
     } catch (err) {
       console.error('Σφάλμα φόρτωσης dashboard:', err);
     }
   };
 
-  if (loading) return <p>Φόρτωση...</p>;
+  if (!snapshot) return <p>Φόρτωση...</p>;
 
-  const totalSales = dailyOrders.reduce((sum, o) => sum + (o.total_amount || 0), 0);
+  const { today, unpaid, top_items: topItems, top_debtors: topDebtors } = snapshot;
 
   return (
     <div className="p-6 space-y-6 max-w-7xl mx-auto">
@@ -54,24 +38,26 @@ export default function Dashboard() {
         <table className="w-full text-sm border">
           <thead className="bg-gray-100">
             <tr>
-              <th className="p-2 text-left">Πελάτης</th>
               <th className="p-2 text-left">Είδος</th>
-              <th className="p-2 text-right">Τιμή</th>
+              <th className="p-2 text-right">Ποσότητα</th>
+              <th className="p-2 text-right">Τζίρος</th>
             </tr>
           </thead>
           <tbody>
-            {dailyOrders.flatMap((order) =>
-              order.items.map((i, idx) => (
-                <tr key={`${order.id}-${idx}`} className="border-t">
-                  <td className="p-2">{order.customer_name}</td>
-                  <td className="p-2">{i.item.name}</td>
-                  <td className="p-2 text-right">{parseFloat(i.total_price).toFixed(2)} €</td>
-                </tr>
-              ))
-            )}
+            {today.items.map((i) => (
+              <tr key={i.name} className="border-t">
+                <td className="p-2">{i.name}</td>
+                <td className="p-2 text-right">{i.quantity}</td>
+                <td className="p-2 text-right">{parseFloat(i.total).toFixed(2)} €</td>
+              </tr>
+            ))}
           </tbody>
         </table>
-        <div className="mt-4 text-sm font-bold text-right">Σύνολο Ημέρας: {totalSales.toFixed(2)} €</div>
+        <div className="mt-4 text-sm text-right space-x-4">
+          <span>Παραγγελίες: {today.orders}</span>
+          <span>Πληρωμές: {today.payments} ({parseFloat(today.payments_total).toFixed(2)} €)</span>
+          <span className="font-bold">Σύνολο Ημέρας: {parseFloat(today.sales).toFixed(2)} €</span>
+        </div>
       </div>
 
       <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
@@ -85,10 +71,10 @@ export default function Dashboard() {
               </tr>
             </thead>
             <tbody>
-              {topItems.map(([name, qty]) => (
-                <tr key={name} className="border-t">
-                  <td className="p-2">{name}</td>
-                  <td className="p-2 text-right">{qty}</td>
+              {topItems.map((i) => (
+                <tr key={i.name} className="border-t">
+                  <td className="p-2">{i.name}</td>
+                  <td className="p-2 text-right">{i.sold}</td>
                 </tr>
               ))}
             </tbody>
@@ -117,7 +103,9 @@ export default function Dashboard() {
       </div>
 
       <div className="bg-white rounded shadow p-4">
-        <h3 className="font-semibold text-lg mb-2">🕒 Πρόσφατες Ανεξόφλητες Παραγγελίες</h3>
+        <h3 className="font-semibold text-lg mb-2">
+          🕒 Πρόσφατες Ανεξόφλητες Παραγγελίες ({unpaid.orders}, {parseFloat(unpaid.amount).toFixed(2)} €)
+        </h3>
         <table className="w-full text-sm border">
           <thead className="bg-gray-100">
             <tr>
@@ -128,10 +116,10 @@ export default function Dashboard() {
             </tr>
           </thead>
           <tbody>
-            {unpaidOrders.map((o) => (
+            {unpaid.recent.map((o) => (
               <tr key={o.id} className="border-t">
                 <td className="p-2">{o.date}</td>
-                <td className="p-2">{o.customer_name}</td>
+                <td className="p-2">{o.customer}</td>
                 <td className="p-2 text-right">{parseFloat(o.total_amount).toFixed(2)} €</td>
                 <td className="p-2 text-right">{parseFloat(o.remaining_amount).toFixed(2)} €</td>
               </tr>
@@ -1,35 +1,35 @@
-import { useEffect, useState } from 'react';
+import { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
-import Select from 'react-select';
+import AsyncSelect from 'react-select/async';
 import api from '../services/api';
 
 export default function OrderCreate() {
-  const [customers, setCustomers] = useState([]);
-  const [items, setItems] = useState([]);
   const [selectedCustomer, setSelectedCustomer] = useState(null);
   const [orderItems, setOrderItems] = useState([]);
   const navigate = useNavigate();
 
-  useEffect(() => {
-    fetchCustomers();
-    fetchItems();
-  }, []);
-
-  const fetchCustomers = async () => {
+  // Οι επιλογές έρχονται από τα autocomplete endpoints καθώς πληκτρολογεί ο χρήστης
+  const loadCustomers = async (input) => {
     try {
-      const res = await api.get('/customers/');
-      setCustomers(res.data);
+      const res = await api.get('/customers/autocomplete/', { params: { q: input } });
+      return res.data.map((c) => ({ value: c.id, label: c.label }));
     } catch (err) {
       console.error('Σφάλμα φόρτωσης πελατών:', err);
+      return [];
     }
   };
 
-  const fetchItems = async () => {
+  const loadItems = async (input) => {
     try {
-      const res = await api.get('/items/');
-      setItems(res.data);
+      const res = await api.get('/items/autocomplete/', { params: { q: input } });
+      return res.data.map((item) => ({
+        value: item.id,
+        label: `${item.label} (${parseFloat(item.price).toFixed(2)} €)`,
+        price: parseFloat(item.price),
+      }));
     } catch (err) {
       console.error('Σφάλμα φόρτωσης ειδών:', err);
+      return [];
     }
   };
 
@@ -81,7 +81,7 @@ export default function OrderCreate() {
   };
 
   const totalAmount = orderItems.reduce((sum, i) => {
-    const price = items.find(it => it.id === i.item?.value)?.price || 0;
+    const price = i.item?.price || 0;
     return sum + price * (i.quantity || 0);
   }, 0);
 
@@ -92,14 +92,12 @@ export default function OrderCreate() {
       <form onSubmit={handleSubmit} className="space-y-6">
         <div>
           <label className="block mb-1 font-semibold">Πελάτης</label>
-          <Select
-            options={customers.map((c) => ({
-              value: c.id,
-              label: `${c.first_name} ${c.last_name}`,
-            }))}
+          <AsyncSelect
+            loadOptions={loadCustomers}
+            cacheOptions
             value={selectedCustomer}
             onChange={setSelectedCustomer}
-            placeholder="Επιλέξτε πελάτη..."
+            placeholder="Πληκτρολογήστε όνομα, τηλέφωνο ή ΑΦΜ..."
             className="text-sm"
           />
         </div>
@@ -108,12 +106,10 @@ export default function OrderCreate() {
           <label className="block font-semibold">Είδη</label>
           {orderItems.map((i, index) => (
             <div key={index} className="flex gap-2 items-center">
-              <Select
+              <AsyncSelect
                 className="w-full"
-                options={items.map((item) => ({
-                  value: item.id,
-                  label: `${item.name} (${parseFloat(item.price).toFixed(2)} €)`,
-                }))}
+                loadOptions={loadItems}
+                cacheOptions
                 value={i.item}
                 onChange={(selected) => updateItem(index, 'item', selected)}
                 placeholder="Επιλογή είδους"
@@ -17,28 +17,29 @@ export default function OrderDetail() {
 
   useEffect(() => {
     fetchOrder();
-    fetchPayments();
   }, [id]);
 
+  // Παραγγελία και πληρωμές σε ένα request μέσω του /batch/
   const fetchOrder = async () => {
     try {
-      const res = await api.get(`/orders/${id}/`);
-      setOrder(res.data);
-      fetchTotalCustomerDebt(res.data.customer_id);
+      const res = await api.post('/batch/', {
+        requests: [
+          { id: 'order', path: `orders/${id}/` },
+          { id: 'payments', path: 'payments/', params: { order: id } },
+        ],
+      });
+      const [orderRes, paymentsRes] = res.data.responses;
+      if (orderRes.status !== 200) {
+        throw new Error(`HTTP ${orderRes.status}`);
+      }
+      setOrder(orderRes.body);
+      setPayments(paymentsRes.status === 200 ? paymentsRes.body : []);
+      fetchTotalCustomerDebt(orderRes.body.customer_id);
     } catch (err) {
       console.error('Σφάλμα φόρτωσης παραγγελίας:', err);
     }
   };
 
-  const fetchPayments = async () => {
-    try {
-      const res = await api.get(`/payments/?order=${id}`);
-      setPayments(res.data);
-    } catch (err) {
-      console.error('Σφάλμα φόρτωσης πληρωμών:', err);
-    }
-  };
-
   const fetchTotalCustomerDebt = async (customerId) => {
     try {
       const res = await api.get(`/customers/${customerId}/debt/`);
@@ -62,7 +63,6 @@ export default function OrderDetail() {
       });
       setNewPayment('');
       fetchOrder();
-      fetchPayments();
     } catch (err) {
       console.error('Σφάλμα πληρωμής:', err);
     }
@@ -134,7 +134,7 @@ export default function OrderDetail() {
                 <td className="p-2">{i.item.name}</td>
                 <td className="p-2">{i.quantity}</td>
                 <td className="p-2">
-                  {(parseFloat(i.price || i.item?.price || 0)).toFixed(2)}
+                  {(parseFloat(i.unit_price || i.item?.price || 0)).toFixed(2)}
                 </td>
               </tr>
             ))}
@@ -1,20 +1,24 @@
 import { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
-import api from '../services/api';
+import { fetchPage } from '../services/api';
 
 export default function Orders() {
   const [orders, setOrders] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [search, setSearch] = useState('');
   const [paymentStatus, setPaymentStatus] = useState('');
 
   useEffect(() => {
     fetchOrders();
-  }, []);
+  }, [paymentStatus]);
 
-  const fetchOrders = async () => {
+  // Σελίδες των νεότερων παραγγελιών· η κατάσταση πληρωμής φιλτράρεται στον server
+  const fetchOrders = async (cursor = null) => {
     try {
-      const res = await api.get('/orders/');
-      setOrders(res.data);
+      const params = paymentStatus ? { is_paid: paymentStatus === 'paid' } : {};
+      const { rows, next } = await fetchPage('/orders/', { cursor, params });
+      setOrders((prev) => (cursor ? [...prev, ...rows] : rows));
+      setNextCursor(next);
     } catch (err) {
       console.error('Σφάλμα φόρτωσης παραγγελιών:', err);
     }
@@ -24,16 +28,7 @@ export default function Orders() {
     const query = search.toLowerCase();
     const name = o.customer_name?.toLowerCase() || '';
     const date = o.date || '';
-    const statusMatch =
-      paymentStatus === ''
-        ? true
-        : paymentStatus === 'paid'
-        ? o.is_paid
-        : !o.is_paid;
-
-    return (
-      (name.includes(query) || date.includes(query)) && statusMatch
-    );
+    return name.includes(query) || date.includes(query);
   });
 
   return (
@@ -114,6 +109,14 @@ export default function Orders() {
           </tbody>
         </table>
       </div>
+
+      {nextCursor && (
+        <div className="text-center">
+          <button onClick={() => fetchOrders(nextCursor)} className="bg-gray-200 px-4 py-2 rounded hover:bg-gray-300">
+            Περισσότερες παραγγελίες
+          </button>
+        </div>
+      )}
     </div>
   );
 }
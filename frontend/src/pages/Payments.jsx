@@ -1,20 +1,23 @@
 import { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
 import * as XLSX from 'xlsx';
-import api from '../services/api';
+import { fetchPage } from '../services/api';
 
 export default function Payments() {
   const [payments, setPayments] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
 
   useEffect(() => {
     fetchPayments();
   }, []);
 
-  const fetchPayments = async () => {
+  // Σελίδες των νεότερων πληρωμών· η αναζήτηση και το σύνολο αφορούν όσες έχουν φορτωθεί
+  const fetchPayments = async (cursor = null) => {
     try {
-      const res = await api.get('/payments/');
-      setPayments(res.data);
+      const { rows, next } = await fetchPage('/payments/', { cursor });
+      setPayments((prev) => (cursor ? [...prev, ...rows] : rows));
+      setNextCursor(next);
     } catch (err) {
       console.error('Σφάλμα φόρτωσης πληρωμών:', err);
     }
@@ -97,8 +100,17 @@ export default function Payments() {
           </tbody>
         </table>
 
-        <div className="text-right text-lg font-bold mt-4">
-          Σύνολο: {total.toFixed(2)} €
+        <div className="flex justify-between items-center mt-4">
+          <div>
+            {nextCursor && (
+              <button onClick={() => fetchPayments(nextCursor)} className="bg-gray-200 px-3 py-1 rounded hover:bg-gray-300 no-print">
+                Περισσότερες πληρωμές
+              </button>
+            )}
+          </div>
+          <div className="text-lg font-bold">
+            Σύνολο{nextCursor ? ' (φορτωμένων)' : ''}: {total.toFixed(2)} €
+          </div>
         </div>
       </div>
     </div>
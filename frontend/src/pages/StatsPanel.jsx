@@ -12,7 +12,7 @@ export default function StatsPanel() {
   const [startDate, setStartDate] = useState('');
   const [endDate, setEndDate] = useState('');
   const [categoryFilter, setCategoryFilter] = useState('');
-  const [orders, setOrders] = useState([]);
+  const [stats, setStats] = useState({ series: [], items: [] });
   const [loading, setLoading] = useState(false);
 
   useEffect(() => {
@@ -41,8 +41,10 @@ export default function StatsPanel() {
       }
 
       if (gte && lte) {
-        res = await api.get(`/orders/?date__gte=${gte}&date__lte=${lte}`);
-        setOrders(res.data);
+        // Τα σύνολα υπολογίζονται στον server· για το έτος ομαδοποίηση ανά μήνα
+        const bucket = periodType === 'year' ? 'month' : 'day';
+        res = await api.get(`/dashboard/stats/?from=${gte}&to=${lte}&bucket=${bucket}`);
+        setStats(res.data);
       }
     } catch (err) {
       console.error('Σφάλμα φόρτωσης στατιστικών:', err);
@@ -52,30 +54,15 @@ export default function StatsPanel() {
   };
 
   const groupByItemDetailed = () => {
-    const stats = {};
-    for (const order of orders) {
-      for (const i of order.items || []) {
-        const name = i.item.name;
-        const category = i.item.category || '';
-        if (categoryFilter && category !== categoryFilter) continue;
-        const quantity = i.quantity;
-        const price = parseFloat(i.price || i.item?.price || 0);
-        if (!stats[name]) {
-          stats[name] = { quantity: 0, total: 0 };
-        }
-        stats[name].quantity += quantity;
-        stats[name].total += quantity * price;
-      }
-    }
-    return Object.entries(stats);
+    return stats.items
+      .filter((i) => !categoryFilter || i.category === categoryFilter)
+      .map((i) => [i.name, { quantity: i.quantity, total: parseFloat(i.total) }]);
   };
 
   const getAllCategories = () => {
     const categories = new Set();
-    for (const order of orders) {
-      for (const i of order.items || []) {
-        if (i.item.category) categories.add(i.item.category);
-      }
+    for (const i of stats.items) {
+      if (i.category) categories.add(i.category);
     }
     return Array.from(categories);
   };
@@ -174,6 +161,30 @@ export default function StatsPanel() {
               ))}
             </tbody>
           </table>
+
+          <h3 className="font-semibold text-lg mt-6 mb-4">📈 Ανά {stats.bucket === 'month' ? 'μήνα' : 'ημέρα'}</h3>
+          <table className="w-full text-sm border">
+            <thead className="bg-gray-100">
+              <tr>
+                <th className="p-2 text-left">Περίοδος</th>
+                <th className="p-2 text-right">Παραγγελίες</th>
+                <th className="p-2 text-right">Πωλήσεις (€)</th>
+                <th className="p-2 text-right">Μέση αξία (€)</th>
+                <th className="p-2 text-right">Πληρωμές (€)</th>
+              </tr>
+            </thead>
+            <tbody>
+              {stats.series.map((row) => (
+                <tr key={row.period} className="border-t">
+                  <td className="p-2">{row.period}</td>
+                  <td className="p-2 text-right">{row.orders}</td>
+                  <td className="p-2 text-right">{parseFloat(row.sales).toFixed(2)}</td>
+                  <td className="p-2 text-right">{parseFloat(row.average_order).toFixed(2)}</td>
+                  <td className="p-2 text-right">{parseFloat(row.payments).toFixed(2)}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
         </div>
       )}
     </div>
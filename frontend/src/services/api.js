@@ -15,3 +15,16 @@ api.interceptors.request.use((config) => {
 });
 
 export default api;
+
+// Σελίδα λίστας με keyset pagination (?page_size=&cursor=): επιστρέφει τις γραμμές και τον
+// cursor της επόμενης σελίδας (null στο τέλος). Κρατάμε μόνο τον cursor από το next, γιατί
+// το απόλυτο URL του backend δεν περιέχει το prefix του proxy
+export const PAGE_SIZE = 100;
+
+export async function fetchPage(path, { cursor, params } = {}) {
+  const res = await api.get(path, {
+    params: { ...params, page_size: PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+  });
+  const next = res.data.next ? new URL(res.data.next).searchParams.get('cursor') : null;
+  return { rows: res.data.results, next };
+}
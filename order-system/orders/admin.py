@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.db import router
-from .models import Customer, Item, Order, OrderItem, Payment
+from .models import Customer, Item, Order, OrderItem, Payment, ReportJob
 from .views import CustomerViewSet, ItemViewSet, OrderViewSet, OrderItemViewSet, PaymentViewSet
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
@@ -10,4 +10,5 @@ admin.site.register(Item)
 admin.site.register(Order)
 admin.site.register(OrderItem)
 admin.site.register(Payment)
+admin.site.register(ReportJob)
 
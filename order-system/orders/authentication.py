@@ -0,0 +1,60 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .cache import record_outcome
+
+STATS_NAME = 'auth.token'
+
+# Μόνο σε cache κοινή για όλους τους workers: όταν ένα token ανακαλείται (logout, rotate,
+# αλλαγή κωδικού) το κλειδί πρέπει να σβήνεται για όλους, όχι μόνο για το τρέχον process
+# όπως στη locmem. Η file/db cache εξάλλου δεν είναι γρηγορότερη από το query του token.
+SHARED_CACHE_BACKENDS = (RedisCache, BaseMemcachedCache)
+
+
+def token_cache_enabled():
+    return bool(settings.AUTH_TOKEN_CACHE_TTL) and isinstance(caches[DEFAULT_CACHE_ALIAS], SHARED_CACHE_BACKENDS)
+
+
+def token_cache_key(key):
+    # hash ώστε το ίδιο το token να μη γράφεται στην cache ως κλειδί
+    return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def forget_tokens(keys):
+    if not token_cache_enabled():
+        return
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+def forget_user_tokens(user_id):
+    forget_tokens(Token.objects.filter(user_id=user_id).values_list('key', flat=True))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication που κρατά το (user, token) στην cache για AUTH_TOKEN_CACHE_TTL δευτερόλεπτα.
+
+    Τα κλειδιά σβήνονται όταν αλλάζει/διαγράφεται το token ή ο χρήστης
+    (βλ. orders/signals.py), οπότε το TTL είναι μόνο το ανώτατο όριο. Χωρίς
+    Redis/Memcached (SHARED_CACHE_BACKENDS) λειτουργεί όπως το TokenAuthentication.
+    """
+
+    def authenticate_credentials(self, key):
+        if not token_cache_enabled():
+            return super().authenticate_credentials(key)
+
+        cache_key = token_cache_key(key)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            record_outcome(STATS_NAME, 'hits')
+            return cached
+
+        record_outcome(STATS_NAME, 'misses')
+        user, token = super().authenticate_credentials(key)
+        cache.set(cache_key, (user, token), settings.AUTH_TOKEN_CACHE_TTL)
+        return user, token
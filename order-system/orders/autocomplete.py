@@ -0,0 +1,86 @@
+from itertools import islice
+
+from django.db import connection
+
+from .models import AutocompleteTerm, Customer, Item, SearchDocument
+from .search import normalize
+
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+
+def _terms(*values):
+    terms = []
+    for value in values:
+        term = normalize(value).strip()[:255]
+        if term and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def customer_terms(customer):
+    first_name, last_name = customer.first_name, customer.last_name
+    return _terms(
+        first_name, last_name,
+        f"{first_name} {last_name}", f"{last_name} {first_name}",
+        customer.phone, customer.tax_id,
+    )
+
+
+def item_terms(item):
+    # όλο το όνομα και κάθε λέξη του, ώστε το "γαλα" να βρίσκει και το "φρεσκο γαλα"
+    return _terms(item.name, *item.name.split())
+
+
+def replace_terms(kind, objects, terms_for, label_for, price_for=lambda obj: None):
+    objects = list(objects)
+    AutocompleteTerm.objects.filter(kind=kind, object_id__in=[obj.pk for obj in objects]).delete()
+    AutocompleteTerm.objects.bulk_create([
+        AutocompleteTerm(kind=kind, object_id=obj.pk, term=term, label=label_for(obj)[:255], price=price_for(obj))
+        for obj in objects
+        for term in terms_for(obj)
+    ], batch_size=1000)
+
+
+def index_customers(customers):
+    replace_terms(SearchDocument.CUSTOMER, customers, customer_terms,
+                  lambda c: f"{c.first_name} {c.last_name}")
+
+
+def index_items(items):
+    replace_terms(SearchDocument.ITEM, items, item_terms, lambda i: i.name, lambda i: i.price)
+
+
+def remove_terms(kind, ids):
+    AutocompleteTerm.objects.filter(kind=kind, object_id__in=ids).delete()
+
+
+def autocomplete(kind, query, limit=10):
+    """Τα πρώτα `limit` αντικείμενα με όρο που ξεκινά από το query (χωρίς τόνους/πεζά-κεφαλαία).
+
+    Διαβάζει μόνο τις στήλες του covering index (kind, term, object_id, label, price).
+    """
+    prefix = normalize(query).strip()
+    if not prefix:
+        return []
+    terms = AutocompleteTerm.objects.filter(kind=kind)
+    if connection.vendor == 'sqlite':
+        # το LIKE του SQLite δεν χρησιμοποιεί index με παραμέτρους· εύρος τιμών ισοδυναμεί με πρόθεμα
+        terms = terms.filter(term__gte=prefix, term__lt=prefix + '\U0010ffff')
+    else:
+        # PostgreSQL: LIKE 'πρόθεμα%' πάνω στο index με varchar_pattern_ops
+        terms = terms.filter(term__startswith=prefix)
+    rows = (
+        terms.values('object_id', 'label', 'price')
+        .distinct()
+        .order_by('label', 'object_id')[:min(limit, AUTOCOMPLETE_MAX_LIMIT)]
+    )
+    return list(rows)
+
+
+def rebuild_terms(batch_size=2000):
+    AutocompleteTerm.objects.all().delete()
+    for queryset, index in ((Customer.objects.all(), index_customers), (Item.objects.all(), index_items)):
+        objects = queryset.iterator(chunk_size=batch_size)
+        while batch := list(islice(objects, batch_size)):
+            index(batch)
+    return AutocompleteTerm.objects.count()
@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (Case, DecimalField, OuterRef, QuerySet,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from .models import Order, OrderItem, Payment
+
+MONEY = DecimalField(max_digits=10, decimal_places=2)
+
+
+def items_total_expression():
+    lines = (
+        OrderItem.objects.filter(order=OuterRef('pk'))
+        .values('order')
+        .annotate(s=Sum('line_total', output_field=MONEY))
+        .values('s')
+    )
+    return Coalesce(Subquery(lines, output_field=MONEY), Value(Decimal('0')), output_field=MONEY)
+
+
+def payments_total_expression():
+    payments = (
+        Payment.objects.filter(order=OuterRef('pk'))
+        .values('order')
+        .annotate(s=Sum('amount'))
+        .values('s')
+    )
+    return Coalesce(Subquery(payments, output_field=MONEY), Value(Decimal('0')), output_field=MONEY)
+
+
+def refresh_order_balances(orders):
+    """Ξαναϋπολογίζει total/paid/remaining/is_paid με ένα UPDATE.
+
+    Δέχεται queryset παραγγελιών ή λίστα με ids. Οι παραγγελίες κλειδώνονται
+    πρώτα με ξεχωριστό SELECT ... FOR UPDATE: σε READ COMMITTED το UPDATE που
+    ακολουθεί παίρνει νέο snapshot και βλέπει και τις γραμμές/πληρωμές που
+    έγραψε μια ταυτόχρονη συναλλαγή πριν αφήσει το κλείδωμα.
+    """
+    if not isinstance(orders, QuerySet):
+        ids = {pk for pk in orders if pk is not None}
+        if not ids:
+            return 0
+        orders = Order.objects.filter(pk__in=ids)
+
+    total = items_total_expression()
+    paid = payments_total_expression()
+    with transaction.atomic():
+        # σταθερή σειρά κλειδώματος ώστε δύο συναλλαγές να μην κάνουν deadlock
+        list(orders.select_for_update().order_by('pk').values_list('pk', flat=True))
+        return orders.update(
+            total=total,
+            paid=paid,
+            remaining=total - paid,
+            is_paid=Case(When(GreaterThan(total - paid, 0), then=Value(False)), default=Value(True)),
+            updated_at=timezone.now(),
+        )
@@ -0,0 +1,175 @@
+import json
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from .budgets import view_budget
+from .middleware import QueryStats, instrument_connections
+
+logger = logging.getLogger('orders.batch')
+
+API_PREFIX = '/api/'
+BATCH_VIEW_NAME = 'batch'
+# queries του ίδιου του batch (authentication) πέρα από τα όρια των επιμέρους views
+BATCH_QUERY_OVERHEAD = 1
+
+# Headers του αρχικού request που δεν αφορούν τα επιμέρους GET
+DROPPED_META = {
+    'CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_AUTHORIZATION', 'HTTP_COOKIE',
+    'HTTP_IF_MODIFIED_SINCE', 'HTTP_IF_NONE_MATCH', 'wsgi.input',
+}
+FORWARDED_HEADERS = ('Cache-Control', 'ETag', 'Last-Modified')
+
+
+class BatchError(Exception):
+    pass
+
+
+def parse_batch(data):
+    """Ελέγχει το σώμα του /api/batch/ και επιστρέφει λίστα (id, path, query string).
+
+    Κάθε αίτημα είναι είτε path ("orders/5/", "/api/payments/?order=5") είτε
+    αντικείμενο {"id", "path", "params"}. Χωρίς id χρησιμοποιείται η θέση του.
+    """
+    requests = data.get('requests') if isinstance(data, dict) else data
+    if not isinstance(requests, list) or not requests:
+        raise BatchError("Δώσε λίστα αιτημάτων στο πεδίο requests")
+    if len(requests) > settings.BATCH_MAX_REQUESTS:
+        raise BatchError(f"Έως {settings.BATCH_MAX_REQUESTS} αιτήματα ανά batch")
+
+    entries = []
+    for position, entry in enumerate(requests):
+        if isinstance(entry, str):
+            entry = {'path': entry}
+        if not isinstance(entry, dict) or not isinstance(entry.get('path'), str):
+            raise BatchError(f"Το αίτημα {position} δεν έχει path")
+        params = entry.get('params') or {}
+        if not isinstance(params, dict):
+            raise BatchError(f"Οι παράμετροι του αιτήματος {position} πρέπει να είναι αντικείμενο")
+
+        url = urlsplit(entry['path'])
+        path = url.path if url.path.startswith('/') else API_PREFIX + url.path
+        if not path.startswith(API_PREFIX):
+            raise BatchError(f"Το αίτημα {position} πρέπει να αφορά το {API_PREFIX}")
+        query = '&'.join(part for part in (url.query, urlencode(params, doseq=True)) if part)
+        entries.append((entry.get('id', position), path, query))
+    return entries
+
+
+def _sub_request(parent, path, query):
+    environ = {key: value for key, value in parent.META.items() if key not in DROPPED_META}
+    environ.update({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_LENGTH': '0',
+        'wsgi.input': BytesIO(),
+    })
+    request = WSGIRequest(environ)
+    # Ο χρήστης έχει ήδη πιστοποιηθεί από το batch request
+    request._force_auth_user = parent.user
+    request._force_auth_token = parent.auth
+    return request
+
+
+def _body(response):
+    if response.streaming or not response.content:
+        return None
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(response.content)
+    return None
+
+
+def _resolve(entry):
+    request_id, path, _ = entry
+    result = {"id": request_id, "path": path}
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None, {**result, "status": 404, "body": {"detail": "Δεν βρέθηκε"}}
+    if match.url_name == BATCH_VIEW_NAME:
+        return None, {**result, "status": 400, "body": {"detail": "Δεν επιτρέπεται batch μέσα σε batch"}}
+    return match, result
+
+
+def _execute(parent, entry, match, result):
+    _, path, query = entry
+    try:
+        response = match.func(_sub_request(parent, path, query), *match.args, **match.kwargs)
+        try:
+            if hasattr(response, 'render'):
+                response.render()
+            body = _body(response)
+        finally:
+            response.close()
+    except Exception:
+        logger.exception("Σφάλμα στο batch αίτημα %s", path)
+        return {**result, "status": 500, "body": {"detail": "Σφάλμα διακομιστή"}}
+
+    headers = {name: response[name] for name in FORWARDED_HEADERS if response.has_header(name)}
+    return {**result, "status": response.status_code, "headers": headers, "body": body}
+
+
+def _worker(parent, tasks, results, capture):
+    # Κάθε thread παίρνει αιτήματα από την κοινή ουρά με δικές του συνδέσεις και δικό του
+    # QueryStats· οι συνδέσεις κλείνουν μία φορά, όταν αδειάσει η ουρά
+    stats = QueryStats(capture=capture, keep=settings.SLOW_QUERY_COUNT)
+    try:
+        with instrument_connections(stats):
+            while True:
+                try:
+                    index, task = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                results[index] = _execute(parent, *task)
+    finally:
+        connections.close_all()
+    return stats
+
+
+def run_batch(parent, entries):
+    """Εκτελεί τα GET in-process, με τον χρήστη του batch, και επιστρέφει τα αποτελέσματα με τη σειρά τους.
+
+    Με BATCH_WORKERS > 1 τα αιτήματα τρέχουν παράλληλα σε threads, εκτός αν
+    υπάρχει ανοιχτή συναλλαγή (ATOMIC_REQUESTS, tests): τα threads έχουν δική
+    τους σύνδεση και δεν θα έβλεπαν τις αλλαγές της. Τα queries των threads
+    προστίθενται στο request.query_stats του batch και το όριο queries του
+    batch είναι το άθροισμα των ορίων των επιμέρους views.
+    """
+    resolved = [_resolve(entry) for entry in entries]
+    stats = getattr(parent, 'query_stats', None)
+    if stats is not None:
+        budgets = [view_budget(match.func, 'GET') or 0 for match, _ in resolved if match is not None]
+        parent._request.query_budget = BATCH_QUERY_OVERHEAD + sum(budgets)
+
+    results = [result for _, result in resolved]
+    tasks = queue.SimpleQueue()
+    pending = 0
+    for index, (entry, (match, result)) in enumerate(zip(entries, resolved)):
+        if match is not None:
+            tasks.put((index, (entry, match, result)))
+            pending += 1
+
+    workers = min(settings.BATCH_WORKERS, pending)
+    if workers <= 1 or any(connection.in_atomic_block for connection in connections.all()):
+        # στο thread του request, όπου μετράει ήδη το middleware
+        while not tasks.empty():
+            index, task = tasks.get()
+            results[index] = _execute(parent, *task)
+        return results
+
+    capture = bool(stats and stats.capture)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_worker, parent, tasks, results, capture) for _ in range(workers)]
+        for future in futures:
+            worker_stats = future.result()
+            if stats is not None:
+                stats.merge(worker_stats)
+    return results
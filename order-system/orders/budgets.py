@@ -0,0 +1,61 @@
+import json
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger('orders.performance')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(limit):
+    """Μέγιστο πλήθος queries για ένα action (ή function view), μαζί με το authentication.
+
+    Το όριο δεν πρέπει να εξαρτάται από το πλήθος των γραμμών: ένα N+1 το
+    ξεπερνά μόλις μεγαλώσουν τα δεδομένα. Για τα actions που κληρονομούνται
+    (list, retrieve) το όριο δηλώνεται στο query_budgets του viewset.
+    """
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def view_budget(view_func, method):
+    # Function view με @query_budget έξω από το @api_view
+    budget = getattr(view_func, 'query_budget', None)
+    view_class = getattr(view_func, 'cls', None)
+    if budget is not None or view_class is None:
+        return budget
+
+    actions = getattr(view_func, 'actions', None)
+    name = actions.get(method.lower()) if actions else method.lower()
+    if not name:
+        return None
+    budget = getattr(getattr(view_class, name, None), 'query_budget', None)
+    if budget is None:
+        budget = getattr(view_class, 'query_budgets', {}).get(name)
+    return budget
+
+
+def check_budget(request, response, stats):
+    budget = getattr(request, 'query_budget', None)
+    mode = settings.QUERY_BUDGET_MODE
+    if budget is None or mode == 'off' or stats.count <= budget:
+        return
+
+    view = getattr(getattr(request, 'resolver_match', None), 'view_name', None)
+    message = f"{request.method} {request.path} ({view}): {stats.count} queries, όριο {budget}"
+    if mode == 'raise':
+        raise QueryBudgetExceeded(message)
+    record = {
+        "method": request.method,
+        "path": request.path,
+        "status": response.status_code,
+        "view": view,
+        "queries": stats.count,
+        "budget": budget,
+    }
+    logger.warning(json.dumps(record, ensure_ascii=False), extra={"request_stats": record})
@@ -0,0 +1,112 @@
+from decimal import Decimal
+
+from django.db import transaction
+
+from .cache import bump_versions, month_topic
+from .models import Customer, Item, Order, OrderItem
+from .rollups import add_sales
+from .search import index_orders
+
+BULK_BATCH_SIZE = 1000
+
+
+def _parse_id(value):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def _parse_order(data):
+    # Έλεγχος μορφής μιας παραγγελίας χωρίς πρόσβαση στη βάση
+    errors = {}
+    if not isinstance(data, dict):
+        return None, {"non_field_errors": "Κάθε παραγγελία πρέπει να είναι αντικείμενο"}
+
+    customer_id = _parse_id(data.get('customer'))
+    if customer_id is None:
+        errors['customer'] = "Μη έγκυρος πελάτης"
+
+    lines = []
+    items = data.get('items', [])
+    if not isinstance(items, list):
+        errors['items'] = "Τα είδη πρέπει να είναι λίστα"
+        items = []
+    for position, line in enumerate(items):
+        line = line if isinstance(line, dict) else {}
+        item_id = _parse_id(line.get('item'))
+        quantity = _parse_id(line.get('quantity', 1))
+        if item_id is None or quantity is None:
+            errors.setdefault('items', {})[position] = "Μη έγκυρο είδος ή ποσότητα"
+            continue
+        lines.append((item_id, quantity))
+
+    if errors:
+        return None, errors
+    return (customer_id, lines), None
+
+
+def create_orders(payload, batch_size=BULK_BATCH_SIZE):
+    """Δημιουργεί πολλές παραγγελίες με έλεγχο σε σύνολα.
+
+    Πελάτες και είδη ελέγχονται με ένα IN query το καθένα, οι παραγγελίες και
+    οι γραμμές τους γράφονται με bulk_create σε μία συναλλαγή και τα σύνολα
+    υπολογίζονται πριν την εισαγωγή. Επιστρέφει μία εγγραφή αποτελέσματος ανά
+    παραγγελία του payload, με την ίδια σειρά.
+    """
+    results = [None] * len(payload)
+    parsed = []
+    for index, data in enumerate(payload):
+        order, errors = _parse_order(data)
+        if errors:
+            results[index] = {"index": index, "errors": errors}
+        else:
+            parsed.append((index, order))
+
+    customer_ids = {customer_id for _, (customer_id, _) in parsed}
+    item_ids = {item_id for _, (_, lines) in parsed for item_id, _ in lines}
+    existing_customers = set(Customer.objects.filter(id__in=customer_ids).values_list('id', flat=True))
+    prices = dict(Item.objects.filter(id__in=item_ids).values_list('id', 'price'))
+
+    valid = []
+    for index, (customer_id, lines) in parsed:
+        errors = {}
+        if customer_id not in existing_customers:
+            errors['customer'] = "Ο πελάτης δεν βρέθηκε"
+        missing = sorted({item_id for item_id, _ in lines if item_id not in prices})
+        if missing:
+            errors['items'] = f"Δεν βρέθηκαν τα είδη: {', '.join(map(str, missing))}"
+        if errors:
+            results[index] = {"index": index, "errors": errors}
+            continue
+
+        total = sum((prices[item_id] * quantity for item_id, quantity in lines), Decimal('0'))
+        order = Order(customer_id=customer_id, total=total, paid=0, remaining=total, is_paid=total <= 0)
+        valid.append((index, order, lines))
+
+    with transaction.atomic():
+        Order.objects.bulk_create([order for _, order, _ in valid], batch_size=batch_size)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, item_id=item_id, quantity=quantity, unit_price=prices[item_id])
+            for _, order, lines in valid
+            for item_id, quantity in lines
+        ], batch_size=batch_size)
+        # το bulk_create δεν στέλνει signals
+        topics = {'orders'}
+        if valid:
+            days = {order.date for _, order, _ in valid}
+            # προσθήκη των νέων γραμμών στα συγκεντρωτικά (όχι σβήσιμο και ξαναχτίσιμο,
+            # που θα συγκρουόταν με ένα ταυτόχρονο bulk στην ίδια ημέρα και είδος)
+            add_sales(
+                (order.date, order.pk, item_id, quantity, prices[item_id] * quantity)
+                for _, order, lines in valid
+                for item_id, quantity in lines
+            )
+            topics.update(month_topic(day) for day in days)
+            index_orders(Order.objects.filter(pk__in=[order.pk for _, order, _ in valid]))
+        transaction.on_commit(lambda: bump_versions(*topics))
+
+    for index, order, _ in valid:
+        results[index] = {"index": index, "id": order.id, "total_amount": order.total}
+    return results
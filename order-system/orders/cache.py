@@ -0,0 +1,132 @@
+import datetime
+import hashlib
+import secrets
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.base import BaseCache
+from django.utils.http import quote_etag
+from rest_framework.response import Response
+
+# Κάθε cached endpoint δηλώνει από ποια "θέματα" εξαρτάται· κάθε εγγραφή σε
+# σχετικό model αυξάνει την έκδοση του θέματος, οπότε τα παλιά κλειδιά δεν
+# ξαναδιαβάζονται ποτέ (απλώς λήγουν).
+TOPICS = ('orders', 'payments', 'customers', 'items')
+
+STATS_PREFIX = 'cache-stats'
+
+
+def _version_key(topic):
+    return f'data-version:{topic}'
+
+
+def topic_versions(topics):
+    keys = [_version_key(topic) for topic in topics]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    for key in missing:
+        # Αν χαθεί το κλειδί (eviction/restart) ξεκινάμε από μοναδική τιμή,
+        # ώστε να μη συμπέσει ποτέ με έκδοση που χρησιμοποιήθηκε ήδη
+        cache.add(key, time.time_ns(), None)
+    if missing:
+        versions.update(cache.get_many(missing))
+    return [str(versions.get(key, 0)) for key in keys]
+
+
+def bump_versions(*topics):
+    # Νέα μοναδική τιμή χωρίς λήξη αντί για incr: σε file/db backends το incr είναι get+set
+    # με το default TIMEOUT, οπότε το κλειδί θα έληγε μετά από λίγα λεπτά
+    version = f'{time.time_ns()}-{secrets.token_hex(4)}'
+    cache.set_many({_version_key(topic): version for topic in topics}, None)
+
+
+def _increment(key):
+    if cache.add(key, 1, None):
+        return
+    if type(caches[DEFAULT_CACHE_ALIAS]).incr is BaseCache.incr:
+        # μη ατομικό (file/db), αλλά κρατά το κλειδί χωρίς λήξη· αρκεί για στατιστικά
+        cache.set(key, (cache.get(key) or 0) + 1, None)
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def record_outcome(name, outcome):
+    _increment(f'{STATS_PREFIX}:{name}:{outcome}')
+
+
+def month_topic(day):
+    # Έκδοση ανά μήνα πωλήσεων: μια αλλαγή σε παλιά παραγγελία ακυρώνει μόνο τον μήνα της
+    return f'sales-{day:%Y-%m}'
+
+
+def response_cache_key(name, topics, request, daily=True):
+    params = sorted((key, value) for key in request.query_params for value in request.query_params.getlist(key))
+    digest = hashlib.sha256(repr(params).encode()).hexdigest()[:16]
+    today = [datetime.date.today().isoformat()] if daily else []
+    return ':'.join(['response', name, *today, *topic_versions(topics), digest])
+
+
+def response_etag(name, topics, request, daily=True):
+    # Το ETag αλλάζει όταν αλλάζει το κλειδί της cache, χωρίς να διαβαστεί η βάση
+    key = response_cache_key(name, topics, request, daily)
+    return quote_etag(hashlib.sha256(key.encode()).hexdigest()[:32])
+
+
+def cached_data(name, topics, request, compute, timeout=None, daily=True):
+    # Ίδια λογική με το cached_response, για views που επιλέγουν θέματα/διάρκεια ανά request
+    key = response_cache_key(name, topics, request, daily)
+    data = cache.get(key)
+    if data is not None:
+        record_outcome(name, 'hits')
+        return data
+
+    record_outcome(name, 'misses')
+    data = compute()
+    cache.set(key, data, timeout or settings.RESPONSE_CACHE_TIMEOUT)
+    return data
+
+
+def cached_response(name, topics, timeout=None):
+    """Αποθηκεύει στην cache το response.data ενός action.
+
+    Το κλειδί περιλαμβάνει τη σημερινή ημερομηνία, τις παραμέτρους του query
+    και τις εκδόσεις των θεμάτων από τα οποία εξαρτάται το endpoint.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            key = response_cache_key(name, topics, request)
+            data = cache.get(key)
+            if data is not None:
+                record_outcome(name, 'hits')
+                return Response(data)
+
+            record_outcome(name, 'misses')
+            response = view(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout or settings.RESPONSE_CACHE_TIMEOUT)
+            return response
+        wrapper.cache_name = name
+        return wrapper
+    return decorator
+
+
+def cache_stats(names):
+    keys = [f'{STATS_PREFIX}:{name}:{outcome}' for name in names for outcome in ('hits', 'misses')]
+    values = cache.get_many(keys)
+    stats = {}
+    for name in names:
+        hits = values.get(f'{STATS_PREFIX}:{name}:hits', 0)
+        misses = values.get(f'{STATS_PREFIX}:{name}:misses', 0)
+        total = hits + misses
+        stats[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 3) if total else None,
+        }
+    return stats
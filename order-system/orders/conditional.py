@@ -0,0 +1,64 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def validators(queryset, markers, request):
+    """ETag και Last-Modified ενός queryset με ένα aggregate: Max των markers και πλήθος γραμμών.
+
+    Το πλήθος καλύπτει τις διαγραφές (δεν αλλάζουν κανένα updated_at) και οι
+    παράμετροι του query μπαίνουν στο ETag, αφού αλλάζουν το περιεχόμενο. Απλό
+    COUNT (και Max που εξυπηρετείται από το index του updated_at) όταν οι markers
+    είναι πεδία του ίδιου πίνακα· DISTINCT μόνο όταν το join πολλαπλασιάζει γραμμές.
+    """
+    joined = any(LOOKUP_SEP in marker for marker in markers)
+    values = queryset.order_by().aggregate(
+        rows=Count('pk', distinct=joined),
+        **{f'marker_{position}': Max(marker) for position, marker in enumerate(markers)},
+    )
+    stamps = [values[f'marker_{position}'] for position in range(len(markers))]
+    params = sorted((key, value) for key in request.GET for value in request.GET.getlist(key))
+    seed = repr((values['rows'], [stamp and stamp.isoformat() for stamp in stamps], params))
+    etag = quote_etag(hashlib.sha256(seed.encode()).hexdigest()[:32])
+    last_modified = max((stamp for stamp in stamps if stamp), default=None)
+    return etag, last_modified
+
+
+class ConditionalRetrieveMixin:
+    """retrieve με ETag/Last-Modified: όταν ταιριάζουν οι validators απαντά 304 χωρίς serialization.
+
+    conditional_markers: πεδία updated_at (και σχετικών πινάκων) που αλλάζουν
+    όταν αλλάζει η απάντηση.
+    """
+    conditional_markers = ('updated_at',)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        queryset = self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: lookup})
+        return self.conditional_response(request, queryset, super().retrieve, *args, **kwargs)
+
+    def conditional_response(self, request, queryset, handler, *args, **kwargs):
+        etag, last_modified = validators(queryset, self.conditional_markers, request)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp:
+                response['Last-Modified'] = http_date(timestamp)
+            # ο browser κρατά την απάντηση αλλά ρωτά πάντα τον server (If-None-Match)
+            response['Cache-Control'] = settings.CONDITIONAL_CACHE_CONTROL
+            patch_vary_headers(response, ['Authorization'])
+        return response
+
+
+class ConditionalGetMixin(ConditionalRetrieveMixin):
+    # Και η λίστα: ένα aggregate πάνω στο φιλτραρισμένο queryset πριν τη σελιδοποίηση
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(request, queryset, super().list, *args, **kwargs)
@@ -0,0 +1,123 @@
+import datetime
+import random
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+
+from .autocomplete import rebuild_terms
+from .balances import refresh_order_balances
+from .models import Customer, Item, Order, OrderItem, Payment
+from .rollups import rebuild_sales_rollup
+from .search import rebuild_index
+
+FIRST_NAMES = [
+    'Γιώργος', 'Μαρία', 'Νίκος', 'Ελένη', 'Κώστας', 'Κατερίνα', 'Δημήτρης', 'Σοφία',
+    'Γιάννης', 'Αγγελική', 'Παναγιώτης', 'Δέσποινα', 'Βασίλης', 'Ιωάννα', 'Χρήστος', 'Αναστασία',
+]
+LAST_NAMES = [
+    'Παπαδόπουλος', 'Νικολάου', 'Γεωργίου', 'Οικονόμου', 'Παππάς', 'Βασιλείου', 'Αθανασίου',
+    'Δημητρίου', 'Ιωάννου', 'Καραγιάννης', 'Μαυρίδης', 'Αντωνίου', 'Κωνσταντίνου', 'Σταθόπουλος',
+]
+ITEM_WORDS = {
+    'Γαλακτοκομικά': ['Γάλα', 'Γιαούρτι', 'Φέτα', 'Κασέρι', 'Βούτυρο'],
+    'Αρτοποιία': ['Ψωμί', 'Κουλούρι', 'Τυρόπιτα', 'Σπανακόπιτα', 'Κέικ'],
+    'Ποτά': ['Νερό', 'Χυμός', 'Αναψυκτικό', 'Καφές', 'Τσάι'],
+    'Παντοπωλείο': ['Ελαιόλαδο', 'Ζυμαρικά', 'Ρύζι', 'Φακές', 'Ζάχαρη'],
+}
+ITEM_VARIANTS = ['', 'Βιολογικό', 'Οικογενειακό', 'Light', 'Premium', 'Χωριάτικο']
+
+BATCH_SIZE = 5000
+
+
+def _batches(objects, size):
+    for start in range(0, len(objects), size):
+        yield objects[start:start + size]
+
+
+def _set_dates(model, ids_by_date):
+    # το date είναι auto_now_add, άρα το bulk_create βάζει πάντα τη σημερινή ημερομηνία
+    for day, ids in ids_by_date.items():
+        for batch in _batches(ids, BATCH_SIZE):
+            model.objects.filter(pk__in=batch).update(date=day)
+
+
+def generate(customers=1000, items=200, orders=10000, lines=3, payment_ratio=0.7, days=365, seed=42):
+    """Δημιουργεί τυχαία (αλλά επαναλήψιμα, με seed) δεδομένα με bulk inserts.
+
+    lines: μέγιστος αριθμός γραμμών ανά παραγγελία. payment_ratio: ποσοστό
+    παραγγελιών με πληρωμή (οι μισές από αυτές εξοφλούνται ολόκληρες).
+    Στο τέλος ξαναϋπολογίζονται υπόλοιπα, rollup και ευρετήρια αναζήτησης,
+    αφού το bulk_create δεν στέλνει signals.
+    """
+    rng = random.Random(seed)
+    today = datetime.date.today()
+
+    with transaction.atomic():
+        customer_objs = Customer.objects.bulk_create([
+            Customer(
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                tax_id=f'{rng.randrange(10 ** 8, 10 ** 9)}',
+                phone=f'69{rng.randrange(10 ** 7, 10 ** 8)}',
+                email=f'customer{n}@example.gr' if rng.random() < 0.6 else None,
+            ) for n in range(customers)
+        ], batch_size=BATCH_SIZE)
+
+        item_objs = []
+        for n in range(items):
+            category = rng.choice(list(ITEM_WORDS))
+            name = f"{rng.choice(ITEM_WORDS[category])} {rng.choice(ITEM_VARIANTS)} {n + 1}".replace('  ', ' ')
+            item_objs.append(Item(
+                name=name, category=category, description='',
+                price=Decimal(rng.randrange(30, 3000)) / 100,
+            ))
+        item_objs = Item.objects.bulk_create(item_objs, batch_size=BATCH_SIZE)
+
+        order_dates = [today - datetime.timedelta(days=int(rng.triangular(0, days, 0))) for _ in range(orders)]
+        order_objs = Order.objects.bulk_create([
+            Order(customer=rng.choice(customer_objs)) for _ in range(orders)
+        ], batch_size=BATCH_SIZE)
+
+        order_ids_by_date = defaultdict(list)
+        line_objs = []
+        totals = {}
+        for order, day in zip(order_objs, order_dates):
+            order_ids_by_date[day].append(order.pk)
+            total = Decimal('0')
+            for item in rng.sample(item_objs, min(len(item_objs), rng.randint(1, lines))):
+                quantity = rng.randint(1, 10)
+                line_objs.append(OrderItem(order=order, item=item, quantity=quantity, unit_price=item.price))
+                total += item.price * quantity
+            totals[order.pk] = total
+        _set_dates(Order, order_ids_by_date)
+        OrderItem.objects.bulk_create(line_objs, batch_size=BATCH_SIZE)
+
+        payment_objs = []
+        payment_dates = []
+        for order, day in zip(order_objs, order_dates):
+            if rng.random() >= payment_ratio or not totals[order.pk]:
+                continue
+            amount = totals[order.pk] if rng.random() < 0.5 else (totals[order.pk] * Decimal(rng.uniform(0.1, 0.9))).quantize(Decimal('0.01'))
+            payment_objs.append(Payment(order=order, amount=amount))
+            payment_dates.append(min(today, day + datetime.timedelta(days=rng.randint(0, 30))))
+        payment_objs = Payment.objects.bulk_create(payment_objs, batch_size=BATCH_SIZE)
+        payment_ids_by_date = defaultdict(list)
+        for payment, day in zip(payment_objs, payment_dates):
+            payment_ids_by_date[day].append(payment.pk)
+        _set_dates(Payment, payment_ids_by_date)
+
+        order_ids = [order.pk for order in order_objs]
+        for batch in _batches(order_ids, BATCH_SIZE):
+            refresh_order_balances(batch)
+        rebuild_sales_rollup()
+        rebuild_index()
+        rebuild_terms()
+
+    return {
+        "customers": len(customer_objs),
+        "items": len(item_objs),
+        "orders": len(order_objs),
+        "order_items": len(line_objs),
+        "payments": len(payment_objs),
+    }
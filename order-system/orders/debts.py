@@ -0,0 +1,36 @@
+from django.db.models import Count, Sum
+
+from .models import Order
+
+
+def customer_debts(since=None, until=None, min_debt=0, order_by=('-debt', 'customer_id'), limit=None):
+    """Σύνολο, πληρωμές και χρέος ανά πελάτη με ένα GROUP BY πάνω στις παραγγελίες.
+
+    since/until: όρια ημερομηνίας παραγγελίας (συμπεριλαμβάνονται).
+    min_debt: επιστρέφονται μόνο πελάτες με χρέος μεγαλύτερο από αυτό (None = όλοι).
+    """
+    orders = Order.objects.all()
+    if since:
+        orders = orders.filter(date__gte=since)
+    if until:
+        orders = orders.filter(date__lte=until)
+
+    rows = (
+        orders.values('customer_id', 'customer__first_name', 'customer__last_name')
+        .annotate(
+            total_amount=Sum('total'),
+            paid_amount=Sum('paid'),
+            debt=Sum('remaining'),
+            orders_count=Count('id'),
+        )
+        .order_by(*order_by)
+    )
+    if min_debt is not None:
+        rows = rows.filter(debt__gt=min_debt)
+    if limit:
+        rows = rows[:limit]
+    return rows
+
+
+def customer_name(row):
+    return f"{row['customer__first_name']} {row['customer__last_name']}"
@@ -0,0 +1,29 @@
+import tempfile
+
+from django.http import FileResponse
+from openpyxl import Workbook
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Μέχρι αυτό το μέγεθος το αρχείο μένει στη μνήμη, μετά γράφεται σε προσωρινό αρχείο
+SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def stream_xlsx(filename, title, header, rows):
+    """Γράφει τις γραμμές σε write-only workbook και το στέλνει τμηματικά.
+
+    Οι γραμμές μπορεί να είναι generator (π.χ. πάνω σε queryset.iterator()),
+    οπότε ούτε τα δεδομένα ούτε το workbook κρατιούνται ολόκληρα στη μνήμη.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    wb.save(output)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
@@ -0,0 +1,39 @@
+import django_filters
+from rest_framework.filters import SearchFilter
+
+from .models import Order, Payment
+from .search import matching_ids
+
+
+class OrderFilterSet(django_filters.FilterSet):
+    # Όλα τα φίλτρα εφαρμόζονται στις αποθηκευμένες στήλες (is_paid, remaining, date)
+    is_paid = django_filters.BooleanFilter(field_name='is_paid')
+    remaining_amount__gt = django_filters.NumberFilter(field_name='remaining', lookup_expr='gt')
+    date__gte = django_filters.DateFilter(field_name='date', lookup_expr='gte')
+    date__lte = django_filters.DateFilter(field_name='date', lookup_expr='lte')
+
+    class Meta:
+        model = Order
+        fields = ['customer', 'date', 'is_paid']
+
+
+class PaymentFilterSet(django_filters.FilterSet):
+    customer = django_filters.NumberFilter(field_name='order__customer')
+
+    class Meta:
+        model = Payment
+        fields = ['date', 'amount', 'order']
+
+
+class IndexedSearchFilter(SearchFilter):
+    """?search= μέσω του πίνακα SearchDocument (FTS5/trigram) αντί για icontains σε κάθε πεδίο.
+
+    Το view δηλώνει το είδος εγγράφων με search_kind· χωρίς αυτό ισχύει το SearchFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        kind = getattr(view, 'search_kind', None)
+        if kind is None or not query.strip():
+            return super().filter_queryset(request, queryset, view)
+        return queryset.filter(pk__in=matching_ids(kind, query))
@@ -0,0 +1,146 @@
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from openpyxl import load_workbook
+
+from .balances import refresh_order_balances
+from .cache import bump_versions
+from .models import Order, Payment
+
+IMPORT_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 1000
+
+# Επιτρεπτά ονόματα στηλών (πεζά) -> πεδίο πληρωμής
+COLUMN_ALIASES = {
+    'order': 'order', 'order_id': 'order', 'παραγγελία': 'order',
+    'amount': 'amount', 'ποσό': 'amount',
+    'notes': 'notes', 'σημειώσεις': 'notes',
+}
+
+MAX_AMOUNT = Decimal('99999999.99')
+MAX_ORDER_ID = 2 ** 63 - 1
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+def read_rows(uploaded_file):
+    # Επιστρέφει generator με τις γραμμές του αρχείου (χωρίς να φορτωθεί όλο στη μνήμη)
+    name = (uploaded_file.name or '').lower()
+    if name.endswith('.xlsx'):
+        workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+        return workbook.active.iter_rows(values_only=True)
+    if name.endswith('.csv') or not name:
+        text = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+        # Το διαχωριστικό βγαίνει από την επικεφαλίδα (το Excel στα ελληνικά γράφει ';')
+        header = text.readline()
+        text.seek(0)
+        delimiter = max(',;\t', key=header.count)
+        return csv.reader(text, delimiter=delimiter)
+    raise ImportFormatError("Υποστηρίζονται μόνο αρχεία .csv και .xlsx")
+
+
+def _columns(header):
+    columns = {}
+    for position, title in enumerate(header or ()):
+        field = COLUMN_ALIASES.get(str(title or '').strip().lower())
+        if field and field not in columns:
+            columns[field] = position
+    if 'order' not in columns or 'amount' not in columns:
+        raise ImportFormatError("Η πρώτη γραμμή πρέπει να έχει τις στήλες order και amount")
+    return columns
+
+
+def _cell(row, columns, field):
+    position = columns.get(field)
+    if position is None or position >= len(row):
+        return None
+    return row[position]
+
+
+def _parse_order_id(value):
+    # Ακέραιος (και "12.0", όπως έρχεται από το Excel) μέσα στα όρια του BigAutoField
+    raw = str(value if value is not None else '').strip().lstrip('#')
+    try:
+        number = Decimal(raw)
+    except (InvalidOperation, ValueError):
+        return None
+    if not number.is_finite() or not 0 < number <= MAX_ORDER_ID or number != number.to_integral_value():
+        return None
+    return int(number)
+
+
+def _parse_row(row, columns):
+    order_id = _parse_order_id(_cell(row, columns, 'order'))
+    if order_id is None:
+        return None, "Μη έγκυρος αριθμός παραγγελίας"
+
+    raw_amount = _cell(row, columns, 'amount')
+    try:
+        amount = Decimal(str(raw_amount).strip().replace(',', '.')).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError):
+        return None, "Μη έγκυρο ποσό"
+    if not amount.is_finite() or amount <= 0 or amount > MAX_AMOUNT:
+        return None, "Μη έγκυρο ποσό"
+
+    notes = _cell(row, columns, 'notes')
+    return Payment(order_id=order_id, amount=amount, notes=str(notes) if notes not in (None, '') else None), None
+
+
+def _save_chunk(chunk, report):
+    order_ids = {payment.order_id for _, payment in chunk}
+    existing = set(Order.objects.filter(id__in=order_ids).values_list('id', flat=True))
+
+    valid = []
+    for line, payment in chunk:
+        if payment.order_id in existing:
+            valid.append(payment)
+        else:
+            _add_error(report, line, f"Η παραγγελία #{payment.order_id} δεν βρέθηκε")
+
+    if valid:
+        with transaction.atomic():
+            Payment.objects.bulk_create(valid)
+            refresh_order_balances({payment.order_id for payment in valid})
+            transaction.on_commit(lambda: bump_versions('payments', 'orders'))
+    report['imported'] += len(valid)
+
+
+def _add_error(report, line, message):
+    report['failed'] += 1
+    if len(report['errors']) < MAX_REPORTED_ERRORS:
+        report['errors'].append({"row": line, "error": message})
+    else:
+        report['errors_truncated'] = True
+
+
+def import_payments(rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """Εισάγει πληρωμές από γραμμές αρχείου (η πρώτη είναι η επικεφαλίδα).
+
+    Οι γραμμές επεξεργάζονται σε κομμάτια: κάθε κομμάτι ελέγχει τις παραγγελίες
+    με ένα IN query και γράφεται με bulk_create στη δική του συναλλαγή, μαζί με
+    την ενημέρωση των υπολοίπων των παραγγελιών που αφορά.
+    """
+    rows = iter(rows)
+    columns = _columns(next(rows, None))
+    report = {"imported": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+    chunk = []
+    for line, row in enumerate(rows, start=2):
+        if not row or all(value in (None, '') for value in row):
+            continue
+        payment, error = _parse_row(row, columns)
+        if error:
+            _add_error(report, line, error)
+            continue
+        chunk.append((line, payment))
+        if len(chunk) >= chunk_size:
+            _save_chunk(chunk, report)
+            chunk = []
+    if chunk:
+        _save_chunk(chunk, report)
+    report['errors'].sort(key=lambda error: error['row'])
+    return report
@@ -0,0 +1,203 @@
+import datetime
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import (CaptureQueriesContext, setup_test_environment,
+                               teardown_test_environment)
+from rest_framework.authtoken.models import Token
+
+from orders.datagen import generate
+
+SIZES = {
+    'small': dict(customers=100, items=50, orders=1000),
+    'medium': dict(customers=1000, items=200, orders=10000),
+    'large': dict(customers=5000, items=500, orders=100000),
+}
+
+
+def action_params():
+    # Παράμετροι για τα actions που τις απαιτούν (ή που χωρίς αυτές δεν κάνουν τίποτα)
+    today = datetime.date.today()
+    last_month = (today.replace(day=1) - datetime.timedelta(days=1)).strftime('%Y-%m')
+    return {
+        'autocomplete': {'q': 'πα'},
+        'by_date': {'date': today.isoformat()},
+        'by_month': {'month': today.strftime('%Y-%m')},
+        'sold_by_date': {'date': today.isoformat()},
+        'export_summary_pdf': {'date': today.isoformat()},
+        'sales_report': {'month': last_month},
+        'stats': {'bucket': 'week', 'from': (today - datetime.timedelta(days=365)).isoformat()},
+    }
+
+
+def discover_routes():
+    """Όλα τα GET routes του orders/urls.py (list, retrieve και extra actions)."""
+    from orders.urls import router
+
+    params = action_params()
+    routes = [('search', '/api/search/', {'q': 'παπ'})]
+    for prefix, viewset, _ in router.registry:
+        model = getattr(getattr(viewset, 'queryset', None), 'model', None)
+        pk = model.objects.order_by('pk').values_list('pk', flat=True).first() if model else None
+
+        if hasattr(viewset, 'list'):
+            routes.append((f'{prefix}-list', f'/api/{prefix}/', {}))
+            if model is not None:
+                routes.append((f'{prefix}-list-page', f'/api/{prefix}/', {'page_size': 50}))
+        if hasattr(viewset, 'retrieve') and pk is not None:
+            routes.append((f'{prefix}-detail', f'/api/{prefix}/{pk}/', {}))
+        for action in viewset.get_extra_actions():
+            if 'get' not in action.mapping:
+                continue
+            if action.detail:
+                if pk is None:
+                    continue
+                path = f'/api/{prefix}/{pk}/{action.url_path}/'
+            else:
+                path = f'/api/{prefix}/{action.url_path}/'
+            routes.append((f'{prefix}-{action.url_path}', path, params.get(action.__name__, {})))
+    return routes
+
+
+def consume(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+class Command(BaseCommand):
+    help = ("Μετρά χρόνο, queries και μνήμη για κάθε GET route του API, σε test βάση "
+            "με συνθετικά δεδομένα διαφόρων μεγεθών, και γράφει τα αποτελέσματα σε JSON")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='small,medium',
+                            help=f"Μεγέθη δεδομένων, χωρισμένα με κόμμα ({', '.join(SIZES)})")
+        parser.add_argument('--repeat', type=int, default=5, help="Επαναλήψεις ανά route")
+        parser.add_argument('--routes', default='', help="Μόνο τα routes που περιέχουν αυτό το κείμενο")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument('--compare', help="Προηγούμενο αρχείο αποτελεσμάτων για σύγκριση")
+
+    def handle(self, *args, **options):
+        sizes = [size.strip() for size in options['sizes'].split(',') if size.strip()]
+        unknown = set(sizes) - set(SIZES)
+        if unknown:
+            raise CommandError(f"Άγνωστο μέγεθος: {', '.join(sorted(unknown))}")
+
+        report = {
+            "created_at": datetime.datetime.now().isoformat(timespec='seconds'),
+            "commit": self.git_commit(),
+            "database": connection.vendor,
+            "repeat": options['repeat'],
+            "datasets": {},
+            "results": [],
+        }
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # ξεχωριστή cache ώστε να μην αδειάσει η cache της εφαρμογής
+            with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark',
+            }}):
+                for size in sizes:
+                    call_command('flush', interactive=False, verbosity=0)
+                    self.stdout.write(f"Δεδομένα '{size}'...")
+                    report['datasets'][size] = generate(seed=options['seed'], **SIZES[size])
+                    report['results'] += self.run_size(size, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Τα αποτελέσματα γράφτηκαν στο {options['output']}"))
+
+        if options['compare']:
+            self.compare(options['compare'], report)
+
+    def run_size(self, size, options):
+        from django.core.cache import cache
+
+        user = User.objects.create_user('benchmark', password='benchmark', is_staff=True)
+        token = Token.objects.create(user=user)
+        client = Client(headers={'Authorization': f'Token {token.key}'})
+
+        results = []
+        for name, path, params in discover_routes():
+            if options['routes'] and options['routes'] not in name:
+                continue
+            cache.clear()
+            timings = []
+            queries = []
+            status = None
+            size_bytes = 0
+            for _ in range(max(options['repeat'], 1)):
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = client.get(path, params)
+                    size_bytes = consume(response)
+                    timings.append((time.perf_counter() - start) * 1000)
+                queries.append(len(captured))
+                status = response.status_code
+
+            # η μνήμη μετριέται σε ξεχωριστή εκτέλεση γιατί το tracemalloc επιβαρύνει τον χρόνο
+            cache.clear()
+            tracemalloc.start()
+            consume(client.get(path, params))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            warm = timings[1:] or timings
+            result = {
+                "size": size,
+                "route": name,
+                "path": path,
+                "params": params,
+                "status": status,
+                "cold_ms": round(timings[0], 2),
+                "median_ms": round(statistics.median(warm), 2),
+                "max_ms": round(max(warm), 2),
+                "queries_cold": queries[0],
+                "queries_warm": queries[-1],
+                "peak_kb": round(peak / 1024, 1),
+                "bytes": size_bytes,
+            }
+            results.append(result)
+            self.stdout.write(
+                f"  {size:7} {name:40} {status} {result['median_ms']:9.2f} ms "
+                f"{result['queries_cold']:5} q {result['peak_kb']:10.1f} KB"
+            )
+        return results
+
+    def compare(self, path, report):
+        with open(path, encoding='utf-8') as previous_file:
+            previous = {(r['size'], r['route']): r for r in json.load(previous_file)['results']}
+        self.stdout.write(f"Σύγκριση με {path}:")
+        for result in report['results']:
+            old = previous.get((result['size'], result['route']))
+            if not old:
+                continue
+            ratio = result['median_ms'] / old['median_ms'] if old['median_ms'] else 0
+            self.stdout.write(
+                f"  {result['size']:7} {result['route']:40} "
+                f"{old['median_ms']:9.2f} -> {result['median_ms']:9.2f} ms (x{ratio:.2f}), "
+                f"{old['queries_cold']} -> {result['queries_cold']} q"
+            )
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from orders.datagen import generate
+
+
+class Command(BaseCommand):
+    help = "Δημιουργεί συνθετικά δεδομένα (πελάτες, είδη, παραγγελίες, πληρωμές) με σταθερό seed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=1000)
+        parser.add_argument('--items', type=int, default=200)
+        parser.add_argument('--orders', type=int, default=10000)
+        parser.add_argument('--lines', type=int, default=3, help="Μέγιστες γραμμές ανά παραγγελία")
+        parser.add_argument('--payment-ratio', type=float, default=0.7,
+                            help="Ποσοστό παραγγελιών με πληρωμή (0-1)")
+        parser.add_argument('--days', type=int, default=365, help="Εύρος ημερομηνιών προς τα πίσω")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        counts = generate(
+            customers=options['customers'], items=options['items'], orders=options['orders'],
+            lines=options['lines'], payment_ratio=options['payment_ratio'],
+            days=options['days'], seed=options['seed'],
+        )
+        summary = ', '.join(f"{name}: {count}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Δημιουργήθηκαν {summary}"))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+
+from orders.balances import refresh_order_balances
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    help = "Ξαναϋπολογίζει τα αποθηκευμένα υπόλοιπα (total, paid, remaining, is_paid) των παραγγελιών"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--check', action='store_true',
+                            help="Μόνο έλεγχος: εμφανίζει τις παραγγελίες με λάθος αποθηκευμένα υπόλοιπα")
+
+    def handle(self, *args, **options):
+        if options['check']:
+            return self.check_balances()
+
+        batch_size = options['batch_size']
+        ids = Order.objects.order_by('pk').values_list('pk', flat=True)
+        updated = 0
+        last_pk = 0
+
+        while True:
+            batch = list(ids.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                updated += refresh_order_balances(Order.objects.filter(pk__gte=batch[0], pk__lte=batch[-1]))
+            last_pk = batch[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Ενημερώθηκαν {updated} παραγγελίες"))
+
+    def check_balances(self):
+        stale = (
+            Order.objects.with_computed_balances()
+            .exclude(Q(total=F('computed_total')) & Q(paid=F('computed_paid')))
+            .values_list('pk', flat=True)
+        )
+        count = 0
+        for pk in stale.iterator():
+            self.stdout.write(f"Παραγγελία #{pk}: λάθος υπόλοιπο")
+            count += 1
+        if count:
+            self.stdout.write(self.style.WARNING(f"Βρέθηκαν {count} παραγγελίες με λάθος υπόλοιπο"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Όλα τα υπόλοιπα είναι σωστά"))
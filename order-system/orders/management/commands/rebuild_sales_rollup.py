@@ -0,0 +1,24 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.rollups import rebuild_sales_rollup
+
+
+def parse_date(value):
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Λάθος μορφή ημερομηνίας: {value}")
+
+
+class Command(BaseCommand):
+    help = "Ξαναχτίζει τον πίνακα ημερήσιων πωλήσεων ανά είδος (DailyItemSales) από τις γραμμές παραγγελιών"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=parse_date, help="YYYY-MM-DD (προεπιλογή: όλο το ιστορικό)")
+        parser.add_argument('--until', type=parse_date, help="YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        rows = rebuild_sales_rollup(since=options['since'], until=options['until'])
+        self.stdout.write(self.style.SUCCESS(f"Δημιουργήθηκαν {rows} γραμμές ημερήσιων πωλήσεων"))
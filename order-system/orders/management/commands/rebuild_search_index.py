@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from orders.autocomplete import rebuild_terms
+from orders.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Ξαναχτίζει το ευρετήριο αναζήτησης (SearchDocument) και τους όρους autocomplete"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_index()
+            terms = rebuild_terms()
+        self.stdout.write(self.style.SUCCESS(f"Ευρετηριάστηκαν {count} εγγραφές και {terms} όροι autocomplete"))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from orders.models import ReportJob
+from orders.reports import claim_next_job, run_job
+
+
+class Command(BaseCommand):
+    help = "Εκτελεί τις αναφορές (PDF) που περιμένουν στην ουρά, εκτός του web process"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Εκτελεί ό,τι υπάρχει στην ουρά και τερματίζει")
+        parser.add_argument('--sleep', type=float, default=2.0,
+                            help="Αναμονή (δευτερόλεπτα) όταν η ουρά είναι άδεια")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['sleep'])
+                continue
+
+            job = run_job(job)
+            if job.status == ReportJob.DONE:
+                self.stdout.write(self.style.SUCCESS(f"{job}: {job.file.name}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"{job}: {job.error}"))
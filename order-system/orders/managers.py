@@ -0,0 +1,27 @@
+from django.db import models
+from django.db.models import Prefetch
+
+
+class OrderQuerySet(models.QuerySet):
+
+    def with_balances(self):
+        # Τα υπόλοιπα είναι αποθηκευμένα στην παραγγελία· εδώ φορτώνουμε
+        # μαζικά ό,τι χρειάζεται το OrderSerializer (πελάτης, γραμμές, πληρωμές)
+        from .models import OrderItem
+
+        return self.select_related('customer').prefetch_related(
+            Prefetch('items', queryset=OrderItem.objects.select_related('item')),
+            'payments',
+        )
+
+    def with_computed_balances(self):
+        # Υπολογισμός από τις γραμμές/πληρωμές με Subquery, για έλεγχο των αποθηκευμένων τιμών
+        from .balances import items_total_expression, payments_total_expression
+
+        total = items_total_expression()
+        paid = payments_total_expression()
+        return self.annotate(
+            computed_total=total,
+            computed_paid=paid,
+            computed_remaining=total - paid,
+        )
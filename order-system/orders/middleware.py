@@ -0,0 +1,121 @@
+import heapq
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from .budgets import check_budget, view_budget
+
+logger = logging.getLogger('orders.performance')
+
+
+class QueryStats:
+    """Πλήθος και χρόνος των queries ενός request· με sampling κρατά και τα πιο αργά SQL."""
+
+    def __init__(self, capture=False, keep=5):
+        self.count = 0
+        self.duration = 0.0
+        self.capture = capture
+        self.keep = keep
+        self.slowest = []  # min-heap (διάρκεια, σειρά, sql)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if self.capture:
+                entry = (elapsed, self.count, sql)
+                if len(self.slowest) < self.keep:
+                    heapq.heappush(self.slowest, entry)
+                else:
+                    heapq.heappushpop(self.slowest, entry)
+
+    def merge(self, other):
+        # queries που έτρεξαν σε άλλο thread (π.χ. /api/batch/) για το ίδιο request
+        self.count += other.count
+        self.duration += other.duration
+        for entry in other.slowest:
+            if len(self.slowest) < self.keep:
+                heapq.heappush(self.slowest, entry)
+            else:
+                heapq.heappushpop(self.slowest, entry)
+
+    def slowest_queries(self):
+        return [
+            {"ms": round(elapsed * 1000, 2), "sql": sql[:1000]}
+            for elapsed, _, sql in sorted(self.slowest, reverse=True)
+        ]
+
+
+@contextmanager
+def instrument_connections(stats):
+    # Οι συνδέσεις είναι ανά thread: ισχύει για τις συνδέσεις του τρέχοντος thread
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        yield stats
+
+
+class QueryInstrumentationMiddleware:
+    """Μετρά queries/χρόνο βάσης/χρόνο view ανά request.
+
+    Προσθέτει header Server-Timing και γράφει στον logger orders.performance
+    τα requests που ξεπερνούν τα SLOW_REQUEST_MS / SLOW_REQUEST_QUERIES. Το
+    κείμενο των SQL κρατιέται μόνο σε ποσοστό QUERY_CAPTURE_SAMPLE_RATE των
+    requests, ώστε να μπορεί να τρέχει και σε παραγωγή χωρίς DEBUG.
+
+    Ελέγχει επίσης το όριο queries (query_budget) του view, ανάλογα με το
+    QUERY_BUDGET_MODE: off, warn (γράφει στο log) ή raise (στα tests).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_INSTRUMENTATION:
+            return self.get_response(request)
+
+        capture = random.random() < settings.QUERY_CAPTURE_SAMPLE_RATE
+        stats = QueryStats(capture=capture, keep=settings.SLOW_QUERY_COUNT)
+        request.query_stats = stats
+
+        start = time.perf_counter()
+        with instrument_connections(stats):
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        db_ms = stats.duration * 1000
+        total_ms = total * 1000
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={db_ms:.1f};desc="{stats.count} queries"',
+            f'app;dur={total_ms - db_ms:.1f}',
+            f'total;dur={total_ms:.1f}',
+        ])
+
+        if total_ms >= settings.SLOW_REQUEST_MS or stats.count >= settings.SLOW_REQUEST_QUERIES:
+            record = {
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "view": getattr(getattr(request, 'resolver_match', None), 'view_name', None),
+                "total_ms": round(total_ms, 1),
+                "db_ms": round(db_ms, 1),
+                "queries": stats.count,
+            }
+            if capture:
+                record["slowest"] = stats.slowest_queries()
+            logger.warning(json.dumps(record, ensure_ascii=False), extra={"request_stats": record})
+        check_budget(request, response, stats)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if settings.REQUEST_INSTRUMENTATION:
+            request.query_budget = view_budget(view_func, request.method)
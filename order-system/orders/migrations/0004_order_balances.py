@@ -0,0 +1,54 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:27
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Case, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan
+
+
+def fill_balances(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    Payment = apps.get_model('orders', 'Payment')
+    money = models.DecimalField(max_digits=10, decimal_places=2)
+
+    lines = (OrderItem.objects.filter(order=OuterRef('pk')).values('order')
+             .annotate(s=Sum(F('item__price') * F('quantity'), output_field=money)).values('s'))
+    payments = (Payment.objects.filter(order=OuterRef('pk')).values('order')
+                .annotate(s=Sum('amount')).values('s'))
+    total = Coalesce(Subquery(lines, output_field=money), Value(Decimal('0')), output_field=money)
+    paid = Coalesce(Subquery(payments, output_field=money), Value(Decimal('0')), output_field=money)
+    Order.objects.update(
+        total=total,
+        paid=paid,
+        remaining=total - paid,
+        is_paid=Case(When(GreaterThan(total - paid, 0), then=Value(False)), default=Value(True)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_item_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='is_paid',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='remaining',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.RunPython(fill_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+
+def fill_daily_sales(apps, schema_editor):
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    DailyItemSales = apps.get_model('orders', 'DailyItemSales')
+    money = models.DecimalField(max_digits=12, decimal_places=2)
+
+    rows = (OrderItem.objects.values('order__date', 'item_id')
+            .annotate(q=Sum('quantity'), r=Sum(F('item__price') * F('quantity'), output_field=money),
+                      n=Count('order', distinct=True))
+            .order_by())
+    DailyItemSales.objects.bulk_create((
+        DailyItemSales(date=row['order__date'], item_id=row['item_id'],
+                       quantity=row['q'], revenue=row['r'], order_count=row['n'])
+        for row in rows.iterator()
+    ), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyItemSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='orders.item')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'item'), name='daily_item_sales_unique')],
+            },
+        ),
+        migrations.RunPython(fill_daily_sales, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_daily_item_sales'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['is_paid', 'date', 'id'], name='order_is_paid_date_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_is_paid_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', 'date', 'id'], name='order_customer_date_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:41
+
+import django.db.models.expressions
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def fill_unit_prices(apps, schema_editor):
+    # Οι υπάρχουσες γραμμές παίρνουν την τρέχουσα τιμή του είδους (όπως υπολογίζονταν μέχρι τώρα).
+    # Τα UPDATE γίνονται ανά εύρος pk για να μένει μικρό το κάθε statement· η migration όμως
+    # τρέχει σε μία συναλλαγή, οπότε οι γραμμές μένουν κλειδωμένες μέχρι το τέλος της
+    Item = apps.get_model('orders', 'Item')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    price = Subquery(Item.objects.filter(pk=OuterRef('item_id')).values('price')[:1])
+
+    last_pk = 0
+    while True:
+        batch = list(
+            OrderItem.objects.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:BACKFILL_BATCH_SIZE]
+        )
+        if not batch:
+            break
+        OrderItem.objects.filter(pk__gte=batch[0], pk__lte=batch[-1]).update(unit_price=price)
+        last_pk = batch[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_order_customer_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunPython(fill_unit_prices, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='line_total',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('unit_price'), '*', models.F('quantity')), output_field=models.DecimalField(decimal_places=2, max_digits=12)),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:44
+
+import unicodedata
+
+from django.db import migrations, models
+
+FTS_TABLE = 'orders_searchdocument_fts'
+DOCUMENTS = 'orders_searchdocument'
+
+SQLITE_FORWARD = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(text, content='{DOCUMENTS}', content_rowid='id')",
+    f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {DOCUMENTS} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {DOCUMENTS} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {DOCUMENTS} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+]
+SQLITE_BACKWARD = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS {DOCUMENTS}_text_trgm ON {DOCUMENTS} USING gin (text gin_trgm_ops)",
+]
+POSTGRES_BACKWARD = [
+    f"DROP INDEX IF EXISTS {DOCUMENTS}_text_trgm",
+]
+
+
+def create_search_structures(apps, schema_editor):
+    # FTS5 στο SQLite (dev/tests), GIN trigram index στην PostgreSQL· αλλού μόνο ο πίνακας
+    statements = {'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_search_structures(apps, schema_editor):
+    statements = {'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def normalize(text):
+    # ίδια κανονικοποίηση με το orders.search.normalize
+    text = unicodedata.normalize('NFD', str(text or ''))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return text.lower().replace('ς', 'σ')
+
+
+def join(*parts):
+    return ' '.join(str(part) for part in parts if part)
+
+
+def fill_documents(apps, schema_editor):
+    Customer = apps.get_model('orders', 'Customer')
+    Item = apps.get_model('orders', 'Item')
+    Order = apps.get_model('orders', 'Order')
+    SearchDocument = apps.get_model('orders', 'SearchDocument')
+
+    def documents():
+        for c in Customer.objects.iterator():
+            label = join(c.first_name, c.last_name)
+            yield SearchDocument(kind='customer', object_id=c.pk, label=label[:255],
+                                 text=normalize(join(label, c.phone, c.tax_id, c.email)))
+        for i in Item.objects.iterator():
+            yield SearchDocument(kind='item', object_id=i.pk, label=i.name[:255],
+                                 text=normalize(join(i.name, i.category, i.description)))
+        rows = Order.objects.values_list('pk', 'customer__first_name', 'customer__last_name')
+        for pk, first_name, last_name in rows.iterator():
+            name = join(first_name, last_name)
+            yield SearchDocument(kind='order', object_id=pk, label=f"Παραγγελία #{pk} - {name}"[:255],
+                                 text=normalize(join(pk, name)))
+
+    SearchDocument.objects.bulk_create(documents(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0010_orderitem_unit_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('customer', 'Πελάτης'), ('item', 'Είδος'), ('order', 'Παραγγελία')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('label', models.CharField(max_length=255)),
+                ('text', models.TextField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='search_document_unique')],
+            },
+        ),
+        migrations.RunPython(create_search_structures, drop_search_structures),
+        migrations.RunPython(fill_documents, migrations.RunPython.noop),
+    ]
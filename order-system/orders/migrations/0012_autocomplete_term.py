@@ -0,0 +1,84 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:46
+
+import unicodedata
+
+from django.db import migrations, models
+
+TABLE = 'orders_autocompleteterm'
+INDEX = 'orders_autocomplete_prefix'
+
+# Covering index: η αναζήτηση με πρόθεμα απαντιέται χωρίς πρόσβαση στον πίνακα
+CREATE_INDEX = {
+    'postgresql': (
+        f"CREATE INDEX {INDEX} ON {TABLE} (kind, term varchar_pattern_ops) "
+        f"INCLUDE (object_id, label, price)"
+    ),
+    'sqlite': f"CREATE INDEX {INDEX} ON {TABLE} (kind, term, object_id, label, price)",
+}
+
+
+def create_prefix_index(apps, schema_editor):
+    sql = CREATE_INDEX.get(schema_editor.connection.vendor,
+                           f"CREATE INDEX {INDEX} ON {TABLE} (kind, term)")
+    schema_editor.execute(sql)
+
+
+def drop_prefix_index(apps, schema_editor):
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX}")
+
+
+def normalize(text):
+    # ίδια κανονικοποίηση με το orders.search.normalize
+    text = unicodedata.normalize('NFD', str(text or ''))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return text.lower().replace('ς', 'σ')
+
+
+def terms(*values):
+    result = []
+    for value in values:
+        term = normalize(value).strip()[:255]
+        if term and term not in result:
+            result.append(term)
+    return result
+
+
+def fill_terms(apps, schema_editor):
+    Customer = apps.get_model('orders', 'Customer')
+    Item = apps.get_model('orders', 'Item')
+    AutocompleteTerm = apps.get_model('orders', 'AutocompleteTerm')
+
+    def rows():
+        for c in Customer.objects.iterator():
+            label = f"{c.first_name} {c.last_name}"[:255]
+            for term in terms(c.first_name, c.last_name, f"{c.first_name} {c.last_name}",
+                              f"{c.last_name} {c.first_name}", c.phone, c.tax_id):
+                yield AutocompleteTerm(kind='customer', object_id=c.pk, term=term, label=label)
+        for i in Item.objects.iterator():
+            for term in terms(i.name, *i.name.split()):
+                yield AutocompleteTerm(kind='item', object_id=i.pk, term=term, label=i.name[:255], price=i.price)
+
+    AutocompleteTerm.objects.bulk_create(rows(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0011_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AutocompleteTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('customer', 'Πελάτης'), ('item', 'Είδος'), ('order', 'Παραγγελία')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('term', models.CharField(max_length=255)),
+                ('label', models.CharField(max_length=255)),
+                ('price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+            ],
+        ),
+        migrations.RunPython(create_prefix_index, drop_prefix_index),
+        migrations.RunPython(fill_terms, migrations.RunPython.noop),
+    ]
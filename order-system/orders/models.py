@@ -1,4 +1,17 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+
+from .managers import OrderQuerySet
+
+
+class AtomicSaveModel(models.Model):
+    # Η αποθήκευση και η ενημέρωση των υπολοίπων (signals) γίνονται στην ίδια συναλλαγή
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
 
 
 # Create your models here.
@@ -8,16 +21,19 @@ class Customer(models.Model):
     tax_id = models.CharField(max_length=15)
     phone = models.CharField(max_length=20)
     email = models.EmailField(blank=True, null=True)
+    # Για ETag/Last-Modified (orders/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
 
-class Item(models.Model):
+class Item(AtomicSaveModel):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     category = models.CharField(max_length=100, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
 
     def __str__(self):
@@ -27,42 +43,170 @@ class Item(models.Model):
 class Order(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='orders')
     date = models.DateField(auto_now_add=True)
+    # Αποθηκευμένα υπόλοιπα, ενημερώνονται από τα signals (βλ. orders/signals.py)
     total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    paid = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    remaining = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    is_paid = models.BooleanField(default=True)
+    # Αλλάζει και σε κάθε ενημέρωση υπολοίπων, δηλαδή όταν αλλάζουν γραμμές ή πληρωμές
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'], name='order_date_id_idx'),
+            models.Index(fields=['is_paid', 'date', 'id'], name='order_is_paid_date_idx'),
+            models.Index(fields=['customer', 'date', 'id'], name='order_customer_date_idx'),
+        ]
 
     def total_amount(self):
-        return sum([item.total_price() for item in self.items.all()])
+        return self.total
 
     def paid_amount(self):
-        return sum([payment.amount for payment in self.payments.all()])
+        return self.paid
 
     def remaining_amount(self):
-        return self.total_amount() - self.paid_amount()
-
-    def is_paid(self):
-        return self.remaining_amount() <= 0
+        return self.remaining
 
     def __str__(self):
         return f"Παραγγελία #{self.id} για {self.customer}"
 
 
 
-class OrderItem(models.Model):
+class OrderItem(AtomicSaveModel):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     item = models.ForeignKey(Item, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
+    # Η τιμή του είδους τη στιγμή της παραγγελίας· οι αλλαγές στον κατάλογο δεν αγγίζουν παλιές γραμμές
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    line_total = models.GeneratedField(
+        expression=models.F('unit_price') * models.F('quantity'),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        db_persist=True,
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_item_id = instance.__dict__.get('item_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Νέα γραμμή ή αλλαγή είδους: κρατάμε την τρέχουσα τιμή καταλόγου
+        if self.unit_price is None or getattr(self, '_loaded_item_id', self.item_id) != self.item_id:
+            self.unit_price = Item.objects.values_list('price', flat=True).get(pk=self.item_id)
+        super().save(*args, **kwargs)
+        self._loaded_item_id = self.item_id
 
     def total_price(self):
-        return self.item.price * self.quantity
+        return self.unit_price * self.quantity
 
     def __str__(self):
         return f"{self.quantity} x {self.item.name}"
 
 
-class Payment(models.Model):
+class Payment(AtomicSaveModel):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='payments')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     date = models.DateField(auto_now_add=True)
     notes = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'], name='payment_date_id_idx'),
+        ]
+
     def __str__(self):
         return f"Πληρωμή {self.amount} για Παραγγελία {self.order.id}"
+
+
+class ReportJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Σε αναμονή'),
+        (RUNNING, 'Σε εξέλιξη'),
+        (DONE, 'Ολοκληρώθηκε'),
+        (FAILED, 'Απέτυχε'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    # hash του kind + params, για επαναχρησιμοποίηση ίδιων αναφορών
+    fingerprint = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    file = models.FileField(upload_to='reports/', blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Πόσες φορές την πήρε worker (ξαναμπαίνει στην ουρά αν ο worker πεθάνει, βλ. REPORT_LEASE_SECONDS)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['fingerprint', 'status']),
+        ]
+
+    def __str__(self):
+        return f"Αναφορά {self.kind} #{self.id} ({self.status})"
+
+
+class DailyItemSales(models.Model):
+    # Συγκεντρωτικά πωλήσεων ανά ημέρα και είδος (βλ. orders/rollups.py)
+    date = models.DateField()
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='daily_sales')
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'item'], name='daily_item_sales_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.date}: {self.quantity} x {self.item_id}"
+
+
+class SearchDocument(models.Model):
+    # Κανονικοποιημένο κείμενο αναζήτησης ανά αντικείμενο (βλ. orders/search.py)
+    CUSTOMER = 'customer'
+    ITEM = 'item'
+    ORDER = 'order'
+    KIND_CHOICES = [
+        (CUSTOMER, 'Πελάτης'),
+        (ITEM, 'Είδος'),
+        (ORDER, 'Παραγγελία'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    label = models.CharField(max_length=255)
+    text = models.TextField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='search_document_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}: {self.label}"
+
+
+class AutocompleteTerm(models.Model):
+    # Κανονικοποιημένοι όροι (όνομα, επώνυμο, τηλέφωνο, ΑΦΜ, όνομα είδους) για αναζήτηση με πρόθεμα·
+    # label/price αντιγράφονται εδώ ώστε η απάντηση να βγαίνει μόνο από το index (βλ. migration 0012)
+    kind = models.CharField(max_length=10, choices=SearchDocument.KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    term = models.CharField(max_length=255)
+    label = models.CharField(max_length=255)
+    price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}: {self.term}"
@@ -0,0 +1,113 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Σελιδοποίηση με cursor πάνω στα πεδία του ordering (keyset).
+
+    Κάθε σελίδα φιλτράρει με WHERE (πεδία) < (τελευταία γραμμή) αντί για OFFSET,
+    οπότε η σελίδα 1000 κοστίζει όσο και η πρώτη. Όλα τα πεδία του ordering
+    πρέπει να έχουν την ίδια κατεύθυνση και το τελευταίο να είναι μοναδικό (id).
+    """
+    ordering = ('-id',)
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Μη έγκυρος cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Συμβατότητα: όσο είναι ενεργό το API_PAGINATION_OPT_IN, χωρίς cursor/page_size
+        # επιστρέφεται ολόκληρη η λίστα όπως πριν, ώστε οι σελίδες του React να μεταφερθούν σταδιακά
+        if settings.API_PAGINATION_OPT_IN and not (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        ):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = self.get_position(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+        if requested > 0:
+            page_size = min(requested, settings.API_MAX_PAGE_SIZE)
+        return page_size
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        cursor = base64.urlsafe_b64encode(json.dumps(self.next_position).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def field_names(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def get_position(self, row):
+        return [str(getattr(row, name)) for name in self.field_names()]
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            names = self.field_names()
+            if len(values) != len(names):
+                raise ValueError
+            return [model._meta.get_field(name).to_python(value) for name, value in zip(names, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def after(self, position):
+        # (a, b, c) < (x, y, z)  =>  a < x OR (a = x AND b < y) OR (a = x AND b = y AND c < z)
+        lookup = 'lt' if self.ordering[0].startswith('-') else 'gt'
+        names = self.field_names()
+        condition = Q()
+        for i, name in enumerate(names):
+            equal = {names[j]: position[j] for j in range(i)}
+            condition |= Q(**equal, **{f'{name}__{lookup}': position[i]})
+        return condition
+
+
+class DateKeysetPagination(KeysetPagination):
+    ordering = ('-date', '-id')
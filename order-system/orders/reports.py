@@ -0,0 +1,204 @@
+import datetime
+import hashlib
+import json
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from .debts import customer_debts, customer_name
+from .exports import EXPORT_CHUNK_SIZE, SPOOL_MAX_SIZE
+from .models import Customer, Order, Payment, ReportJob
+
+STALE_ERROR = "Ο worker σταμάτησε πριν ολοκληρωθεί η αναφορά"
+
+
+class PdfWriter:
+    # Μικρός βοηθός γύρω από το canvas για τη σελιδοποίηση των λιστών
+
+    def __init__(self, output, title):
+        self.canvas = canvas.Canvas(output, pagesize=A4)
+        self.y = 800
+        self.canvas.setFont("Helvetica-Bold", 14)
+        self.canvas.drawString(100, self.y, title)
+        self.y -= 40
+
+    def font(self, name, size):
+        self.canvas.setFont(name, size)
+
+    def line(self, x, text, gap=15):
+        if self.y < 50:
+            self.canvas.showPage()
+            self.y = 800
+        self.canvas.drawString(x, self.y, text)
+        self.y -= gap
+
+    def skip(self, gap):
+        self.y -= gap
+
+    def save(self):
+        self.canvas.save()
+
+
+def render_customers_pdf(output, params):
+    pdf = PdfWriter(output, "Λίστα Πελατών")
+    pdf.font("Helvetica", 10)
+    customers = Customer.objects.order_by('id').values_list(
+        'id', 'first_name', 'last_name', 'tax_id', 'phone', 'email')
+
+    for pk, first_name, last_name, tax_id, phone, email in customers.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        pdf.line(50, f"ID: {pk} | {first_name} {last_name}")
+        pdf.line(70, f"ΑΦΜ: {tax_id} | Τηλ: {phone} | Email: {email or '—'}", gap=25)
+
+    pdf.save()
+
+
+def render_orders_pdf(output, params):
+    pdf = PdfWriter(output, "Λίστα Παραγγελιών")
+    pdf.font("Helvetica", 10)
+    orders = Order.objects.order_by('id').values_list(
+        'id', 'date', 'customer__first_name', 'customer__last_name', 'total', 'paid', 'remaining')
+
+    for pk, date, first_name, last_name, total, paid, remaining in orders.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        pdf.line(50, f"ID: {pk} | Ημερομηνία: {date} | Πελάτης: {first_name} {last_name}")
+        pdf.line(70, f"Ποσό: {total} €  |  Πληρωμένο: {paid} €  | Υπόλοιπο: {remaining} €", gap=25)
+
+    pdf.save()
+
+
+def render_payments_pdf(output, params):
+    pdf = PdfWriter(output, "Λίστα Πληρωμών")
+    pdf.font("Helvetica", 10)
+    payments = Payment.objects.order_by('id').values_list('id', 'date', 'amount', 'order_id')
+
+    for pk, date, amount, order_id in payments.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        pdf.line(50, f"ID: {pk} | Ημερομηνία: {date}")
+        pdf.line(70, f"Ποσό: {amount} € | Παραγγελία #{order_id}", gap=25)
+
+    pdf.save()
+
+
+def render_summary_pdf(output, params):
+    day = datetime.date.fromisoformat(params['date'])
+    total_sales = Order.objects.filter(date=day).aggregate(total=Sum('total'))['total'] or 0
+    total_payments = Payment.objects.filter(date=day).aggregate(total=Sum('amount'))['total'] or 0
+    top_debtors = [(customer_name(row), row['debt']) for row in customer_debts(limit=5)]
+
+    pdf = PdfWriter(output, "Ημερήσια Σύνοψη")
+    pdf.font("Helvetica", 11)
+    pdf.line(50, f"Ημερομηνία: {day}", gap=20)
+    pdf.line(50, f"Σύνολο Πωλήσεων: {total_sales} €", gap=20)
+    pdf.line(50, f"Σύνολο Πληρωμών: {total_payments} €", gap=40)
+
+    pdf.font("Helvetica-Bold", 12)
+    pdf.line(50, "Top Χρεωμένοι Πελάτες:", gap=25)
+
+    pdf.font("Helvetica", 10)
+    for name, debt in top_debtors:
+        pdf.line(70, f"{name} - Χρέος: {debt} €", gap=20)
+
+    pdf.save()
+
+
+RENDERERS = {
+    'customers_pdf': render_customers_pdf,
+    'orders_pdf': render_orders_pdf,
+    'payments_pdf': render_payments_pdf,
+    'summary_pdf': render_summary_pdf,
+}
+
+
+def report_params(kind, params):
+    # Κρατάμε μόνο τις παραμέτρους που αφορούν τον τύπο, ώστε ίδια αιτήματα να έχουν ίδιο fingerprint
+    if kind == 'summary_pdf':
+        day = (params or {}).get('date') or datetime.date.today().isoformat()
+        datetime.date.fromisoformat(day)
+        return {'date': day}
+    return {}
+
+
+def report_fingerprint(kind, params):
+    payload = json.dumps({'kind': kind, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def lease_expired_before():
+    return timezone.now() - datetime.timedelta(seconds=settings.REPORT_LEASE_SECONDS)
+
+
+def submit_report(kind, params=None, user=None):
+    """Βάζει αναφορά στην ουρά ή επιστρέφει ίδια αναφορά που είναι ακόμα φρέσκια.
+
+    Αναφορά σε εξέλιξη πέρα από το lease δεν επαναχρησιμοποιείται: ο worker
+    της έχει σταματήσει, οπότε σημειώνεται αποτυχημένη και μπαίνει νέα στην ουρά.
+    Επιστρέφει (job, created).
+    """
+    params = params or {}
+    fingerprint = report_fingerprint(kind, params)
+    now = timezone.now()
+    fresh_since = now - datetime.timedelta(seconds=settings.REPORT_FRESHNESS_SECONDS)
+    expired = lease_expired_before()
+
+    same = ReportJob.objects.filter(fingerprint=fingerprint)
+    same.filter(status=ReportJob.RUNNING, started_at__lt=expired).update(
+        status=ReportJob.FAILED, error=STALE_ERROR, finished_at=now,
+    )
+    existing = (
+        same.filter(
+            Q(status=ReportJob.PENDING)
+            | Q(status=ReportJob.RUNNING, started_at__gte=expired)
+            | Q(status=ReportJob.DONE, finished_at__gte=fresh_since)
+        )
+        .order_by('-created_at')
+        .first()
+    )
+    if existing:
+        return existing, False
+
+    job = ReportJob.objects.create(kind=kind, params=params, fingerprint=fingerprint, requested_by=user)
+    return job, True
+
+
+def claim_next_job():
+    # skip_locked: πολλοί workers μπορούν να τρέχουν παράλληλα χωρίς να παίρνουν την ίδια δουλειά
+    now = timezone.now()
+    expired = lease_expired_before()
+    with transaction.atomic():
+        # Δουλειές που έμειναν "σε εξέλιξη" πέρα από το lease και έχουν εξαντλήσει τις προσπάθειες
+        ReportJob.objects.filter(
+            status=ReportJob.RUNNING, started_at__lt=expired, attempts__gte=settings.REPORT_MAX_ATTEMPTS,
+        ).update(status=ReportJob.FAILED, error=STALE_ERROR, finished_at=now)
+
+        job = (
+            ReportJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=ReportJob.PENDING) | Q(status=ReportJob.RUNNING, started_at__lt=expired))
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ReportJob.RUNNING
+        job.started_at = now
+        job.attempts += 1
+        job.save(update_fields=['status', 'started_at', 'attempts'])
+    return job
+
+
+def run_job(job):
+    try:
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as output:
+            RENDERERS[job.kind](output, job.params)
+            output.seek(0)
+            job.file.save(f"{job.kind}-{job.id}.pdf", File(output), save=False)
+        job.status = ReportJob.DONE
+    except Exception as exc:
+        job.status = ReportJob.FAILED
+        job.error = str(exc)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['file', 'status', 'error', 'finished_at'])
+    return job
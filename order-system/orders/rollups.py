@@ -0,0 +1,117 @@
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .balances import MONEY
+from .models import DailyItemSales, Item, OrderItem
+
+
+def _aggregate(lines):
+    return (
+        lines.values('order__date', 'item_id')
+        .annotate(
+            total_quantity=Sum('quantity'),
+            total_revenue=Sum('line_total', output_field=MONEY),
+            orders=Count('order', distinct=True),
+        )
+        .order_by()
+    )
+
+
+def _lock_items(item_ids):
+    # Κάθε εγγραφή στο DailyItemSales γίνεται με κλειδωμένο το είδος (σταθερή σειρά, χωρίς
+    # deadlock)· σε READ COMMITTED ό,τι διαβαστεί μετά το κλείδωμα έχει νέο snapshot
+    list(Item.objects.select_for_update().filter(pk__in=item_ids).order_by('pk').values_list('pk', flat=True))
+
+
+def refresh_sales_rollup(keys):
+    """Ξαναϋπολογίζει τις γραμμές (ημερομηνία, είδος) που επηρεάστηκαν από μια αλλαγή.
+
+    Το άθροισμα υπολογίζεται αφού κλειδωθούν τα είδη, ώστε δύο ταυτόχρονες
+    αλλαγές στο ίδιο κλειδί να μη γράψουν η μία πάνω στην άλλη παλιό σύνολο.
+    """
+    keys = {(day, item_id) for day, item_id in keys if day is not None and item_id is not None}
+    if not keys:
+        return
+    with transaction.atomic():
+        _lock_items({item_id for _, item_id in keys})
+        for day, item_id in sorted(keys):
+            rows = list(_aggregate(OrderItem.objects.filter(order__date=day, item_id=item_id)))
+            if rows:
+                row = rows[0]
+                DailyItemSales.objects.update_or_create(date=day, item_id=item_id, defaults={
+                    'quantity': row['total_quantity'],
+                    'revenue': row['total_revenue'],
+                    'order_count': row['orders'],
+                })
+            else:
+                DailyItemSales.objects.filter(date=day, item_id=item_id).delete()
+
+
+def add_sales(lines):
+    """Προσθέτει στα συγκεντρωτικά τις γραμμές νέων παραγγελιών (bulk δημιουργία).
+
+    lines: (ημερομηνία, order_id, item_id, quantity, line_total). Υπολογίζει τις
+    διαφορές ανά (ημερομηνία, είδος) και τις προσθέτει στις υπάρχουσες γραμμές με
+    ένα INSERT ... ON CONFLICT DO UPDATE, χωρίς να σβήσει τίποτα· τα είδη
+    κλειδώνονται πρώτα, οπότε οι τιμές που διαβάζονται είναι οι τρέχουσες.
+    """
+    deltas = {}
+    for day, order_id, item_id, quantity, line_total in lines:
+        delta = deltas.setdefault((day, item_id), {'quantity': 0, 'revenue': 0, 'orders': set()})
+        delta['quantity'] += quantity
+        delta['revenue'] += line_total
+        delta['orders'].add(order_id)
+    if not deltas:
+        return 0
+
+    with transaction.atomic():
+        _lock_items({item_id for _, item_id in deltas})
+        existing = {
+            (row.date, row.item_id): row
+            for row in DailyItemSales.objects.filter(
+                date__in={day for day, _ in deltas}, item__in={item_id for _, item_id in deltas},
+            )
+        }
+        rows = []
+        for (day, item_id), delta in sorted(deltas.items()):
+            current = existing.get((day, item_id))
+            rows.append(DailyItemSales(
+                date=day,
+                item_id=item_id,
+                quantity=delta['quantity'] + (current.quantity if current else 0),
+                revenue=delta['revenue'] + (current.revenue if current else 0),
+                order_count=len(delta['orders']) + (current.order_count if current else 0),
+            ))
+        DailyItemSales.objects.bulk_create(
+            rows, batch_size=1000, update_conflicts=True,
+            unique_fields=['date', 'item'], update_fields=['quantity', 'revenue', 'order_count'],
+        )
+    return len(rows)
+
+
+def rebuild_sales_rollup(since=None, until=None, items=None):
+    """Ξαναχτίζει τα συγκεντρωτικά για ένα διάστημα (ή όλο το ιστορικό) με ένα GROUP BY."""
+    lines = OrderItem.objects.all()
+    rollup = DailyItemSales.objects.all()
+    if since:
+        lines = lines.filter(order__date__gte=since)
+        rollup = rollup.filter(date__gte=since)
+    if until:
+        lines = lines.filter(order__date__lte=until)
+        rollup = rollup.filter(date__lte=until)
+    if items is not None:
+        lines = lines.filter(item__in=items)
+        rollup = rollup.filter(item__in=items)
+
+    with transaction.atomic():
+        rollup.delete()
+        rows = DailyItemSales.objects.bulk_create((
+            DailyItemSales(
+                date=row['order__date'],
+                item_id=row['item_id'],
+                quantity=row['total_quantity'],
+                revenue=row['total_revenue'],
+                order_count=row['orders'],
+            ) for row in _aggregate(lines).iterator(chunk_size=5000)
+        ), batch_size=1000)
+    return len(rows)
@@ -0,0 +1,175 @@
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Customer, Item, Order, SearchDocument
+
+# Πίνακας FTS5 (μόνο σε SQLite) που συγχρονίζεται με triggers· βλ. migration 0011
+FTS_TABLE = 'orders_searchdocument_fts'
+
+# Ελάχιστη ομοιότητα trigram (PostgreSQL) για αποτελέσματα χωρίς ακριβές ταίριασμα· ορίζεται
+# ως pg_trgm.word_similarity_threshold σε κάθε νέα σύνδεση (βλ. signals)· η προεπιλογή είναι 0.6
+TRIGRAM_THRESHOLD = 0.3
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Πεζά, χωρίς τόνους/διαλυτικά και με σ αντί για τελικό ς (Παπαδόπουλος -> παπαδοπουλοσ)."""
+    text = unicodedata.normalize('NFD', str(text or ''))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return text.lower().replace('ς', 'σ')
+
+
+def tokens(query):
+    return TOKEN_RE.findall(normalize(query))
+
+
+def _join(*parts):
+    return ' '.join(str(part) for part in parts if part)
+
+
+def customer_document(customer):
+    label = _join(customer.first_name, customer.last_name)
+    return label, _join(label, customer.phone, customer.tax_id, customer.email)
+
+
+def item_document(item):
+    return item.name, _join(item.name, item.category, item.description)
+
+
+def order_document(order, customer_name):
+    return f"Παραγγελία #{order.pk} - {customer_name}", _join(order.pk, customer_name)
+
+
+def _documents(kind, rows):
+    return [
+        SearchDocument(kind=kind, object_id=pk, label=label[:255], text=normalize(text))
+        for pk, (label, text) in rows
+    ]
+
+
+def save_documents(documents):
+    # upsert στο (kind, object_id)· στο SQLite οι triggers ενημερώνουν και το FTS
+    SearchDocument.objects.bulk_create(
+        documents, batch_size=1000,
+        update_conflicts=True, unique_fields=['kind', 'object_id'], update_fields=['label', 'text'],
+    )
+
+
+def index_customers(customers):
+    save_documents(_documents(SearchDocument.CUSTOMER, ((c.pk, customer_document(c)) for c in customers)))
+
+
+def index_items(items):
+    save_documents(_documents(SearchDocument.ITEM, ((i.pk, item_document(i)) for i in items)))
+
+
+def index_orders(orders):
+    # orders: queryset παραγγελιών· το όνομα πελάτη έρχεται με το ίδιο query
+    rows = orders.values_list('pk', 'customer__first_name', 'customer__last_name').iterator(chunk_size=2000)
+    save_documents(_documents(SearchDocument.ORDER, (
+        (pk, order_document(Order(pk=pk), _join(first_name, last_name)))
+        for pk, first_name, last_name in rows
+    )))
+
+
+def remove_documents(kind, ids):
+    SearchDocument.objects.filter(kind=kind, object_id__in=ids).delete()
+
+
+def rebuild_index():
+    SearchDocument.objects.all().delete()
+    index_customers(Customer.objects.iterator(chunk_size=2000))
+    index_items(Item.objects.iterator(chunk_size=2000))
+    index_orders(Order.objects.all())
+    return SearchDocument.objects.count()
+
+
+def _fts_query(words):
+    # κάθε λέξη ως πρόθεμα, όλες υποχρεωτικές: "παπα"* "γιωργ"*
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def matching_documents(query, kinds=None):
+    """Έγγραφα που περιέχουν όλες τις λέξεις του query (ως προθέματα στο SQLite).
+
+    SQLite: FTS5 MATCH. PostgreSQL: LIKE ή τελεστής %> (trigram_word_similar,
+    για ορθογραφικά λάθη), που εξυπηρετούνται και οι δύο από το GIN (gin_trgm_ops)
+    index. Άλλες βάσεις: απλό contains.
+    """
+    words = tokens(query)
+    documents = SearchDocument.objects.all()
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+    if not words:
+        return documents.none()
+
+    if connection.vendor == 'sqlite':
+        matches = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (_fts_query(words),))
+        return documents.filter(id__in=matches)
+
+    contains = Q()
+    for word in words:
+        contains &= Q(text__contains=word)
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+
+        # Τελεστής (text %> query) αντί για φίλτρο σε annotation ομοιότητας, που δεν χρησιμοποιεί
+        # το index. Το όριό του είναι το TRIGRAM_THRESHOLD
+        return documents.filter(contains | Q(TrigramWordSimilar(F('text'), ' '.join(words))))
+    return documents.filter(contains)
+
+
+def search(query, kinds=None, limit=20):
+    """Αποτελέσματα ταξινομημένα κατά συνάφεια (bm25 στο SQLite, ομοιότητα trigram στην PostgreSQL)."""
+    words = tokens(query)
+    if not words:
+        return []
+
+    if connection.vendor == 'sqlite':
+        # bm25(): μικρότερο = καλύτερο
+        sql = (
+            f"SELECT d.kind, d.object_id, d.label, -bm25({FTS_TABLE}) AS rank "
+            f"FROM {FTS_TABLE} JOIN {SearchDocument._meta.db_table} d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s"
+        )
+        params = [_fts_query(words)]
+        if kinds:
+            sql += f" AND d.kind IN ({', '.join(['%s'] * len(kinds))})"
+            params += list(kinds)
+        sql += " ORDER BY rank DESC, d.kind, d.object_id LIMIT %s"
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit])
+            rows = cursor.fetchall()
+        return [
+            {"kind": kind, "object_id": object_id, "label": label, "rank": round(rank, 4)}
+            for kind, object_id, label, rank in rows
+        ]
+
+    documents = matching_documents(query, kinds)
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        # η ομοιότητα υπολογίζεται μόνο για τη σειρά των εγγράφων που βρήκε το index
+        documents = (
+            documents.annotate(similarity=TrigramWordSimilarity(' '.join(words), 'text'))
+            .order_by('-similarity', 'kind', 'object_id')
+        )
+        rank = 'similarity'
+    else:
+        documents = documents.order_by('kind', 'object_id')
+        rank = None
+    return [{
+        "kind": document.kind,
+        "object_id": document.object_id,
+        "label": document.label,
+        "rank": round(getattr(document, rank), 4) if rank else None,
+    } for document in documents[:limit]]
+
+
+def matching_ids(kind, query):
+    return matching_documents(query, [kind]).values('object_id')
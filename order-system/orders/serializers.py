@@ -1,15 +1,35 @@
 from rest_framework import serializers
 
-from .models import Customer, Item, Order, OrderItem, Payment
+from .bulk import create_orders
+from .models import Customer, Item, Order, OrderItem, Payment, ReportJob
+from .reports import RENDERERS, report_params
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+def query_param_set(request, name):
+    # ?fields=id,date&fields=total_amount -> {'id', 'date', 'total_amount'}
+    if request is None:
+        return set()
+    values = request.query_params.getlist(name)
+    return {part.strip() for value in values for part in value.split(',') if part.strip()}
+
+
+class SparseFieldsMixin:
+    # ?fields=... κρατά μόνο τα ζητούμενα πεδία του serializer της απάντησης
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = query_param_set(self.context.get('request'), 'fields')
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+class CustomerSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model=Customer
         fields='__all__'
 
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model=Item
         fields='__all__'
@@ -25,10 +45,12 @@ class OrderItemSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = OrderItem
-        fields = ['id', 'item', 'quantity', 'total_price']
+        fields = ['id', 'item', 'quantity', 'unit_price', 'line_total', 'total_price']
+        # η τιμή είναι στιγμιότυπο του καταλόγου (OrderItem.save), όχι κάτι που στέλνει ο client
+        read_only_fields = ['unit_price', 'line_total']
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     customer_name = serializers.SerializerMethodField()
 
     def get_customer_name(self, obj):
@@ -49,7 +71,7 @@ class OrderItemInlineSerializer(serializers.ModelSerializer):
         model = OrderItem
         fields = ['item', 'quantity']
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     customer = CustomerSerializer(read_only=True)
     customer_name = serializers.SerializerMethodField()
     total_amount = serializers.SerializerMethodField()
@@ -80,32 +102,92 @@ class OrderSerializer(serializers.ModelSerializer):
         return f"{obj.customer.first_name} {obj.customer.last_name}"
 
     def get_total_amount(self, obj):
-        return obj.total_amount()
+        return obj.total
 
     def get_paid_amount(self, obj):
-        return obj.paid_amount()
+        return obj.paid
 
     def get_remaining_amount(self, obj):
-        return obj.remaining_amount()
+        return obj.remaining
 
     def get_is_paid(self, obj):
-        return obj.is_paid()
+        return obj.is_paid
 
     def create(self, validated_data):
         request = self.context.get('request')
-        items_data = request.data.get('items', [])
-        customer_id = request.data.get('customer')  # <- παίρνουμε το id απευθείας
-        customer = Customer.objects.get(id=customer_id)
+        # ίδιος δρόμος με το bulk endpoint: έλεγχος ειδών/πελάτη πριν γραφτεί οτιδήποτε
+        result, = create_orders([{
+            'customer': request.data.get('customer'),
+            'items': request.data.get('items', []),
+        }])
+        if 'errors' in result:
+            raise serializers.ValidationError(result['errors'])
+        return Order.objects.with_balances().get(pk=result['id'])
 
-        order = Order.objects.create(customer=customer)
 
-        for item_data in items_data:
-            OrderItem.objects.create(
-                 order=order,
-                 item_id=item_data['item'],
-                quantity=item_data['quantity']
-           )
+class OrderListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # Επίπεδη μορφή για τη λίστα παραγγελιών· τα nested δεδομένα μόνο με ?expand=customer,items,payments
+    EXPANDABLE = ('customer', 'items', 'payments')
 
-        return order
+    customer_name = serializers.SerializerMethodField()
+    total_amount = serializers.DecimalField(source='total', max_digits=10, decimal_places=2,
+                                            coerce_to_string=False, read_only=True)
+    paid_amount = serializers.DecimalField(source='paid', max_digits=10, decimal_places=2,
+                                           coerce_to_string=False, read_only=True)
+    remaining_amount = serializers.DecimalField(source='remaining', max_digits=10, decimal_places=2,
+                                                coerce_to_string=False, read_only=True)
 
-   
+    class Meta:
+        model = Order
+        fields = [
+            'id',
+            'customer',
+            'customer_name',
+            'date',
+            'total_amount',
+            'paid_amount',
+            'remaining_amount',
+            'is_paid',
+        ]
+        read_only_fields = fields
+
+    def __init__(self, *args, **kwargs):
+        expand = query_param_set(kwargs.get('context', {}).get('request'), 'expand')
+        super().__init__(*args, **kwargs)
+        if 'customer' in expand:
+            self.fields['customer'] = CustomerSerializer(read_only=True)
+        if 'items' in expand:
+            self.fields['items'] = OrderItemSerializer(many=True, read_only=True)
+        if 'payments' in expand:
+            self.fields['payments'] = PaymentSerializer(many=True, read_only=True)
+
+    def get_customer_name(self, obj):
+        return f"{obj.customer.first_name} {obj.customer.last_name}"
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = ['id', 'kind', 'params', 'status', 'error', 'created_at', 'finished_at', 'download_url']
+        read_only_fields = ['status', 'error', 'created_at', 'finished_at']
+
+    def get_download_url(self, obj):
+        if obj.status != ReportJob.DONE:
+            return None
+        request = self.context.get('request')
+        url = f"/api/reports/{obj.id}/download/"
+        return request.build_absolute_uri(url) if request else url
+
+    def validate_kind(self, value):
+        if value not in RENDERERS:
+            raise serializers.ValidationError(f"Άγνωστος τύπος αναφοράς. Επιλογές: {', '.join(RENDERERS)}")
+        return value
+
+    def validate(self, attrs):
+        try:
+            attrs['params'] = report_params(attrs['kind'], attrs.get('params'))
+        except ValueError:
+            raise serializers.ValidationError({"params": "Λάθος μορφή ημερομηνίας"})
+        return attrs
@@ -0,0 +1,189 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import autocomplete
+from .authentication import forget_tokens, forget_user_tokens
+from .balances import refresh_order_balances
+from .cache import bump_versions, month_topic
+from .models import (Customer, DailyItemSales, Item, Order, OrderItem, Payment,
+                     SearchDocument)
+from .rollups import refresh_sales_rollup
+from .search import (TRIGRAM_THRESHOLD, index_customers, index_items,
+                     index_orders, remove_documents)
+
+
+@receiver(pre_save, sender=OrderItem)
+@receiver(pre_save, sender=Payment)
+def remember_previous_order(sender, instance, **kwargs):
+    # Αν μετακινηθεί γραμμή/πληρωμή σε άλλη παραγγελία, ενημερώνουμε και την παλιά
+    instance._previous_order_id = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_order_id = (
+            sender.objects.filter(pk=instance.pk).values_list('order_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_save, sender=Payment)
+def update_balance_on_save(sender, instance, **kwargs):
+    refresh_order_balances({instance.order_id, getattr(instance, '_previous_order_id', None)})
+
+
+@receiver(post_delete, sender=OrderItem)
+@receiver(post_delete, sender=Payment)
+def update_balance_on_delete(sender, instance, origin=None, **kwargs):
+    # Όταν διαγράφεται η ίδια η παραγγελία δεν υπάρχει κάτι να ενημερωθεί
+    if isinstance(origin, Order):
+        return
+    refresh_order_balances({instance.order_id})
+
+
+# Ενημέρωση του πίνακα DailyItemSales για το (ημερομηνία, είδος) κάθε γραμμής
+def _sales_key(instance):
+    order = instance._state.fields_cache.get('order')
+    if order is None or order.pk != instance.order_id:
+        order = Order.objects.filter(pk=instance.order_id).only('date').first()
+    return (order.date if order else None, instance.item_id)
+
+
+@receiver(pre_save, sender=OrderItem)
+def remember_previous_sales_key(sender, instance, **kwargs):
+    instance._previous_sales_key = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_sales_key = (
+            OrderItem.objects.filter(pk=instance.pk).values_list('order__date', 'item_id').first()
+        )
+
+
+def _bump_sales_months(days):
+    topics = {month_topic(day) for day in days if day}
+    if topics:
+        transaction.on_commit(lambda: bump_versions(*topics))
+
+
+@receiver(post_save, sender=OrderItem)
+def update_sales_rollup_on_save(sender, instance, **kwargs):
+    keys = {_sales_key(instance), getattr(instance, '_previous_sales_key', None)} - {None}
+    refresh_sales_rollup(keys)
+    _bump_sales_months(day for day, _ in keys)
+
+
+@receiver(post_delete, sender=OrderItem)
+def update_sales_rollup_on_delete(sender, instance, **kwargs):
+    # Εδώ χρειάζεται και όταν διαγράφεται η παραγγελία (οι γραμμές σβήνονται πρώτες)
+    key = _sales_key(instance)
+    refresh_sales_rollup([key])
+    _bump_sales_months([key[0]])
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_sales_month(sender, instance, **kwargs):
+    # π.χ. αλλαγή πελάτη σε παλιά παραγγελία (φίλτρο customer της αναφοράς πωλήσεων)
+    _bump_sales_months([instance.date])
+
+
+@receiver(pre_save, sender=Item)
+def remember_previous_item_name(sender, instance, **kwargs):
+    instance._previous_name = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_name = Item.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+
+
+@receiver(post_save, sender=Item)
+def invalidate_sales_months_on_rename(sender, instance, created, **kwargs):
+    # Η αναφορά πωλήσεων κλειστού μήνα κρατά τα ονόματα των ειδών: μετονομασία ακυρώνει
+    # όλους τους μήνες όπου πουλήθηκε το είδος
+    if not created and instance._previous_name != instance.name:
+        _bump_sales_months(DailyItemSales.objects.filter(item=instance).dates('date', 'month'))
+
+
+# Ευρετήριο αναζήτησης (SearchDocument)
+@receiver(pre_save, sender=Customer)
+def remember_previous_name(sender, instance, **kwargs):
+    instance._previous_name = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_name = (
+            Customer.objects.filter(pk=instance.pk).values_list('first_name', 'last_name').first()
+        )
+
+
+@receiver(post_save, sender=Customer)
+def index_customer(sender, instance, created, **kwargs):
+    index_customers([instance])
+    autocomplete.index_customers([instance])
+    # Το όνομα του πελάτη είναι μέρος του κειμένου των παραγγελιών του
+    if not created and instance._previous_name != (instance.first_name, instance.last_name):
+        index_orders(Order.objects.filter(customer=instance))
+
+
+@receiver(post_save, sender=Item)
+def index_item(sender, instance, **kwargs):
+    index_items([instance])
+    autocomplete.index_items([instance])
+
+
+@receiver(post_save, sender=Order)
+def index_order(sender, instance, **kwargs):
+    index_orders(Order.objects.filter(pk=instance.pk))
+
+
+SEARCH_KINDS = {
+    Customer: SearchDocument.CUSTOMER,
+    Item: SearchDocument.ITEM,
+    Order: SearchDocument.ORDER,
+}
+
+
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Item)
+@receiver(post_delete, sender=Order)
+def remove_search_document(sender, instance, **kwargs):
+    remove_documents(SEARCH_KINDS[sender], [instance.pk])
+    if sender is not Order:
+        autocomplete.remove_terms(SEARCH_KINDS[sender], [instance.pk])
+
+
+# Cache της πιστοποίησης με token (CachedTokenAuthentication)
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def forget_cached_token(sender, instance, **kwargs):
+    key = instance.key
+    transaction.on_commit(lambda: forget_tokens([key]))
+
+
+@receiver(post_save, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    # αλλαγή κωδικού, απενεργοποίηση κτλ.: ο χρήστης ξαναδιαβάζεται από τη βάση
+    transaction.on_commit(lambda: forget_user_tokens(instance.pk))
+
+
+# Ακύρωση των cached απαντήσεων: κάθε εγγραφή αυξάνει την έκδοση των θεμάτων που επηρεάζει
+CACHE_TOPICS = {
+    Order: ('orders',),
+    OrderItem: ('orders',),
+    Payment: ('payments', 'orders'),
+    Customer: ('customers',),
+    Item: ('items', 'orders'),
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cached_responses(sender, **kwargs):
+    topics = CACHE_TOPICS.get(sender)
+    if topics:
+        # μετά το commit, ώστε κανείς να μη γεμίσει τη νέα έκδοση με παλιά δεδομένα
+        transaction.on_commit(lambda: bump_versions(*topics))
+
+
+@receiver(connection_created)
+def set_trigram_threshold(sender, connection, **kwargs):
+    # Όριο του τελεστή %> της αναζήτησης· ως literal, γιατί το SET δεν δέχεται παραμέτρους
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'SET pg_trgm.word_similarity_threshold = {float(TRIGRAM_THRESHOLD)}')
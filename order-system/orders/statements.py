@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.db import connection
+
+from .models import Order, Payment
+
+CENTS = Decimal('0.01')
+
+# Παραγγελίες (χρέωση) και πληρωμές (πίστωση) του πελάτη σε μία χρονολογική
+# σειρά· το τρέχον υπόλοιπο και το σύνολο γραμμών βγαίνουν με window functions
+# πάνω σε όλη την καρτέλα και μετά κόβεται η σελίδα.
+STATEMENT_SQL = """
+WITH ledger AS (
+    SELECT o.date AS entry_date, 0 AS kind, o.id AS entry_id, o.id AS order_id,
+           o.total AS debit, 0 AS credit
+    FROM {orders} o
+    WHERE o.customer_id = %s
+    UNION ALL
+    SELECT p.date, 1, p.id, p.order_id, 0, p.amount
+    FROM {payments} p
+    INNER JOIN {orders} o ON o.id = p.order_id
+    WHERE o.customer_id = %s
+), running AS (
+    SELECT entry_date, kind, entry_id, order_id, debit, credit,
+           SUM(debit - credit) OVER (
+               ORDER BY entry_date, kind, entry_id ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+           ) AS balance,
+           SUM(debit - credit) OVER () AS closing_balance,
+           COUNT(*) OVER () AS total_rows
+    FROM ledger
+)
+SELECT entry_date, kind, entry_id, order_id, debit, credit, balance, closing_balance, total_rows
+FROM running
+ORDER BY entry_date, kind, entry_id
+LIMIT %s OFFSET %s
+"""
+
+
+def _money(value):
+    return Decimal(str(value or 0)).quantize(CENTS)
+
+
+def customer_statement(customer_id, page=1, page_size=50):
+    """Σελίδα της καρτέλας πελάτη με τρέχον υπόλοιπο ανά γραμμή.
+
+    Επιστρέφει επίσης το υπόλοιπο πριν από την πρώτη γραμμή της σελίδας
+    (opening_balance) και το τελικό υπόλοιπο όλης της καρτέλας.
+    """
+    sql = STATEMENT_SQL.format(orders=Order._meta.db_table, payments=Payment._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [customer_id, customer_id, page_size, (page - 1) * page_size])
+        rows = cursor.fetchall()
+
+    entries = []
+    for entry_date, kind, entry_id, order_id, debit, credit, balance, _, _ in rows:
+        entries.append({
+            "date": entry_date,
+            "type": 'payment' if kind else 'order',
+            "id": entry_id,
+            "order": order_id,
+            "debit": _money(debit),
+            "credit": _money(credit),
+            "balance": _money(balance),
+        })
+
+    count = rows[0][8] if rows else 0
+    closing = _money(rows[0][7]) if rows else None
+    opening = entries[0]['balance'] - entries[0]['debit'] + entries[0]['credit'] if entries else None
+    return {
+        "count": count,
+        "page": page,
+        "page_size": page_size,
+        "opening_balance": opening,
+        "closing_balance": closing,
+        "results": entries,
+    }
@@ -0,0 +1,153 @@
+import datetime
+
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from .debts import customer_debts, customer_name
+from .models import DailyItemSales, Order, OrderItem, Payment
+
+BUCKETS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def sales_series(since, until, bucket='day'):
+    """Πωλήσεις, πληρωμές, πλήθος και μέση αξία παραγγελίας ανά διάστημα (day/week/month).
+
+    Δύο GROUP BY (παραγγελίες, πληρωμές) που ενώνονται ανά περίοδο· περίοδοι
+    χωρίς κίνηση δεν επιστρέφονται.
+    """
+    trunc = BUCKETS[bucket]
+    orders = (
+        Order.objects.filter(date__gte=since, date__lte=until)
+        .annotate(period=trunc('date')).values('period')
+        .annotate(sales=Sum('total'), orders=Count('id'), average=Avg('total'))
+        .order_by()
+    )
+    payments = (
+        Payment.objects.filter(date__gte=since, date__lte=until)
+        .annotate(period=trunc('date')).values('period')
+        .annotate(amount=Sum('amount'))
+        .order_by()
+    )
+
+    series = {}
+    for row in orders:
+        series[row['period']] = {
+            "period": row['period'],
+            "sales": row['sales'],
+            "orders": row['orders'],
+            "average_order": round(row['average'], 2),
+            "payments": 0,
+        }
+    for row in payments:
+        entry = series.setdefault(row['period'], {
+            "period": row['period'], "sales": 0, "orders": 0, "average_order": 0, "payments": 0,
+        })
+        entry['payments'] = row['amount']
+    return [series[period] for period in sorted(series)]
+
+
+def item_sales(since, until):
+    # Ποσότητα και τζίρος ανά είδος από τον πίνακα DailyItemSales
+    return (
+        DailyItemSales.objects.filter(date__gte=since, date__lte=until)
+        .values('item__name', 'item__category')
+        .annotate(quantity=Sum('quantity'), total=Sum('revenue'))
+        .order_by('-total', 'item__name')
+    )
+
+
+def sales_report(since=None, until=None, customer_id=None):
+    # Σύνολα παραγγελιών και πωλήσεις ανά είδος (ένα GROUP BY πάνω στις γραμμές)
+    orders = Order.objects.all()
+    if since:
+        orders = orders.filter(date__gte=since)
+    if until:
+        orders = orders.filter(date__lte=until)
+    if customer_id:
+        orders = orders.filter(customer_id=customer_id)
+
+    totals = orders.aggregate(total=Sum('total'), count=Count('id'))
+    items = (
+        OrderItem.objects.filter(order__in=orders)
+        .values('item__name')
+        .annotate(quantity=Sum('quantity'), total=Sum('line_total'))
+        .order_by('item__name')
+    )
+    return {
+        "total_sales": totals['total'] or 0,
+        "total_orders": totals['count'],
+        "items": [{
+            "name": row['item__name'],
+            "quantity": row['quantity'],
+            "total": row['total'],
+        } for row in items],
+    }
+
+
+def dashboard_snapshot(day=None, limit=5):
+    """Όλα τα στοιχεία της αρχικής σελίδας με σταθερό πλήθος queries (έξι).
+
+    Σύνολα ημέρας και ανεξόφλητων σε ένα aggregate, πωλήσεις ανά είδος από το
+    DailyItemSales και μόνο οι στήλες που εμφανίζονται για τις ανεξόφλητες.
+    """
+    day = day or datetime.date.today()
+    today = Q(date=day)
+    unpaid = Q(is_paid=False)
+    orders = Order.objects.filter(today | unpaid).aggregate(
+        orders=Count('id', filter=today),
+        sales=Sum('total', filter=today),
+        unpaid_orders=Count('id', filter=unpaid),
+        unpaid_amount=Sum('remaining', filter=unpaid),
+    )
+    payments = Payment.objects.filter(date=day).aggregate(count=Count('id'), total=Sum('amount'))
+    day_items = (
+        DailyItemSales.objects.filter(date=day)
+        .values('item__name')
+        .annotate(quantity=Sum('quantity'), total=Sum('revenue'))
+        .order_by('-total', 'item__name')
+    )
+    top_items = (
+        DailyItemSales.objects.values('item__name')
+        .annotate(sold=Sum('quantity'))
+        .order_by('-sold', 'item__name')[:limit]
+    )
+    recent_unpaid = (
+        Order.objects.filter(unpaid)
+        .values('id', 'date', 'total', 'remaining', 'customer__first_name', 'customer__last_name')
+        .order_by('-date', '-id')[:limit]
+    )
+
+    return {
+        "date": day,
+        "today": {
+            "orders": orders['orders'],
+            "sales": orders['sales'] or 0,
+            "payments": payments['count'],
+            "payments_total": payments['total'] or 0,
+            "items": [{
+                "name": row['item__name'],
+                "quantity": row['quantity'],
+                "total": row['total'],
+            } for row in day_items],
+        },
+        "unpaid": {
+            "orders": orders['unpaid_orders'],
+            "amount": orders['unpaid_amount'] or 0,
+            "recent": [{
+                "id": row['id'],
+                "date": row['date'],
+                "customer": customer_name(row),
+                "total_amount": row['total'],
+                "remaining_amount": row['remaining'],
+            } for row in recent_unpaid],
+        },
+        "top_items": [{"name": row['item__name'], "sold": row['sold']} for row in top_items],
+        "top_debtors": [{
+            "customer": customer_name(row),
+            "debt": row['debt'],
+        } for row in customer_debts(limit=limit)],
+    }
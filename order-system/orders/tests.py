@@ -1,3 +1,1074 @@
-from django.test import TestCase
+import base64
+import datetime
+import io
+import json
+import os
+import re
+import tempfile
+import time
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .authentication import CachedTokenAuthentication
+from .budgets import QueryBudgetExceeded, view_budget
+from .cache import bump_versions, cache_stats, record_outcome, topic_versions
+from .datagen import generate
+from .imports import import_payments
+from .management.commands.benchmark import discover_routes
+from .models import (AutocompleteTerm, Customer, DailyItemSales, Item, Order,
+                     OrderItem, Payment, ReportJob, SearchDocument)
+from .reports import claim_next_job, submit_report
+from .search import normalize, tokens
+from .views import ItemViewSet, OrderViewSet, PaymentViewSet
+
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'}}
+
+# Δύο μεγέθη δεδομένων: ένα N+1 περνά στο μικρό αλλά ξεπερνά το όριο στο μεγάλο
+SIZES = [
+    dict(customers=10, items=5, orders=40, seed=1),
+    dict(customers=60, items=30, orders=400, seed=2),
+]
+
+
+@override_settings(CACHES=TEST_CACHES, REQUEST_INSTRUMENTATION=True, QUERY_BUDGET_MODE='raise')
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user('budget', password='budget', is_staff=True)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}')
+
+    def get_routes(self):
+        for name, path, params in discover_routes():
+            # κρύα cache σε κάθε request: μετράμε και το authentication και τα cached endpoints
+            cache.clear()
+            yield name, path, self.client.get(path, params)
+
+    def test_every_get_route_declares_a_budget(self):
+        generate(**SIZES[0])
+        for name, path, _ in discover_routes():
+            with self.subTest(route=name):
+                match = resolve(path)
+                self.assertIsNotNone(view_budget(match.func, 'GET'), f"{name} χωρίς query_budget")
+
+    def test_budgets_hold_at_two_sizes(self):
+        for size in SIZES:
+            generate(**size)
+            for name, path, response in self.get_routes():
+                with self.subTest(size=size['orders'], route=name):
+                    self.assertLess(response.status_code, 500)
+
+    def test_exceeded_budget_raises(self):
+        generate(**SIZES[0])
+        with mock.patch.dict(PaymentViewSet.query_budgets, {'list': 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/api/payments/')
+
+    @override_settings(QUERY_BUDGET_MODE='warn')
+    def test_warn_mode_logs(self):
+        generate(**SIZES[0])
+        with mock.patch.dict(PaymentViewSet.query_budgets, {'list': 0}):
+            with self.assertLogs('orders.performance', 'WARNING') as logs:
+                response = self.client.get('/api/payments/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('"budget": 0', logs.output[0])
+
+
+class ImportPaymentsTests(TestCase):
+    def setUp(self):
+        customer = Customer.objects.create(first_name='Νίκος', last_name='Παπάς', tax_id='1', phone='1')
+        item = Item.objects.create(name='Γάλα', price=Decimal('10.00'))
+        self.orders = [Order.objects.create(customer=customer) for _ in range(3)]
+        for order in self.orders:
+            OrderItem.objects.create(order=order, item=item, quantity=2)
+
+    def test_invalid_order_ids_are_row_errors(self):
+        bad = ['inf', '-inf', 'nan', '1e30', str(2 ** 70), '99999999999999999999999', '12.5', '-3', '0', 'abc', '']
+        rows = [('order', 'amount')] + [(value, '5') for value in bad]
+        report = import_payments(rows)
+        self.assertEqual(report['imported'], 0)
+        self.assertEqual(report['failed'], len(bad))
+        self.assertEqual({error['error'] for error in report['errors']}, {"Μη έγκυρος αριθμός παραγγελίας"})
+
+    def test_upload_with_oversized_id_is_not_a_server_error(self):
+        user = User.objects.create_user('import', password='import')
+        client = APIClient()
+        client.force_authenticate(user)
+        upload = SimpleUploadedFile('payments.csv', f'order,amount\ninf,5\n{2 ** 70},5\n'.encode())
+        response = client.post('/api/payments/import/', {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['failed'], 2)
+
+    def test_chunked_import(self):
+        first, second, third = self.orders
+        rows = [
+            ('παραγγελία', 'ποσό', 'σημειώσεις'),
+            (f'#{first.pk}', '5,50', 'μετρητά'),
+            (float(second.pk), 20, None),
+            (third.pk, '3', ''),
+            (999999, '1', None),
+            (first.pk, '2', None),
+        ]
+        report = import_payments(rows, chunk_size=2)
+        self.assertEqual(report['imported'], 4)
+        self.assertEqual(report['errors'], [{"row": 5, "error": "Η παραγγελία #999999 δεν βρέθηκε"}])
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.paid, Decimal('7.50'))
+        self.assertEqual(first.remaining, Decimal('12.50'))
+        self.assertTrue(second.is_paid)
+        self.assertEqual(Payment.objects.get(order=first, amount=Decimal('5.50')).notes, 'μετρητά')
+
+
+class OrderItemPriceTests(TestCase):
+    def setUp(self):
+        customer = Customer.objects.create(first_name='Νίκος', last_name='Παπάς', tax_id='1', phone='1')
+        self.item = Item.objects.create(name='Γάλα', price=Decimal('10.00'))
+        self.order = Order.objects.create(customer=customer)
+        self.line = OrderItem.objects.create(order=self.order, item=self.item, quantity=2)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('prices', password='prices'))
+
+    def test_put_without_unit_price(self):
+        response = self.client.put(f'/api/order-items/{self.line.pk}/', {'quantity': 3}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['unit_price'], '10.00')
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total, Decimal('30.00'))
+
+    def test_unit_price_cannot_be_rewritten(self):
+        response = self.client.patch(f'/api/order-items/{self.line.pk}/', {'unit_price': '0.01'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.line.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual(self.line.unit_price, Decimal('10.00'))
+        self.assertEqual(self.order.total, Decimal('20.00'))
+
+    def test_catalog_price_change_keeps_snapshot(self):
+        self.item.price = Decimal('12.00')
+        self.item.save()
+        self.line.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual(self.line.line_total, Decimal('20.00'))
+        self.assertEqual(self.order.total, Decimal('20.00'))
+
+
+class OrderBalanceTests(TestCase):
+    def setUp(self):
+        customer = Customer.objects.create(first_name='Νίκος', last_name='Παπάς', tax_id='1', phone='1')
+        self.milk = Item.objects.create(name='Γάλα', price=Decimal('2.50'))
+        self.cheese = Item.objects.create(name='Φέτα', price=Decimal('8.00'))
+        self.order = Order.objects.create(customer=customer)
+        self.other = Order.objects.create(customer=customer)
+
+    def assertBalance(self, order, total, paid):
+        order.refresh_from_db()
+        total, paid = Decimal(total), Decimal(paid)
+        self.assertEqual((order.total, order.paid, order.remaining), (total, paid, total - paid))
+        self.assertEqual(order.is_paid, total - paid <= 0)
+
+    def test_items(self):
+        line = OrderItem.objects.create(order=self.order, item=self.milk, quantity=4)
+        OrderItem.objects.create(order=self.order, item=self.cheese, quantity=1)
+        self.assertBalance(self.order, '18.00', '0')
+
+        line.quantity = 2
+        line.save()
+        self.assertBalance(self.order, '13.00', '0')
+
+        line.order = self.other
+        line.save()
+        self.assertBalance(self.order, '8.00', '0')
+        self.assertBalance(self.other, '5.00', '0')
+
+        line.delete()
+        self.assertBalance(self.other, '0', '0')
+
+    def test_payments(self):
+        OrderItem.objects.create(order=self.order, item=self.cheese, quantity=2)
+        OrderItem.objects.create(order=self.other, item=self.milk, quantity=2)
+        payment = Payment.objects.create(order=self.order, amount=Decimal('6.00'))
+        self.assertBalance(self.order, '16.00', '6.00')
+
+        payment.amount = Decimal('16.00')
+        payment.save()
+        self.assertBalance(self.order, '16.00', '16.00')
+
+        payment.order = self.other
+        payment.save()
+        self.assertBalance(self.order, '16.00', '0')
+        self.assertBalance(self.other, '5.00', '16.00')
+
+        payment.delete()
+        self.assertBalance(self.other, '5.00', '0')
+
+    def test_rebuild_balances_check(self):
+        OrderItem.objects.create(order=self.order, item=self.milk, quantity=2)
+        Payment.objects.create(order=self.order, amount=Decimal('1.00'))
+
+        output = io.StringIO()
+        call_command('rebuild_balances', check=True, stdout=output)
+        self.assertIn("Όλα τα υπόλοιπα είναι σωστά", output.getvalue())
+
+        Order.objects.filter(pk=self.order.pk).update(paid=Decimal('99.00'))
+        output = io.StringIO()
+        call_command('rebuild_balances', check=True, stdout=output)
+        self.assertIn(f"Παραγγελία #{self.order.pk}: λάθος υπόλοιπο", output.getvalue())
+
+        call_command('rebuild_balances', stdout=io.StringIO())
+        self.assertBalance(self.order, '5.00', '1.00')
+
+
+class CacheVersionTests(TestCase):
+    def test_versions_and_counters_survive_default_timeout(self):
+        # Το BaseCache.incr των file/db backends ξαναγράφει με το default TIMEOUT
+        with tempfile.TemporaryDirectory() as location:
+            file_cache = {'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+                'TIMEOUT': 1,
+            }}
+            with override_settings(CACHES=file_cache):
+                before = topic_versions(['orders'])
+                bump_versions('orders')
+                bumped = topic_versions(['orders'])
+                record_outcome('test', 'hits')
+                record_outcome('test', 'hits')
+                time.sleep(1.2)
+                self.assertNotEqual(before, bumped)
+                self.assertEqual(topic_versions(['orders']), bumped)
+                self.assertEqual(cache_stats(['test'])['test']['hits'], 2)
+
+
+@override_settings(REPORT_LEASE_SECONDS=60, REPORT_MAX_ATTEMPTS=2)
+class ReportQueueTests(TestCase):
+    def stale_job(self, **fields):
+        job, _ = submit_report('customers_pdf')
+        ReportJob.objects.filter(pk=job.pk).update(
+            status=ReportJob.RUNNING, started_at=timezone.now() - datetime.timedelta(minutes=5), **fields,
+        )
+        return job
+
+    def test_running_job_within_lease_is_reused(self):
+        job, _ = submit_report('customers_pdf')
+        self.assertEqual(claim_next_job(), job)
+        self.assertEqual(submit_report('customers_pdf'), (job, False))
+
+    def test_stale_running_job_is_not_reused(self):
+        stale = self.stale_job(attempts=1)
+        job, created = submit_report('customers_pdf')
+        self.assertTrue(created)
+        self.assertNotEqual(job, stale)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, ReportJob.FAILED)
+
+    def test_claim_requeues_stale_job(self):
+        stale = self.stale_job(attempts=1)
+        job = claim_next_job()
+        self.assertEqual(job, stale)
+        self.assertEqual(job.attempts, 2)
+        self.assertGreater(job.started_at, timezone.now() - datetime.timedelta(minutes=1))
+
+    def test_claim_fails_job_after_max_attempts(self):
+        stale = self.stale_job(attempts=2)
+        self.assertIsNone(claim_next_job())
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, ReportJob.FAILED)
+
+
+@override_settings(CACHES=TEST_CACHES, REQUEST_INSTRUMENTATION=True, QUERY_BUDGET_MODE='raise')
+class BatchTests(TransactionTestCase):
+    # TransactionTestCase: χωρίς ανοιχτή συναλλαγή το batch τρέχει και σε threads
+    def setUp(self):
+        cache.clear()
+        generate(**SIZES[0])
+        self.order = Order.objects.first()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('batch', password='batch'))
+
+    def post_batch(self):
+        return self.client.post('/api/batch/', {"requests": [
+            {"id": "order", "path": f"orders/{self.order.pk}/"},
+            {"id": "payments", "path": "payments/", "params": {"order": self.order.pk}},
+            "items/",
+            "missing/",
+        ]}, format='json')
+
+    def query_count(self, response):
+        return int(re.search(r'desc="(\d+) queries"', response['Server-Timing']).group(1))
+
+    def test_threaded_batch_counts_sub_request_queries(self):
+        with override_settings(BATCH_WORKERS=1):
+            sequential = self.post_batch()
+        cache.clear()
+        with override_settings(BATCH_WORKERS=3):
+            threaded = self.post_batch()
+        for response in (sequential, threaded):
+            self.assertEqual([item['status'] for item in response.data['responses']], [200, 200, 200, 404])
+            self.assertEqual(response.data['responses'][0]['body']['id'], self.order.pk)
+        self.assertGreaterEqual(self.query_count(sequential), 5)
+        self.assertGreaterEqual(self.query_count(threaded), self.query_count(sequential))
+
+    def test_batch_budget_is_sum_of_sub_request_budgets(self):
+        with mock.patch.dict(ItemViewSet.query_budgets, {'list': 0}), \
+                mock.patch.dict(PaymentViewSet.query_budgets, {'list': 0}), \
+                mock.patch.dict(OrderViewSet.query_budgets, {'retrieve': 0}):
+            for workers in (1, 3):
+                with override_settings(BATCH_WORKERS=workers), self.assertRaises(QueryBudgetExceeded):
+                    self.post_batch()
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('token', password='token')
+        self.key = Token.objects.create(user=user).key
+
+    def authenticate(self):
+        with CaptureQueriesContext(connection) as queries:
+            user, _ = CachedTokenAuthentication().authenticate_credentials(self.key)
+        self.assertEqual(user.username, 'token')
+        return len(queries)
+
+    @override_settings(CACHES=TEST_CACHES)
+    def test_cached_on_shared_backend(self):
+        cache.clear()
+        # η locmem στη θέση της Redis/Memcached, που δεν υπάρχουν στα tests
+        with mock.patch('orders.authentication.SHARED_CACHE_BACKENDS', (LocMemCache,)):
+            self.assertEqual(self.authenticate(), 1)
+            self.assertEqual(self.authenticate(), 0)
+
+    @override_settings(CACHES=TEST_CACHES)
+    def test_not_cached_on_per_process_backend(self):
+        cache.clear()
+        self.assertEqual(self.authenticate(), 1)
+        self.assertEqual(self.authenticate(), 1)
+        self.assertFalse([key for key in cache._cache if 'auth-token:' in key])
+
+    def test_not_cached_on_file_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            file_cache = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                      'LOCATION': location}}
+            with override_settings(CACHES=file_cache):
+                self.assertEqual(self.authenticate(), 1)
+                self.assertEqual(self.authenticate(), 1)
+                self.assertEqual(os.listdir(location), [])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        generate(**SIZES[0])
+        user = User.objects.create_user('conditional', password='conditional', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def test_list_validators_without_distinct(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/customers/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([query for query in queries if 'DISTINCT' in query['sql'].upper()])
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/api/customers/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Customer.objects.filter(pk=Customer.objects.order_by('-pk').first().pk).delete()
+        self.assertEqual(self.client.get('/api/customers/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_order_retrieve_tracks_items(self):
+        order = Order.objects.filter(items__isnull=False).first()
+        etag = self.client.get(f'/api/orders/{order.pk}/')['ETag']
+        item = order.items.first().item
+        item.name = f'{item.name} (νέο)'
+        item.save()
+        self.assertEqual(self.client.get(f'/api/orders/{order.pk}/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SalesReportCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        generate(**SIZES[0])
+        self.line = (
+            OrderItem.objects.filter(order__date__lt=datetime.date.today().replace(day=1))
+            .select_related('order', 'item').first()
+        )
+        self.month = f'{self.line.order.date:%Y-%m}'
+        user = User.objects.create_user('sales', password='sales', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def report(self):
+        response = self.client.get('/api/dashboard/sales_report/', {'month': self.month})
+        self.assertEqual(response.status_code, 200)
+        return {row['name']: row for row in response.data['items']}
+
+    def test_closed_month_is_cached(self):
+        self.report()
+        with CaptureQueriesContext(connection) as queries:
+            self.report()
+        self.assertEqual(len(queries), 0)
+
+    def test_line_change_invalidates_month(self):
+        before = self.report()[self.line.item.name]['quantity']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.line.quantity += 1
+            self.line.save()
+        self.assertEqual(self.report()[self.line.item.name]['quantity'], before + 1)
+
+    def test_item_rename_invalidates_month(self):
+        self.report()
+        item = self.line.item
+        with self.captureOnCommitCallbacks(execute=True):
+            item.name = f'{item.name} (νέο)'
+            item.save()
+        self.assertIn(item.name, self.report())
+
+
+class RollupAssertions:
+    def assertRollupConsistent(self):
+        expected = {
+            (row['order__date'], row['item_id']): (row['quantity'], row['revenue'], row['orders'])
+            for row in OrderItem.objects.values('order__date', 'item_id').annotate(
+                quantity=Sum('quantity'), revenue=Sum('line_total'), orders=Count('order', distinct=True),
+            ).order_by()
+        }
+        actual = {
+            (row.date, row.item_id): (row.quantity, row.revenue, row.order_count)
+            for row in DailyItemSales.objects.all()
+        }
+        self.assertEqual(actual, expected)
+
+
+class BulkOrderTests(RollupAssertions, TestCase):
+    def setUp(self):
+        generate(**SIZES[0])
+        self.customers = list(Customer.objects.values_list('pk', flat=True)[:3])
+        self.items = list(Item.objects.order_by('pk'))
+        user = User.objects.create_user('bulk', password='bulk', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def payload(self, count):
+        return [{
+            "customer": self.customers[index % len(self.customers)],
+            "items": [{"item": self.items[index % len(self.items)].pk, "quantity": index + 1},
+                      {"item": self.items[0].pk, "quantity": 2}],
+        } for index in range(count)]
+
+    def post(self, payload):
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/orders/bulk/', payload, format='json')
+        return response, len(queries)
+
+    def test_creates_orders_with_totals_and_rollup(self):
+        response, _ = self.post(self.payload(4))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 4)
+        for index, result in enumerate(response.data['results']):
+            order = Order.objects.get(pk=result['id'])
+            expected = self.items[index % len(self.items)].price * (index + 1) + self.items[0].price * 2
+            self.assertEqual(order.total, expected)
+            self.assertEqual(order.remaining, expected)
+            self.assertEqual(order.items.count(), 2)
+        sold = DailyItemSales.objects.get(date=datetime.date.today(), item=self.items[0]).quantity
+        self.assertEqual(sold, OrderItem.objects.filter(
+            order__date=datetime.date.today(), item=self.items[0]).aggregate(total=Sum('quantity'))['total'])
+
+    def test_rollup_rows_are_updated_in_place(self):
+        self.post(self.payload(3))
+        rows = dict(DailyItemSales.objects.filter(date=datetime.date.today()).values_list('item', 'pk'))
+        self.post(self.payload(5))
+        self.assertRollupConsistent()
+        updated = dict(DailyItemSales.objects.filter(date=datetime.date.today()).values_list('item', 'pk'))
+        self.assertEqual({item: updated[item] for item in rows}, rows)
+
+    def test_query_count_does_not_grow_with_batch(self):
+        # η πρώτη παραγγελία της ημέρας δεν έχει γραμμές DailyItemSales να σβήσει
+        self.post(self.payload(1))
+        _, small = self.post(self.payload(2))
+        _, large = self.post(self.payload(40))
+        self.assertEqual(small, large)
+
+    def test_invalid_orders_are_reported_per_index(self):
+        payload = self.payload(3)
+        payload[1]['items'][0]['item'] = 10 ** 9
+        payload[2]['customer'] = 'x'
+        orders = Order.objects.count()
+        response, _ = self.post(payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result.get('index') for result in response.data['results']], [0, 1, 2])
+        self.assertIn('items', response.data['results'][1]['errors'])
+        self.assertIn('customer', response.data['results'][2]['errors'])
+        self.assertEqual(Order.objects.count(), orders + 1)
+
+
+class SalesRollupTests(RollupAssertions, TestCase):
+    def setUp(self):
+        generate(**SIZES[0])
+
+    def test_generated_data(self):
+        self.assertRollupConsistent()
+
+    def test_line_changes(self):
+        line = OrderItem.objects.first()
+        line.quantity += 3
+        line.save()
+        self.assertRollupConsistent()
+
+        line.item = Item.objects.exclude(pk=line.item_id).first()
+        line.save()
+        self.assertRollupConsistent()
+
+        OrderItem.objects.create(order=line.order, item=line.item, quantity=2)
+        self.assertRollupConsistent()
+
+        line.delete()
+        self.assertRollupConsistent()
+
+    def test_same_key_twice_in_one_transaction(self):
+        line = OrderItem.objects.select_related('order').first()
+        other = Order.objects.filter(date=line.order.date).exclude(pk=line.order_id).first() or line.order
+        with transaction.atomic():
+            OrderItem.objects.create(order=line.order, item=line.item, quantity=4)
+            second = OrderItem.objects.create(order=other, item=line.item, quantity=1)
+            second.quantity = 6
+            second.save()
+        self.assertRollupConsistent()
+
+    def test_order_delete(self):
+        Order.objects.filter(items__isnull=False).first().delete()
+        self.assertRollupConsistent()
+
+    def test_rebuild_command(self):
+        DailyItemSales.objects.all().delete()
+        call_command('rebuild_sales_rollup', stdout=io.StringIO())
+        self.assertRollupConsistent()
+
+
+class OrderFilterTests(TestCase):
+    def setUp(self):
+        generate(**SIZES[1])
+        user = User.objects.create_user('filters', password='filters', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def ids(self, **params):
+        response = self.client.get('/api/orders/', params)
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.data}
+
+    def test_is_paid_and_date_filters(self):
+        since = datetime.date.today() - datetime.timedelta(days=30)
+        cases = [
+            ({'is_paid': 'false'}, Order.objects.filter(is_paid=False)),
+            ({'is_paid': 'true'}, Order.objects.filter(is_paid=True)),
+            ({'is_paid': 'false', 'date__gte': since}, Order.objects.filter(is_paid=False, date__gte=since)),
+            ({'date__lte': since}, Order.objects.filter(date__lte=since)),
+            ({'remaining_amount__gt': 10}, Order.objects.filter(remaining__gt=10)),
+        ]
+        for params, expected in cases:
+            with self.subTest(params=params):
+                ids = self.ids(**params)
+                self.assertTrue(ids)
+                self.assertEqual(ids, set(expected.values_list('pk', flat=True)))
+
+    def test_is_paid_index(self):
+        constraints = connection.introspection.get_constraints(connection.cursor(), Order._meta.db_table)
+        self.assertEqual(constraints['order_is_paid_date_idx']['columns'], ['is_paid', 'date', 'id'])
+        # το φίλτρο εφαρμόζεται στη βάση, στη στήλη του index
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/orders/', {'is_paid': 'false', 'page_size': 5})
+        self.assertTrue(any('"orders_order"."is_paid"' in query['sql'] and 'LIMIT 6' in query['sql']
+                            for query in queries))
+
+
+class CustomerStatementTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(first_name='Μαρία', last_name='Νικολάου', tax_id='1', phone='1')
+        other = Customer.objects.create(first_name='Άλλος', last_name='Πελάτης', tax_id='2', phone='2')
+        start = datetime.date(2025, 3, 1)
+        # (ημέρα, σύνολο, πληρωμές (ημέρα, ποσό)): δύο παραγγελίες και μια πληρωμή την ίδια ημέρα
+        plan = [
+            (0, '100.00', [(0, '40.00'), (5, '60.00')]),
+            (2, '55.50', []),
+            (2, '20.25', [(2, '20.25')]),
+            (7, '80.00', [(9, '30.00'), (9, '10.00')]),
+        ]
+        self.ledger = []
+        for day, total, payments in plan:
+            order = Order.objects.create(customer=self.customer)
+            for payment_day, amount in payments:
+                payment = Payment.objects.create(order=order, amount=amount)
+                Payment.objects.filter(pk=payment.pk).update(date=start + datetime.timedelta(days=payment_day))
+                self.ledger.append((start + datetime.timedelta(days=payment_day), 1, payment.pk,
+                                    Decimal('0'), Decimal(amount)))
+            # το σύνολο μετά τις πληρωμές, που ξαναϋπολογίζουν τα υπόλοιπα από τις (καμία) γραμμές
+            Order.objects.filter(pk=order.pk).update(date=start + datetime.timedelta(days=day), total=total)
+            self.ledger.append((start + datetime.timedelta(days=day), 0, order.pk, Decimal(total), Decimal('0')))
+        # παραγγελία άλλου πελάτη: δεν εμφανίζεται
+        Order.objects.filter(pk=Order.objects.create(customer=other).pk).update(total='999.00')
+
+        self.ledger.sort()
+        balance = Decimal('0')
+        self.expected = []
+        for day, kind, entry_id, debit, credit in self.ledger:
+            balance += debit - credit
+            self.expected.append({
+                "date": day, "type": 'payment' if kind else 'order', "id": entry_id,
+                "debit": debit, "credit": credit, "balance": balance,
+            })
+
+        user = User.objects.create_user('statement', password='statement', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def page(self, page, page_size):
+        return self.client.get(f'/api/customers/{self.customer.pk}/statement/', {'page': page, 'page_size': page_size})
+
+    def test_running_balance_and_pages(self):
+        page_size = 3
+        closing = self.expected[-1]['balance']
+        pages = range(1, -(-len(self.expected) // page_size) + 1)
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.page(page, page_size)
+                self.assertEqual(response.status_code, 200)
+                rows = self.expected[(page - 1) * page_size:page * page_size]
+                self.assertEqual([{key: row[key] for key in rows[0]} for row in response.data['results']], rows)
+                first = rows[0]
+                self.assertEqual(response.data['opening_balance'], first['balance'] - first['debit'] + first['credit'])
+                self.assertEqual(response.data['closing_balance'], closing)
+                self.assertEqual(response.data['count'], len(self.expected))
+        # στο όριο σελίδων 1/2 η δεύτερη συνεχίζει από το υπόλοιπο της πρώτης
+        first, second = self.page(1, page_size).data, self.page(2, page_size).data
+        self.assertEqual(second['opening_balance'], first['results'][-1]['balance'])
+        self.assertEqual(self.page(len(pages) + 1, page_size).status_code, 404)
+
+    def test_single_page(self):
+        response = self.page(1, 500)
+        self.assertEqual([row['id'] for row in response.data['results']], [row['id'] for row in self.expected])
+        self.assertEqual(response.data['opening_balance'], Decimal('0'))
+        self.assertEqual(self.page(0, 10).status_code, 400)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name='Γιώργος', last_name='Παπαδόπουλος', tax_id='123456789', phone='2101234567')
+        self.other = Customer.objects.create(first_name='Ελένη', last_name='Οικονόμου', tax_id='987654321', phone='2310000000')
+        self.feta = Item.objects.create(name='Φέτα', price='8.50')
+        self.feta_bio = Item.objects.create(
+            name='Φέτα Βιολογική', price='11.00', category='Γαλακτοκομικά',
+            description='Βαρέλι, ώριμη, από πρόβειο και κατσικίσιο γάλα')
+        self.order = Order.objects.create(customer=self.customer)
+        self.other_order = Order.objects.create(customer=self.other)
+        user = User.objects.create_user('search', password='search', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def document(self, kind, pk):
+        return SearchDocument.objects.filter(kind=kind, object_id=pk).first()
+
+    def search(self, **params):
+        response = self.client.get('/api/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_normalize(self):
+        self.assertEqual(normalize('Παπαδόπουλος'), 'παπαδοπουλοσ')
+        self.assertEqual(normalize('Ϊ ΰ Άρτος'), 'ι υ αρτοσ')
+        self.assertEqual(tokens('ΦΈΤΑ, βιολογικός!'), ['φετα', 'βιολογικοσ'])
+
+    def test_accent_and_final_sigma_folding(self):
+        for query in ('Παπαδόπουλος', 'παπαδοπουλοσ', 'ΠΑΠΑΔΟΠΟΥΛΟΣ', 'παπαδ'):
+            with self.subTest(query=query):
+                found = {(row['kind'], row['object_id']) for row in self.search(q=query)}
+                self.assertIn((SearchDocument.CUSTOMER, self.customer.pk), found)
+                self.assertIn((SearchDocument.ORDER, self.order.pk), found)
+                self.assertNotIn((SearchDocument.CUSTOMER, self.other.pk), found)
+
+    def test_documents_follow_signals(self):
+        document = self.document(SearchDocument.CUSTOMER, self.customer.pk)
+        self.assertEqual(document.label, 'Γιώργος Παπαδόπουλος')
+        self.assertIn('123456789', document.text)
+        self.assertEqual(self.document(SearchDocument.ITEM, self.feta.pk).text, 'φετα')
+        self.assertEqual(self.document(SearchDocument.ORDER, self.order.pk).label,
+                         f'Παραγγελία #{self.order.pk} - Γιώργος Παπαδόπουλος')
+
+        self.feta.name = 'Κασέρι'
+        self.feta.save()
+        self.assertEqual(self.document(SearchDocument.ITEM, self.feta.pk).text, 'κασερι')
+
+        for kind, instance in ((SearchDocument.ORDER, self.other_order), (SearchDocument.ITEM, self.feta),
+                               (SearchDocument.CUSTOMER, self.other)):
+            pk = instance.pk
+            instance.delete()
+            self.assertIsNone(self.document(kind, pk))
+
+    def test_customer_rename_reindexes_orders(self):
+        self.customer.last_name = 'Σταθόπουλος'
+        self.customer.save()
+        self.assertIn('σταθοπουλοσ', self.document(SearchDocument.ORDER, self.order.pk).text)
+        self.assertEqual([row['object_id'] for row in self.search(q='Σταθόπουλος', kind='order')], [self.order.pk])
+        self.assertEqual(self.search(q='Παπαδόπουλος'), [])
+
+    def test_search_param_on_viewsets(self):
+        cases = [
+            ('/api/customers/', 'οικονομου', {self.other.pk}),
+            ('/api/customers/', '2101234567', {self.customer.pk}),
+            ('/api/items/', 'φετα', {self.feta.pk, self.feta_bio.pk}),
+            ('/api/items/', 'γαλακτοκομικα', {self.feta_bio.pk}),
+            ('/api/orders/', 'γιωργ παπαδ', {self.order.pk}),
+        ]
+        for path, query, expected in cases:
+            with self.subTest(path=path, query=query):
+                response = self.client.get(path, {'search': query})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual({row['id'] for row in response.data}, expected)
+
+    def test_kind_limit_and_rank(self):
+        self.assertEqual({row['kind'] for row in self.search(q='φετα', kind='item')}, {SearchDocument.ITEM})
+        self.assertEqual(self.search(q='φετα', kind='customer'), [])
+        self.assertEqual(len(self.search(q='φετα', limit=1)), 1)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'φετα', 'kind': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'φετα', 'limit': 'x'}).status_code, 400)
+
+        # το συντομότερο έγγραφο με τη λέξη προηγείται (bm25)
+        results = self.search(q='φετα')
+        self.assertEqual([row['object_id'] for row in results], [self.feta.pk, self.feta_bio.pk])
+        self.assertGreater(results[0]['rank'], results[1]['rank'])
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name='Κατερίνα', last_name='Μαυρίδη', tax_id='111222333', phone='6944123456')
+        self.item = Item.objects.create(name='Φρέσκο Γάλα', price='1.35')
+        user = User.objects.create_user('autocomplete', password='autocomplete', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def customers(self, q, **params):
+        response = self.client.get('/api/customers/autocomplete/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_customer_prefixes(self):
+        for query in ('κατ', 'Μαυρ', 'κατερινα μαυ', 'μαυριδη κατ', '69441', '111'):
+            with self.subTest(query=query):
+                self.assertEqual(self.customers(query), [{"id": self.customer.pk, "label": 'Κατερίνα Μαυρίδη'}])
+        for query in ('ερινα', '123456', 'κατερινα μαυριδησ', ''):
+            with self.subTest(query=query):
+                self.assertEqual(self.customers(query), [])
+
+    def test_item_shape_and_word_prefix(self):
+        for query in ('φρεσ', 'γαλ'):
+            with self.subTest(query=query):
+                response = self.client.get('/api/items/autocomplete/', {'q': query})
+                self.assertEqual(response.data, [{"id": self.item.pk, "label": 'Φρέσκο Γάλα', "price": Decimal('1.35')}])
+
+    def test_limits(self):
+        for number in range(60):
+            Customer.objects.create(first_name='Αντώνης', last_name=f'Α{number:02}', tax_id=str(number), phone='1')
+        self.assertEqual(len(self.customers('αντων')), 10)
+        self.assertEqual(len(self.customers('αντων', limit=25)), 25)
+        self.assertEqual(len(self.customers('αντων', limit=500)), 50)
+        labels = [row['label'] for row in self.customers('αντων', limit=3)]
+        self.assertEqual(labels, ['Αντώνης Α00', 'Αντώνης Α01', 'Αντώνης Α02'])
+        self.assertEqual(self.client.get('/api/customers/autocomplete/', {'q': 'α', 'limit': 'x'}).status_code, 400)
+
+    def test_terms_follow_renames_and_deletes(self):
+        self.customer.last_name = 'Σταθοπούλου'
+        self.customer.save()
+        self.assertEqual(self.customers('μαυρ'), [])
+        self.assertEqual(self.customers('σταθ'), [{"id": self.customer.pk, "label": 'Κατερίνα Σταθοπούλου'}])
+
+        self.item.name = 'Γιαούρτι'
+        self.item.price = '2.10'
+        self.item.save()
+        response = self.client.get('/api/items/autocomplete/', {'q': 'γιαου'})
+        self.assertEqual(response.data, [{"id": self.item.pk, "label": 'Γιαούρτι', "price": Decimal('2.10')}])
+        self.assertEqual(self.client.get('/api/items/autocomplete/', {'q': 'γαλ'}).data, [])
+
+        self.customer.delete()
+        self.item.delete()
+        self.assertFalse(AutocompleteTerm.objects.exists())
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        customer = Customer.objects.create(first_name='Νίκος', last_name='Ιωάννου', tax_id='1', phone='1')
+        order = Order.objects.create(customer=customer)
+        days = [datetime.date(2025, 5, day) for day in (1, 1, 1, 2, 2, 3)]
+        for number in range(27):
+            payment = Payment.objects.create(order=order, amount='1.00')
+            # πολλές πληρωμές με την ίδια ημερομηνία: η σειρά κρίνεται από το id
+            Payment.objects.filter(pk=payment.pk).update(date=days[number % len(days)])
+        self.expected = list(Payment.objects.order_by('-date', '-id').values_list('pk', flat=True))
+        user = User.objects.create_user('pages', password='pages', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def walk(self, path, page_size):
+        ids, params, pages = [], {'page_size': page_size}, 0
+        while True:
+            response = self.client.get(path, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), page_size)
+            ids += [row['id'] for row in response.data['results']]
+            pages += 1
+            if not response.data['next']:
+                return ids, pages
+            cursor = parse_qs(urlsplit(response.data['next']).query)['cursor'][0]
+            params = {'page_size': page_size, 'cursor': cursor}
+
+    def test_walk_every_page(self):
+        for page_size in (1, 4, 5, 27, 100):
+            with self.subTest(page_size=page_size):
+                ids, pages = self.walk('/api/payments/', page_size)
+                self.assertEqual(ids, self.expected)
+                self.assertEqual(pages, max(-(-len(self.expected) // page_size), 1))
+        customers = list(Customer.objects.order_by('-id').values_list('pk', flat=True))
+        self.assertEqual(self.walk('/api/customers/', 1)[0], customers)
+
+    def test_invalid_cursor(self):
+        wrong_length = base64.urlsafe_b64encode(json.dumps(['2025-05-01']).encode()).decode()
+        bad_date = base64.urlsafe_b64encode(json.dumps(['x', '1']).encode()).decode()
+        for cursor in ('garbage', wrong_length, bad_date):
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/payments/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+    @override_settings(API_MAX_PAGE_SIZE=5)
+    def test_page_size_is_capped(self):
+        response = self.client.get('/api/payments/', {'page_size': 50})
+        self.assertEqual([row['id'] for row in response.data['results']], self.expected[:5])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_opt_in(self):
+        with override_settings(API_PAGINATION_OPT_IN=True):
+            # χωρίς cursor/page_size όλη η λίστα, με τη σειρά του queryset όπως πριν
+            response = self.client.get('/api/payments/')
+            self.assertEqual(sorted(row['id'] for row in response.data), sorted(self.expected))
+        with override_settings(API_PAGINATION_OPT_IN=False):
+            response = self.client.get('/api/payments/')
+            self.assertEqual([row['id'] for row in response.data['results']], self.expected)
+            self.assertIsNone(response.data['next'])
+            with mock.patch('orders.pagination.api_settings.PAGE_SIZE', 10):
+                response = self.client.get('/api/payments/')
+            self.assertEqual([row['id'] for row in response.data['results']], self.expected[:10])
+            self.assertIsNotNone(response.data['next'])
+
+
+class SparseFieldsTests(TestCase):
+    LIST_KEYS = {'id', 'customer', 'customer_name', 'date', 'total_amount', 'paid_amount', 'remaining_amount', 'is_paid'}
+
+    def setUp(self):
+        generate(**SIZES[0])
+        user = User.objects.create_user('fields', password='fields', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def get(self, path, queries, **params):
+        with self.assertNumQueries(queries), CaptureQueriesContext(connection) as captured:
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data, captured[0]['sql']
+
+    def test_order_list_shapes(self):
+        rows, sql = self.get('/api/orders/', 1)
+        self.assertEqual(set(rows[0]), self.LIST_KEYS)
+        self.assertIn('"orders_customer"', sql)
+
+        rows, sql = self.get('/api/orders/', 1, fields='id,total_amount')
+        self.assertEqual(set(rows[0]), {'id', 'total_amount'})
+        self.assertNotIn('"orders_customer"', sql)
+        # μόνο οι στήλες των πεδίων, συν date για τη σελιδοποίηση
+        self.assertNotIn('"orders_order"."paid"', sql)
+        self.assertIn('"orders_order"."total"', sql)
+        self.assertIn('"orders_order"."date"', sql)
+
+        rows, sql = self.get('/api/orders/', 1, fields='id,customer_name')
+        self.assertEqual(set(rows[0]), {'id', 'customer_name'})
+        self.assertIn('"orders_customer"."last_name"', sql)
+        self.assertNotIn('"orders_customer"."email"', sql)
+
+        rows, _ = self.get('/api/orders/', 1, expand='customer')
+        self.assertEqual(set(rows[0]), self.LIST_KEYS)
+        self.assertEqual(rows[0]['customer']['id'], Order.objects.get(pk=rows[0]['id']).customer_id)
+        self.assertIn('tax_id', rows[0]['customer'])
+
+        rows, _ = self.get('/api/orders/', 3, expand='items,payments')
+        self.assertEqual(set(rows[0]), self.LIST_KEYS | {'items', 'payments'})
+        order = Order.objects.get(pk=rows[0]['id'])
+        self.assertEqual(len(rows[0]['items']), order.items.count())
+        self.assertEqual(len(rows[0]['payments']), order.payments.count())
+
+        rows, _ = self.get('/api/orders/', 3, fields='id', expand='items,payments')
+        self.assertEqual(set(rows[0]), {'id', 'items', 'payments'})
+
+    def test_fields_on_other_serializers(self):
+        cases = [
+            ('/api/payments/', Payment, 'id,amount,customer_name', {'id', 'amount', 'customer_name'}),
+            ('/api/customers/', Customer, 'id,last_name', {'id', 'last_name'}),
+            ('/api/items/', Item, 'name,price', {'name', 'price'}),
+        ]
+        for path, model, fields, keys in cases:
+            with self.subTest(path=path):
+                response = self.client.get(path, {'fields': fields})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual({frozenset(row) for row in response.data}, {frozenset(keys)})
+                detail = self.client.get(f'{path}{model.objects.first().pk}/', {'fields': fields})
+                self.assertEqual(set(detail.data), keys)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SalesSeriesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        customer = Customer.objects.create(first_name='Σοφία', last_name='Γεωργίου', tax_id='1', phone='1')
+        item = Item.objects.create(name='Καφές', price='2.50')
+        day = datetime.date
+        # (ημερομηνία, ποσότητα) -> σύνολο 2.50 * ποσότητα
+        self.orders = [(day(2025, 3, 3), 4), (day(2025, 3, 5), 1), (day(2025, 3, 5), 3),
+                       (day(2025, 3, 12), 10), (day(2025, 4, 2), 7), (day(2025, 4, 30), 2)]
+        # η πληρωμή της 20/3 πέφτει σε ημέρα και εβδομάδα χωρίς παραγγελίες
+        self.payments = [(day(2025, 3, 5), '5.00'), (day(2025, 3, 20), '12.50'), (day(2025, 5, 1), '1.00')]
+        created = []
+        for date, quantity in self.orders:
+            order = Order.objects.create(customer=customer)
+            OrderItem.objects.create(order=order, item=item, quantity=quantity)
+            Order.objects.filter(pk=order.pk).update(date=date)
+            created.append(order)
+        for date, amount in self.payments:
+            payment = Payment.objects.create(order=created[0], amount=amount)
+            Payment.objects.filter(pk=payment.pk).update(date=date)
+        user = User.objects.create_user('series', password='series', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def expected(self, period_of, since, until):
+        series = {}
+        for date, quantity in self.orders:
+            if since <= date <= until:
+                entry = series.setdefault(period_of(date), {'totals': [], 'payments': Decimal('0')})
+                entry['totals'].append(Decimal('2.50') * quantity)
+        for date, amount in self.payments:
+            if since <= date <= until:
+                series.setdefault(period_of(date), {'totals': [], 'payments': Decimal('0')})['payments'] += Decimal(amount)
+        return [{
+            "period": period,
+            "sales": sum(entry['totals'], Decimal('0')),
+            "orders": len(entry['totals']),
+            "average_order": (sum(entry['totals']) / len(entry['totals'])).quantize(Decimal('0.01'))
+            if entry['totals'] else Decimal('0'),
+            "payments": entry['payments'],
+        } for period, entry in sorted(series.items())]
+
+    def test_buckets(self):
+        since, until = datetime.date(2025, 3, 1), datetime.date(2025, 4, 30)
+        buckets = {
+            'day': lambda date: date,
+            'week': lambda date: date - datetime.timedelta(days=date.weekday()),
+            'month': lambda date: date.replace(day=1),
+        }
+        for bucket, period_of in buckets.items():
+            with self.subTest(bucket=bucket):
+                response = self.client.get('/api/dashboard/stats/', {'from': since, 'to': until, 'bucket': bucket})
+                self.assertEqual(response.status_code, 200)
+                series = [{**row, "average_order": Decimal(str(row['average_order']))} for row in response.data['series']]
+                self.assertEqual(series, self.expected(period_of, since, until))
+
+        response = self.client.get('/api/dashboard/stats/', {'from': since, 'to': until, 'bucket': 'day'})
+        payment_only = [row for row in response.data['series'] if row['period'] == datetime.date(2025, 3, 20)]
+        self.assertEqual(payment_only[0]['orders'], 0)
+        self.assertEqual(payment_only[0]['payments'], Decimal('12.50'))
+
+    def test_invalid_parameters(self):
+        for params in ({'bucket': 'year'}, {'from': '2025-13-01'}, {'to': 'x'},
+                       {'from': '2025-05-01', 'to': '2025-04-01'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/dashboard/stats/', params).status_code, 400)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class DashboardSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        generate(**SIZES[1])
+        user = User.objects.create_user('snapshot', password='snapshot', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def money(self, value):
+        return Decimal(str(value)).quantize(Decimal('0.01'))
+
+    def test_figures(self):
+        today = datetime.date.today()
+        orders = list(Order.objects.select_related('customer'))
+        lines = list(OrderItem.objects.select_related('order', 'item'))
+        payments = [payment for payment in Payment.objects.all() if payment.date == today]
+        todays = [order for order in orders if order.date == today]
+        unpaid = [order for order in orders if not order.is_paid]
+        self.assertTrue(todays and unpaid and payments)
+
+        data = self.client.get('/api/dashboard/snapshot/').data
+        self.assertEqual(data['today']['orders'], len(todays))
+        self.assertEqual(self.money(data['today']['sales']), self.money(sum(order.total for order in todays)))
+        self.assertEqual(data['today']['payments'], len(payments))
+        self.assertEqual(self.money(data['today']['payments_total']), self.money(sum(p.amount for p in payments)))
+
+        day_items = {}
+        for line in lines:
+            if line.order.date == today:
+                quantity, total = day_items.get(line.item.name, (0, Decimal('0')))
+                day_items[line.item.name] = (quantity + line.quantity, total + line.line_total)
+        self.assertEqual({row['name']: (row['quantity'], self.money(row['total'])) for row in data['today']['items']},
+                         {name: (quantity, self.money(total)) for name, (quantity, total) in day_items.items()})
+
+        self.assertEqual(data['unpaid']['orders'], len(unpaid))
+        self.assertEqual(self.money(data['unpaid']['amount']), self.money(sum(order.remaining for order in unpaid)))
+        recent = sorted(unpaid, key=lambda order: (order.date, order.pk), reverse=True)[:5]
+        self.assertEqual([row['id'] for row in data['unpaid']['recent']], [order.pk for order in recent])
+        self.assertEqual(data['unpaid']['recent'][0]['customer'], str(recent[0].customer))
+
+        sold = {}
+        for line in lines:
+            sold[line.item.name] = sold.get(line.item.name, 0) + line.quantity
+        top = sorted(sold.items(), key=lambda pair: (-pair[1], pair[0]))[:5]
+        self.assertEqual([(row['name'], row['sold']) for row in data['top_items']], top)
+
+        debts = {}
+        for order in orders:
+            debts[order.customer_id] = debts.get(order.customer_id, Decimal('0')) + order.remaining
+        debtors = sorted(((debt, pk) for pk, debt in debts.items() if debt > 0), key=lambda pair: (-pair[0], pair[1]))[:5]
+        self.assertEqual([self.money(row['debt']) for row in data['top_debtors']],
+                         [self.money(debt) for debt, _ in debtors])
+        self.assertEqual([row['customer'] for row in data['top_debtors']],
+                         [str(Customer.objects.get(pk=pk)) for _, pk in debtors])
+
+    def test_query_count_and_not_modified(self):
+        with self.assertNumQueries(6):
+            response = self.client.get('/api/dashboard/snapshot/')
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/dashboard/snapshot/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.create(order=Order.objects.first(), amount='1.00')
+        self.assertEqual(self.client.get('/api/dashboard/snapshot/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
@@ -3,7 +3,8 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (CustomerViewSet, DashboardViewSet, ItemViewSet,
                     OrderItemViewSet, OrderViewSet, PaymentViewSet,
-                    change_password, register_user)
+                    ReportJobViewSet, batch, change_password, global_search,
+                    logout, register_user, rotate_token)
 
 router = DefaultRouter()
 router.register(r'customers', CustomerViewSet)
@@ -11,10 +12,15 @@ router.register(r'items', ItemViewSet)
 router.register(r'orders', OrderViewSet)
 router.register(r'order-items', OrderItemViewSet)
 router.register(r'payments', PaymentViewSet)
+router.register(r'reports', ReportJobViewSet)
 router.register(r'dashboard', DashboardViewSet, basename='dashboard')  # 🔹 ΠΡΟΣΟΧΗ σε αυτό!
 
 urlpatterns = [
     path('', include(router.urls)),
     path('change-password/', change_password),
     path('register/', register_user),
+    path('logout/', logout),
+    path('token/rotate/', rotate_token),
+    path('search/', global_search),
+    path('batch/', batch, name='batch'),
 ]
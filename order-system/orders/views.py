@@ -1,26 +1,90 @@
 import datetime
 import tempfile
-from io import BytesIO
 
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.http import HttpResponse
+from django.db.models import Prefetch, Sum
+from django.http import FileResponse, HttpResponse
 from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
 from django_filters.rest_framework import DjangoFilterBackend
 from openpyxl import Workbook
-from reportlab.pdfgen import canvas
 from rest_framework import filters, status, viewsets
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.viewsets import ViewSet
 
-from .models import Customer, Item, Order, OrderItem, Payment
+from .authentication import STATS_NAME as AUTH_STATS_NAME
+from .autocomplete import autocomplete
+from .batch import BatchError, parse_batch, run_batch
+from .budgets import query_budget
+from .bulk import create_orders
+from .cache import (cache_stats, cached_data, cached_response, month_topic,
+                    response_etag)
+from .conditional import ConditionalGetMixin, ConditionalRetrieveMixin
+from .debts import customer_debts, customer_name
+from .exports import EXPORT_CHUNK_SIZE, stream_xlsx
+from .filters import IndexedSearchFilter, OrderFilterSet, PaymentFilterSet
+from .imports import ImportFormatError, import_payments, read_rows
+from .models import (Customer, DailyItemSales, Item, Order, OrderItem,
+                     Payment, ReportJob, SearchDocument)
+from .pagination import DateKeysetPagination
+from .reports import report_params, submit_report
+from .search import search
 from .serializers import (CustomerSerializer, ItemSerializer,
                           OrderItemCreateSerializer, OrderItemSerializer,
-                          OrderSerializer, PaymentSerializer)
+                          OrderListSerializer, OrderSerializer,
+                          PaymentSerializer, ReportJobSerializer,
+                          query_param_set)
+from .statements import customer_statement
+from .stats import (BUCKETS, dashboard_snapshot, item_sales, sales_report,
+                    sales_series)
+
+
+def date_range(request, default=None):
+    # ?from=YYYY-MM-DD&to=YYYY-MM-DD, και τα δύο προαιρετικά (ValueError σε λάθος μορφή)
+    bounds = []
+    for name in ('from', 'to'):
+        value = request.query_params.get(name)
+        bounds.append(datetime.datetime.strptime(value, "%Y-%m-%d").date() if value else default)
+    return bounds
+
+
+def sales_in_range(since=None, until=None):
+    sales = DailyItemSales.objects.all()
+    if since:
+        sales = sales.filter(date__gte=since)
+    if until:
+        sales = sales.filter(date__lte=until)
+    return sales
+
+
+def autocomplete_response(request, kind, with_price=False):
+    # ?q=πρόθεμα&limit=10 -> [{id, label(, price)}]
+    try:
+        limit = max(int(request.query_params.get('limit', 10)), 1)
+    except ValueError:
+        return Response({"error": "Μη έγκυρο limit"}, status=400)
+    rows = autocomplete(kind, request.query_params.get('q', ''), limit)
+    return Response([{
+        "id": row['object_id'],
+        "label": row['label'],
+        **({"price": row['price']} if with_price else {}),
+    } for row in rows])
+
+
+def queue_report(request, kind, params=None):
+    # Οι αναφορές PDF παράγονται από τον worker (manage.py run_report_worker)
+    job, _ = submit_report(kind, params, request.user)
+    serializer = ReportJobSerializer(job, context={'request': request})
+    return Response(serializer.data, status=200 if job.status == ReportJob.DONE else 202)
 
 
 @permission_classes([AllowAny])
@@ -37,25 +101,28 @@ class CustomAuthToken(ObtainAuthToken):
 
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    filter_backends = [IndexedSearchFilter, DjangoFilterBackend]
     search_fields = ['first_name', 'last_name', 'phone', 'tax_id']
+    search_kind = SearchDocument.CUSTOMER
     filterset_fields = ['first_name', 'last_name', 'phone', 'tax_id']
+    query_budgets = {'list': 3, 'retrieve': 3}
 
     @action(detail=True, methods=['get'])
+    @query_budget(3)
     def debt(self, request, pk=None):
         try:
             customer = Customer.objects.get(pk=pk)
         except Customer.DoesNotExist:
             return Response({"error": "Ο πελάτης δεν βρέθηκε"}, status=404)
 
-        orders = Order.objects.filter(customer=customer)
-        total_orders = sum(order.total_amount() for order in orders)
-        payments = Payment.objects.filter(order__customer=customer)
-        total_paid = sum(payment.amount for payment in payments)
-        remaining = total_orders - total_paid
+        totals = Order.objects.filter(customer=customer).aggregate(
+            total=Sum('total'), paid=Sum('paid'), remaining=Sum('remaining'))
+        total_orders = totals['total'] or 0
+        total_paid = totals['paid'] or 0
+        remaining = totals['remaining'] or 0
 
         return Response({
             "customer": f"{customer.first_name} {customer.last_name}",
@@ -63,33 +130,38 @@ class CustomerViewSet(viewsets.ModelViewSet):
             "total_paid": total_paid,
             "debt": remaining
         })
+
+    @action(detail=False, methods=['get'])
+    @query_budget(2)
+    def autocomplete(self, request):
+        return autocomplete_response(request, SearchDocument.CUSTOMER)
+
+    @action(detail=True, methods=['get'])
+    @query_budget(3)
+    def statement(self, request, pk=None):
+        # Καρτέλα πελάτη: ?page=&page_size= (οι γραμμές είναι σε χρονολογική σειρά)
+        customer = self.get_object()
+        try:
+            page = int(request.query_params.get('page', 1))
+            page_size = int(request.query_params.get('page_size', api_settings.PAGE_SIZE))
+        except ValueError:
+            return Response({"error": "Μη έγκυρη σελίδα"}, status=400)
+        if page < 1 or page_size < 1:
+            return Response({"error": "Μη έγκυρη σελίδα"}, status=400)
+
+        data = customer_statement(customer.pk, page, min(page_size, settings.API_MAX_PAGE_SIZE))
+        if page > 1 and not data['results']:
+            raise NotFound("Μη έγκυρη σελίδα")
+        return Response({
+            "customer": f"{customer.first_name} {customer.last_name}",
+            **data,
+        })
     
 
     @action(detail=False, methods=['get'])
+    @query_budget(4)
     def export_pdf(self, request):
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=A4)
-
-        y = 800
-        p.setFont("Helvetica-Bold", 14)
-        p.drawString(100, y, "Λίστα Πελατών")
-        y -= 40
-
-        p.setFont("Helvetica", 10)
-        customers = Customer.objects.all()
-
-        for c in customers:
-            if y < 50:
-                p.showPage()
-                y = 800
-            p.drawString(50, y, f"ID: {c.id} | {c.first_name} {c.last_name}")
-            y -= 15
-            p.drawString(70, y, f"ΑΦΜ: {c.tax_id} | Τηλ: {c.phone} | Email: {c.email or '—'}")
-            y -= 25
-
-        p.save()
-        buffer.seek(0)
-        return HttpResponse(buffer, content_type='application/pdf')
+        return queue_report(request, 'customers_pdf')
     
 
 
@@ -104,60 +176,150 @@ class CustomerViewSet(viewsets.ModelViewSet):
 
 
 
-class ItemViewSet(viewsets.ModelViewSet):
+class ItemViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Item.objects.all()
     serializer_class = ItemSerializer
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    filter_backends = [IndexedSearchFilter, DjangoFilterBackend]
     search_fields = ['name', 'description']
+    search_kind = SearchDocument.ITEM
     filterset_fields = ['name']
+    query_budgets = {'list': 3, 'retrieve': 3}
+
+    @action(detail=False, methods=['get'])
+    @query_budget(2)
+    def autocomplete(self, request):
+        return autocomplete_response(request, SearchDocument.ITEM, with_price=True)
 
     @action(detail=False, methods=['get'])
+    @query_budget(2)
+    @cached_response('items.top_selling', ('orders', 'items'))
     def top_selling(self, request):
-        stats = {}
-        for oi in OrderItem.objects.all():
-            name = oi.item.name
-            stats[name] = stats.get(name, 0) + oi.quantity
-        top = sorted(stats.items(), key=lambda x: x[1], reverse=True)[:5]
-        return Response({k: v for k, v in top})
+        try:
+            since, until = date_range(request)
+        except ValueError:
+            return Response({"error": "Λάθος μορφή ημερομηνίας"}, status=400)
+        top = (
+            sales_in_range(since, until).values('item__name')
+            .annotate(sold=Sum('quantity'))
+            .order_by('-sold', 'item__name')[:5]
+        )
+        return Response({row['item__name']: row['sold'] for row in top})
 
     @action(detail=False, methods=['get'])
+    @query_budget(2)
     def sold_by_date(self, request):
         date_str = request.query_params.get('date')
-        if not date_str:
-            return Response({"error": "Δώσε ημερομηνία με ?date=YYYY-MM-DD"}, status=400)
+        if not date_str and not ('from' in request.query_params or 'to' in request.query_params):
+            return Response({"error": "Δώσε ημερομηνία με ?date=YYYY-MM-DD ή διάστημα με ?from=&to="}, status=400)
         try:
-            date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
-        except:
+            if date_str:
+                since = until = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+            else:
+                since, until = date_range(request)
+        except ValueError:
             return Response({"error": "Λάθος μορφή ημερομηνίας"}, status=400)
 
-        items_today = OrderItem.objects.filter(order__date=date_obj)
-        result = {}
-        for item in items_today:
-            name = item.item.name
-            result[name] = result.get(name, 0) + item.quantity
-        return Response(result)
+        rows = sales_in_range(since, until).values('item__name').annotate(sold=Sum('quantity')).order_by('item__name')
+        return Response({row['item__name']: row['sold'] for row in rows})
 
 
 
 
 
 
-class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.all()
+class OrderViewSet(ConditionalRetrieveMixin, viewsets.ModelViewSet):
+    queryset = Order.objects.with_balances()
     serializer_class = OrderSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    filterset_fields = ['customer', 'date']
+    pagination_class = DateKeysetPagination
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter]
+    filterset_class = OrderFilterSet
     search_fields = ['customer__first_name', 'customer__last_name']
+    search_kind = SearchDocument.ORDER
+    query_budgets = {'list': 4, 'retrieve': 5}
+    # η λεπτομέρεια περιέχει και τον πελάτη και τα ονόματα των ειδών
+    conditional_markers = ('updated_at', 'customer__updated_at', 'items__item__updated_at')
+
+    # στήλες που χρειάζεται κάθε πεδίο του OrderListSerializer (για ?fields=)
+    list_columns = {
+        'id': ('id',),
+        'customer': ('customer',),
+        'customer_name': ('customer__first_name', 'customer__last_name'),
+        'date': ('date',),
+        'total_amount': ('total',),
+        'paid_amount': ('paid',),
+        'remaining_amount': ('remaining',),
+        'is_paid': ('is_paid',),
+    }
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return OrderListSerializer
+        return OrderSerializer
+
+    def get_queryset(self):
+        if self.action != 'list':
+            return super().get_queryset()
+
+        fields = query_param_set(self.request, 'fields')
+        expand = query_param_set(self.request, 'expand')
+        queryset = Order.objects.all()
+
+        # και οι nested πληρωμές δείχνουν το όνομα του πελάτη (μέσω της prefetched παραγγελίας)
+        if not fields or 'customer_name' in fields or expand & {'customer', 'payments'}:
+            queryset = queryset.select_related('customer')
+        if 'items' in expand:
+            queryset = queryset.prefetch_related(
+                Prefetch('items', queryset=OrderItem.objects.select_related('item')))
+        if 'payments' in expand:
+            queryset = queryset.prefetch_related('payments')
+
+        if fields:
+            # id/date χρειάζονται πάντα για τη σελιδοποίηση
+            columns = {'id', 'date'}
+            for name in fields:
+                columns.update(self.list_columns.get(name, ()))
+            if 'customer' in expand:
+                columns.update(f'customer__{f.name}' for f in Customer._meta.concrete_fields)
+            if 'payments' in expand:
+                columns.update(self.list_columns['customer_name'])
+            queryset = queryset.only(*columns)
+        return queryset
     
 
     @action(detail=False, methods=['get'])
+    @query_budget(4)
+    @cached_response('orders.today', ('orders', 'payments', 'customers', 'items'))
     def today(self, request):
         today_date = datetime.date.today()
-        todays_orders = Order.objects.filter(date=today_date)
+        todays_orders = self.get_queryset().filter(date=today_date)
         serializer = self.get_serializer(todays_orders, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        # Δέχεται λίστα παραγγελιών (ή {"orders": [...]}) και επιστρέφει αποτέλεσμα ανά παραγγελία
+        payload = request.data.get('orders') if isinstance(request.data, dict) else request.data
+        if not isinstance(payload, list) or not payload:
+            return Response({"error": "Δώσε λίστα παραγγελιών"}, status=400)
+        if len(payload) > settings.BULK_ORDERS_MAX:
+            return Response({"error": f"Έως {settings.BULK_ORDERS_MAX} παραγγελίες ανά αίτημα"}, status=400)
+
+        results = create_orders(payload)
+        created = sum(1 for result in results if 'id' in result)
+        if created == len(results):
+            response_status = 201
+        elif created == 0:
+            response_status = 400
+        else:
+            response_status = 200
+        return Response({
+            "created": created,
+            "failed": len(results) - created,
+            "results": results
+        }, status=response_status)
+
     @action(detail=True, methods=['get'])
+    @query_budget(5)
     def summary(self, request, pk=None):
         try:
             order = Order.objects.get(pk=pk)
@@ -167,8 +329,9 @@ class OrderViewSet(viewsets.ModelViewSet):
         items_data = [{
             "item": i.item.name,
             "quantity": i.quantity,
-            "price": i.price
-        } for i in order.items.all()]
+            "price": i.unit_price,
+            "total": i.line_total
+        } for i in order.items.select_related('item')]
 
         payments_data = [{
             "amount": p.amount,
@@ -182,42 +345,21 @@ class OrderViewSet(viewsets.ModelViewSet):
             "total_amount": order.total_amount(),
             "paid_amount": order.paid_amount(),
             "remaining_amount": order.remaining_amount(),
-            "is_paid": order.is_paid(),
+            "is_paid": order.is_paid,
             "items": items_data,
             "payments": payments_data
         })
 
 
     @action(detail=False, methods=['get'])
+    @query_budget(4)
     def export_pdf(self, request):
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=A4)
-
-        y = 800
-        p.setFont("Helvetica-Bold", 14)
-        p.drawString(100, y, "Λίστα Παραγγελιών")
-        y -= 40
-
-        p.setFont("Helvetica", 10)
-        orders = Order.objects.all().select_related("customer")
-
-        for order in orders:
-            if y < 50:
-                p.showPage()
-                y = 800
-            p.drawString(50, y, f"ID: {order.id} | Ημερομηνία: {order.date} | Πελάτης: {order.customer.first_name} {order.customer.last_name}")
-            y -= 15
-            p.drawString(70, y, f"Ποσό: {order.total_amount()} €  |  Πληρωμένο: {order.paid_amount()} €  | Υπόλοιπο: {order.remaining_amount()} €")
-            y -= 25
-
-        p.save()
-        buffer.seek(0)
- 
-        return HttpResponse(buffer, content_type='application/pdf')
+        return queue_report(request, 'orders_pdf')
     
 
 
     @action(detail=False, methods=['get'])
+    @query_budget(4)
     def by_date(self,request):
         date_str = request.query_params.get('date')
         if not date_str:
@@ -226,13 +368,14 @@ class OrderViewSet(viewsets.ModelViewSet):
             date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
         except ValueError:
             return Response({"error": "Λάθος μορφή ημερομηνίας"}, status=400)   
-        orders_today = Order.objects.filter(date=date_obj)
+        orders_today = self.get_queryset().filter(date=date_obj)
         serializer= self.get_serializer(orders_today, many=True)
         return Response(serializer.data)
     
 
 
     @action(detail=False, methods=['get'])
+    @query_budget(4)
     def by_month(self, request):
         month = request.query_params.get('month')  # π.χ. ?month=2025-07
         if not month:
@@ -243,7 +386,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         except:
             return Response({"error": "Λάθος μορφή μήνα"}, status=400)
 
-        orders = Order.objects.filter(date__year=year, date__month=month)
+        orders = self.get_queryset().filter(date__year=year, date__month=month)
         serializer = self.get_serializer(orders, many=True)
         return Response(serializer.data)
 
@@ -256,9 +399,10 @@ class OrderViewSet(viewsets.ModelViewSet):
 
 
 class OrderItemViewSet(viewsets.ModelViewSet):
-    queryset = OrderItem.objects.all()
+    queryset = OrderItem.objects.select_related('item')
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['order', 'item', 'order__date']
+    query_budgets = {'list': 2, 'retrieve': 2}
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -271,45 +415,39 @@ class OrderItemViewSet(viewsets.ModelViewSet):
 
 
 class PaymentViewSet(viewsets.ModelViewSet):
-    queryset = Payment.objects.all()
+    queryset = Payment.objects.select_related('order__customer')
     serializer_class = PaymentSerializer
+    pagination_class = DateKeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    filterset_fields = ['date', 'amount', 'order']
+    filterset_class = PaymentFilterSet
+    query_budgets = {'list': 2, 'retrieve': 2}
 
     @action(detail=False, methods=['get'])
+    @query_budget(2)
     def today(self, request):
         today = datetime.date.today()
-        todays_payments = Payment.objects.filter(date=today)
+        todays_payments = self.get_queryset().filter(date=today)
         serializer = self.get_serializer(todays_payments, many=True)
         return Response(serializer.data)
     
 
 
     @action(detail=False, methods=['get'])
+    @query_budget(4)
     def export_pdf(self, request):
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=A4)
-
-        y = 800
-        p.setFont("Helvetica-Bold", 14)
-        p.drawString(100, y, "Λίστα Πληρωμών")
-        y -= 40
-
-        p.setFont("Helvetica", 10)
-        payments = Payment.objects.all().select_related("order")
-
-        for pay in payments:
-            if y < 50:
-                p.showPage()
-                y = 800
-            p.drawString(50, y, f"ID: {pay.id} | Ημερομηνία: {pay.date}")
-            y -= 15
-            p.drawString(70, y, f"Ποσό: {pay.amount} € | Παραγγελία #{pay.order.id}")
-            y -= 25
-
-        p.save()
-        buffer.seek(0)
-        return HttpResponse(buffer, content_type='application/pdf')
+        return queue_report(request, 'payments_pdf')
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        # Αρχείο CSV/XLSX με στήλες order, amount (και προαιρετικά notes)
+        uploaded = request.FILES.get('file')
+        if not uploaded:
+            return Response({"error": "Ανέβασε αρχείο στο πεδίο file"}, status=400)
+        try:
+            report = import_payments(read_rows(uploaded))
+        except (ImportFormatError, UnicodeDecodeError) as exc:
+            return Response({"error": str(exc)}, status=400)
+        return Response(report)
 
     
 
@@ -318,47 +456,89 @@ class PaymentViewSet(viewsets.ModelViewSet):
 
 
 
-    
-
 
+    
 class DashboardViewSet(viewsets.ViewSet):
+    cached_endpoints = [
+        'dashboard.daily_sales',
+        'dashboard.daily_payments',
+        'dashboard.top_debtors',
+        'dashboard.stats',
+        'dashboard.sales_report',
+        'dashboard.snapshot',
+        'items.top_selling',
+        'orders.today',
+    ]
 
+    @query_budget(1)
     def list(self, request):
         return Response({
             "daily_sales": request.build_absolute_uri('daily_sales/'),
             "daily_payments": request.build_absolute_uri('daily_payments/'),
-            "top_debtors": request.build_absolute_uri('top_debtors/')
+            "top_debtors": request.build_absolute_uri('top_debtors/'),
+            "debtors_all": request.build_absolute_uri('debtors_all/'),
+            "stats": request.build_absolute_uri('stats/'),
+            "snapshot": request.build_absolute_uri('snapshot/'),
         })
 
    
 
     @action(detail=False, methods=['get'])
+    @query_budget(7)
+    def snapshot(self, request):
+        # Όλη η αρχική σελίδα σε ένα request· με If-None-Match επιστρέφει 304 χωρίς queries
+        topics = ('orders', 'payments', 'customers', 'items')
+        etag = response_etag('dashboard.snapshot', topics, request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(cached_data('dashboard.snapshot', topics, request, dashboard_snapshot))
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @action(detail=False, methods=['get'])
+    @query_budget(3)
+    @cached_response('dashboard.daily_sales', ('orders',))
     def daily_sales(self, request):
         today = datetime.date.today()
-        orders = Order.objects.filter(date=today)
-        total = sum(order.total_amount() for order in orders)
-        return Response({
-            "date": today,
-            "total_sales": total,
-            "total_orders": orders.count()
-        })
+        try:
+            since, until = date_range(request, default=today)
+        except ValueError:
+            return Response({"error": "Λάθος μορφή ημερομηνίας"}, status=400)
+        sales = sales_in_range(since, until).aggregate(total=Sum('revenue'))
+        orders = Order.objects.filter(date__gte=since, date__lte=until).count()
+        data = {
+            "total_sales": sales['total'] or 0,
+            "total_orders": orders
+        }
+        if since == until:
+            data = {"date": since, **data}
+        else:
+            data = {"from": since, "to": until, **data}
+        return Response(data)
 
     @action(detail=False, methods=['get'])
+    @query_budget(2)
+    @cached_response('dashboard.top_debtors', ('orders', 'payments', 'customers'))
     def top_debtors(self, request):
-        customers = Customer.objects.all()
-        data = []
-        for c in customers:
-            total = sum(o.total_amount() for o in c.orders.all())
-            paid = sum(o.paid_amount() for o in c.orders.all())
-            if total - paid > 0:
-                data.append({
-                    "customer": f"{c.first_name} {c.last_name}",
-                    "debt": total - paid
-                })
-        data.sort(key=lambda x: x["debt"], reverse=True)
-        return Response(data[:5])
+        data = [{
+            "customer": customer_name(row),
+            "debt": row['debt']
+        } for row in customer_debts(limit=5)]
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    @query_budget(2)
+    def debtors_all(self, request):
+        data = [{
+            "customer": customer_name(row),
+            "debt": round(row['debt'], 2)
+        } for row in customer_debts()]
+        return Response(data)
 
     @action(detail=False, methods=['get'])
+    @query_budget(2)
+    @cached_response('dashboard.daily_payments', ('payments',))
     def daily_payments(self, request):
         today = datetime.date.today()
         payments = Payment.objects.filter(date=today)
@@ -370,81 +550,56 @@ class DashboardViewSet(viewsets.ViewSet):
         })
 
     @action(detail=False, methods=['get'])
+    @query_budget(2)
     def export_excel(self, request):
-        orders = Order.objects.all().select_related('customer')
-    
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Orders"
-
-        ws.append([
-        "ID", "Ημερομηνία", "Πελάτης", "Συνολικό Ποσό", "Πληρωμένο Ποσό", "Υπόλοιπο", "Εξοφλημένη"
-        ])
-
-        for order in orders:
-            ws.append([
-                order.id,
-                str(order.date),
-                f"{order.customer.first_name} {order.customer.last_name}",
-                float(order.total_amount()),
-                float(order.paid_amount()),
-                float(order.remaining_amount()),
-                "ΝΑΙ" if order.is_paid() else "ΟΧΙ"
-            ])
-
-        response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        orders = Order.objects.order_by('id').values_list(
+            'id', 'date', 'customer__first_name', 'customer__last_name',
+            'total', 'paid', 'remaining', 'is_paid'
         )
-        response['Content-Disposition'] = 'attachment; filename=orders.xlsx'
-        wb.save(response)
-        return response
+
+        rows = ([
+            order_id,
+            str(date),
+            f"{first_name} {last_name}",
+            float(total),
+            float(paid),
+            float(remaining),
+            "ΝΑΙ" if is_paid else "ΟΧΙ"
+        ] for order_id, date, first_name, last_name, total, paid, remaining, is_paid
+            in orders.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+
+        return stream_xlsx('orders.xlsx', "Orders", [
+            "ID", "Ημερομηνία", "Πελάτης", "Συνολικό Ποσό", "Πληρωμένο Ποσό", "Υπόλοιπο", "Εξοφλημένη"
+        ], rows)
     
 
 
 
     @action(detail=False, methods=['get'])
+    @query_budget(2)
     def export_payments_excel(self, request):
-        payments = Payment.objects.all().select_related('order')
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Payments"
+        payments = Payment.objects.order_by('id').values_list('id', 'amount', 'date', 'order_id')
 
-        ws.append(["ID", "Ποσό", "Ημερομηνία", "Παραγγελία"])
+        rows = ([
+            payment_id,
+            float(amount),
+            str(date),
+            f"#{order_id}"
+        ] for payment_id, amount, date, order_id in payments.iterator(chunk_size=EXPORT_CHUNK_SIZE))
 
-        for p in payments:
-            ws.append([
-                p.id,
-                float(p.amount),
-                str(p.date),
-                f"#{p.order.id}"
-        ])
-
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-        response['Content-Disposition'] = 'attachment; filename=payments.xlsx'
-        wb.save(response)
-        return response
+        return stream_xlsx('payments.xlsx', "Payments", ["ID", "Ποσό", "Ημερομηνία", "Παραγγελία"], rows)
 
     @action(detail=False, methods=['get'])
+    @query_budget(4)
     def export_summary(self, request):
         today = datetime.date.today()
         orders = Order.objects.filter(date=today)
         payments = Payment.objects.filter(date=today)
-        customers = Customer.objects.all()
 
-        total_sales = sum(order.total_amount() for order in orders)
-        total_payments = sum(p.amount for p in payments)
+        total_sales = orders.aggregate(total=Sum('total'))['total'] or 0
+        total_payments = payments.aggregate(total=Sum('amount'))['total'] or 0
 
-        debtors = []
-        for c in customers:
-            total = sum(o.total_amount() for o in c.orders.all())
-            paid = sum(o.paid_amount() for o in c.orders.all())
-            if total - paid > 0:
-                debtors.append((f"{c.first_name} {c.last_name}", total - paid))
-        debtors.sort(key=lambda x: x[1], reverse=True)
-        top_debtors = debtors[:5]
+        top_debtors = [(customer_name(row), row['debt']) for row in customer_debts(limit=5)]
 
         wb = Workbook()
         ws = wb.active
@@ -472,84 +627,159 @@ class DashboardViewSet(viewsets.ViewSet):
 
 
     @action(detail=False, methods=['get'])
+    @query_budget(4)
     def export_summary_pdf(self, request):
+        try:
+            params = report_params('summary_pdf', {'date': request.query_params.get('date')})
+        except ValueError:
+            return Response({"error": "Λάθος μορφή ημερομηνίας"}, status=400)
+        return queue_report(request, 'summary_pdf', params)
+    
+
+
+    @action(detail=False, methods=['get'])
+    @query_budget(4)
+    @cached_response('dashboard.stats', ('orders', 'payments', 'items'))
+    def stats(self, request):
+        # ?from=&to=&bucket=day|week|month (προεπιλογή: οι τελευταίες 30 ημέρες ανά ημέρα)
         today = datetime.date.today()
-        orders = Order.objects.filter(date=today)
-        payments = Payment.objects.filter(date=today)
-        customers = Customer.objects.all()
-
-        total_sales = sum(order.total_amount() for order in orders)
-        total_payments = sum(p.amount for p in payments)
-
-        # Υπολογισμός top χρεωμένων
-        debtors = []
-        for c in customers:
-            total = sum(o.total_amount() for o in c.orders.all())
-            paid = sum(o.paid_amount() for o in c.orders.all())
-            debt = total - paid
-            if debt > 0:
-                debtors.append((f"{c.first_name} {c.last_name}", debt))
-                debtors.sort(key=lambda x: x[1], reverse=True)
-                top_debtors = debtors[:5]
-
-            # Δημιουργία PDF
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=A4)
-        y = 800
-
-        p.setFont("Helvetica-Bold", 14)
-        p.drawString(100, y, "Ημερήσια Σύνοψη")
-        y -= 40
-
-        p.setFont("Helvetica", 11)
-        p.drawString(50, y, f"Ημερομηνία: {today}")
-        y -= 20
-        p.drawString(50, y, f"Σύνολο Πωλήσεων: {total_sales} €")
-        y -= 20
-        p.drawString(50, y, f"Σύνολο Πληρωμών: {total_payments} €")
-        y -= 40
-
-        p.setFont("Helvetica-Bold", 12)
-        p.drawString(50, y, "Top Χρεωμένοι Πελάτες:")
-        y -= 25
-
-        p.setFont("Helvetica", 10)
-        for name, debt in top_debtors:
-            if y < 50:
-                p.showPage()
-                y = 800
-            p.drawString(70, y, f"{name} - Χρέος: {debt} €")
-            y -= 20
+        try:
+            since, until = date_range(request)
+        except ValueError:
+            return Response({"error": "Λάθος μορφή ημερομηνίας"}, status=400)
+        until = until or today
+        since = since or until - datetime.timedelta(days=29)
+        bucket = request.query_params.get('bucket', 'day')
+        if bucket not in BUCKETS:
+            return Response({"error": "Το bucket πρέπει να είναι day, week ή month"}, status=400)
+        if since > until:
+            return Response({"error": "Η αρχή του διαστήματος είναι μετά το τέλος"}, status=400)
 
-        p.save()
-        buffer.seek(0)
+        return Response({
+            "from": since,
+            "to": until,
+            "bucket": bucket,
+            "series": sales_series(since, until, bucket),
+            "items": [{
+                "name": row['item__name'],
+                "category": row['item__category'] or '',
+                "quantity": row['quantity'],
+                "total": row['total'],
+            } for row in item_sales(since, until)],
+        })
 
-        return HttpResponse(buffer, content_type='application/pdf')
-    
+    @action(detail=False, methods=['get'])
+    @query_budget(3)
+    def sales_report(self, request):
+        # ?date=YYYY-MM-DD ή ?month=YYYY-MM, προαιρετικά &customer=<id>
+        date_str = request.query_params.get('date')
+        month_str = request.query_params.get('month')
+        customer_id = request.query_params.get('customer')
+        since = until = None
+
+        if date_str:
+            try:
+                since = until = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+            except ValueError:
+                return Response({"error": "Λάθος μορφή ημερομηνίας (YYYY-MM-DD)"}, status=400)
+        elif month_str:
+            try:
+                since = datetime.datetime.strptime(month_str, "%Y-%m").date()
+            except ValueError:
+                return Response({"error": "Λάθος μορφή μήνα (YYYY-MM)"}, status=400)
+            next_month = (since + datetime.timedelta(days=32)).replace(day=1)
+            until = next_month - datetime.timedelta(days=1)
+
+        if customer_id and not customer_id.isdigit():
+            return Response({"error": "Μη έγκυρος πελάτης"}, status=400)
+
+        def compute():
+            return sales_report(since, until, customer_id)
+
+        if until and until < datetime.date.today():
+            # Κλειστή περίοδος: αλλάζει μόνο αν διορθωθεί παραγγελία του ίδιου μήνα
+            data = cached_data('dashboard.sales_report', [month_topic(since)], request, compute,
+                               timeout=settings.SALES_REPORT_CLOSED_TIMEOUT, daily=False)
+        else:
+            data = cached_data('dashboard.sales_report', ('orders',), request, compute)
+        return Response(data)
 
+    @action(detail=False, methods=['get'])
+    @query_budget(1)
+    def cache_stats(self, request):
+        return Response(cache_stats(self.cached_endpoints + [AUTH_STATS_NAME]))
 
     @action(detail=False, methods=['get'])
+    @query_budget(2)
     def overdue_debtors(self, request):
         days = int(request.query_params.get('days', 30))
         cutoff = datetime.date.today() - datetime.timedelta(days=days)
 
-        overdue_customers = []
-        for customer in Customer.objects.all():
-            old_orders = customer.orders.filter(date__lte=cutoff)
-            total = sum(o.total_amount() for o in old_orders)
-            paid = sum(o.paid_amount() for o in old_orders)
-            debt = total - paid
-            if debt > 0:
-                overdue_customers.append({
-                  "customer": f"{customer.first_name} {customer.last_name}",
-                  "debt": debt,
-                  "orders_count": old_orders.count()
-               })
+        overdue_customers = [{
+            "customer": customer_name(row),
+            "debt": row['debt'],
+            "orders_count": row['orders_count']
+        } for row in customer_debts(until=cutoff)]
 
         return Response(overdue_customers)
 
 
 
+class ReportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ReportJob.objects.order_by('-created_at')
+    serializer_class = ReportJobSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['kind', 'status']
+    query_budgets = {'list': 2, 'retrieve': 2}
+
+    def create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return queue_report(request, serializer.validated_data['kind'], serializer.validated_data['params'])
+
+    @action(detail=True, methods=['get'])
+    @query_budget(2)
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != ReportJob.DONE or not job.file:
+            return Response({"error": "Η αναφορά δεν είναι ακόμα έτοιμη", "status": job.status}, status=409)
+        return FileResponse(job.file.open('rb'), as_attachment=True,
+                            filename=f"{job.kind}.pdf", content_type='application/pdf')
+
+
+@query_budget(2)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def global_search(request):
+    # ?q=κείμενο&kind=customer,item,order&limit=20
+    query = request.query_params.get('q', '')
+    kinds = [kind for kind in request.query_params.get('kind', '').split(',') if kind]
+    valid_kinds = {kind for kind, _ in SearchDocument.KIND_CHOICES}
+    if set(kinds) - valid_kinds:
+        return Response({"error": f"Το kind πρέπει να είναι ένα από: {', '.join(sorted(valid_kinds))}"}, status=400)
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+    except ValueError:
+        return Response({"error": "Μη έγκυρο limit"}, status=400)
+
+    return Response({
+        "query": query,
+        "results": search(query, kinds, limit),
+    })
+
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def batch(request):
+    # {"requests": [{"id": "order", "path": "orders/5/"}, "payments/?order=5"]} -> ένα request αντί για πολλά
+    try:
+        entries = parse_batch(request.data)
+    except BatchError as exc:
+        return Response({"error": str(exc)}, status=400)
+    return Response({"responses": run_batch(request, entries)})
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def change_password(request):
@@ -561,10 +791,26 @@ def change_password(request):
         return Response({"error": "Λάθος τρέχων κωδικός"}, status=status.HTTP_400_BAD_REQUEST)
 
     user.set_password(new_password)
-    user.save()
+    user.save()  # το signal του User σβήνει και τα cached tokens του
     return Response({"success": "Ο κωδικός άλλαξε επιτυχώς"})
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout(request):
+    # Διαγραφή του token (και της cached εγγραφής του, μέσω signal)
+    Token.objects.filter(user=request.user).delete()
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def rotate_token(request):
+    Token.objects.filter(user=request.user).delete()
+    token = Token.objects.create(user=request.user)
+    return Response({"token": token.key})
+
+
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -599,81 +845,3 @@ def register_user(request):
         "first_name": user.first_name,
         "last_name": user.last_name
     }, status=201)
-
-
-
-@action(detail=False, methods=['get'])
-def debtors_all(self, request):
-    customers = Customer.objects.all()
-    data = []
-
-    for c in customers:
-        total = sum(o.total_amount() for o in c.orders.all())
-        paid = sum(o.paid_amount() for o in c.orders.all())
-        debt = total - paid
-
-        if debt > 0:
-            data.append({
-                "customer": f"{c.first_name} {c.last_name}",
-                "debt": round(debt, 2)
-            })
-
-    data.sort(key=lambda x: x["debt"], reverse=True)
-    return Response(data)
-
-
-
-
-
-
-@action(detail=False, methods=['get'])
-def sales_report(self, request):
-    date_str = request.query_params.get('date')
-    month_str = request.query_params.get('month')
-    customer_id = request.query_params.get('customer')
-
-    orders = Order.objects.all()
-
-    if date_str:
-        try:
-            date = datetime.strptime(date_str, "%Y-%m-%d").date()
-            orders = orders.filter(date=date)
-        except ValueError:
-            return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=400)
-
-    elif month_str:
-        try:
-            month = datetime.strptime(month_str, "%Y-%m").date()
-            orders = orders.filter(date__year=month.year, date__month=month.month)
-        except ValueError:
-            return Response({"error": "Invalid month format. Use YYYY-MM."}, status=400)
-
-    if customer_id:
-        orders = orders.filter(customer_id=customer_id)
-
-    total_sales = 0
-    total_orders = orders.count()
-    items_summary = {}
-
-    for order in orders:
-        total_sales += float(order.total_amount)
-        for order_item in order.items.all():
-            name = order_item.item.name
-            qty = order_item.quantity
-            total = order_item.total_price()
-
-            if name not in items_summary:
-                items_summary[name] = {"quantity": 0, "total": 0}
-            items_summary[name]["quantity"] += qty
-            items_summary[name]["total"] += float(total)
-
-    items_list = [
-        {"name": name, "quantity": data["quantity"], "total": round(data["total"], 2)}
-        for name, data in items_summary.items()
-    ]
-
-    return Response({
-        "total_sales": round(total_sales, 2),
-        "total_orders": total_orders,
-        "items": items_list
-    })
\ No newline at end of file
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 
 
+import tempfile
 from pathlib import Path
 
 from decouple import config
@@ -57,6 +58,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'orders.middleware.QueryInstrumentationMiddleware',
 ]
 
 ROOT_URLCONF = 'ordersystem.urls'
@@ -95,6 +97,63 @@ DATABASES = {
 
 
 
+# Cache
+# Σε παραγωγή Redis (REDIS_URL): ατομικό incr, κοινή cache για όλους τους workers και hosts.
+# Χωρίς REDIS_URL χρησιμοποιείται file-based cache (μόνο για ένα host) ή ό,τι ορίσει το
+# DJANGO_CACHE_BACKEND, π.χ. locmem για tests
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': config('DJANGO_CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+            'LOCATION': config('DJANGO_CACHE_LOCATION', default=str(Path(tempfile.gettempdir()) / 'ordersystem-cache')),
+            # Με το default (300 εγγραφές) το cull πετούσε τυχαία και τα κλειδιά εκδόσεων
+            'OPTIONS': {
+                'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=20000, cast=int),
+                'CULL_FREQUENCY': config('CACHE_CULL_FREQUENCY', default=4, cast=int),
+            },
+        }
+    }
+
+# Διάρκεια (δευτερόλεπτα) των cached απαντήσεων του dashboard
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+# Πόσο κρατιέται στην cache ένα token που έχει επαληθευτεί (0 = χωρίς cache)
+AUTH_TOKEN_CACHE_TTL = config('AUTH_TOKEN_CACHE_TTL', default=60, cast=int)
+# Μετρήσεις ανά request (orders.middleware): Server-Timing και log των αργών requests
+REQUEST_INSTRUMENTATION = config('REQUEST_INSTRUMENTATION', default=True, cast=bool)
+QUERY_CAPTURE_SAMPLE_RATE = config('QUERY_CAPTURE_SAMPLE_RATE', default=0.01, cast=float)
+SLOW_REQUEST_MS = config('SLOW_REQUEST_MS', default=500, cast=int)
+SLOW_REQUEST_QUERIES = config('SLOW_REQUEST_QUERIES', default=50, cast=int)
+SLOW_QUERY_COUNT = config('SLOW_QUERY_COUNT', default=5, cast=int)
+# Έλεγχος των query_budget των views: off, warn (log) ή raise (τα tests το ενεργοποιούν)
+QUERY_BUDGET_MODE = config('QUERY_BUDGET_MODE', default='warn' if DEBUG else 'off')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'orders.performance': {
+            'handlers': ['console'],
+            'level': config('PERFORMANCE_LOG_LEVEL', default='WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# Οι αναφορές πωλήσεων για περιόδους που έχουν κλείσει ακυρώνονται μόνο με αλλαγή στον μήνα τους
+SALES_REPORT_CLOSED_TIMEOUT = config('SALES_REPORT_CLOSED_TIMEOUT', default=7 * 24 * 3600, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -131,6 +190,9 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Αρχεία που παράγονται από την εφαρμογή (π.χ. αναφορές PDF)
+MEDIA_ROOT = config('DJANGO_MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -139,7 +201,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'orders.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -148,8 +210,31 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'orders.pagination.KeysetPagination',
+    'PAGE_SIZE': config('API_PAGE_SIZE', default=50, cast=int),
 }
 
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=500, cast=int)
+# Όσο είναι True, η σελιδοποίηση ενεργοποιείται μόνο όταν ο client στείλει ?page_size= ή ?cursor=
+API_PAGINATION_OPT_IN = config('API_PAGINATION_OPT_IN', default=True, cast=bool)
+# Cache-Control των απαντήσεων με ETag/Last-Modified (πελάτες, είδη, λεπτομέρεια παραγγελίας)
+CONDITIONAL_CACHE_CONTROL = config('CONDITIONAL_CACHE_CONTROL', default='private, no-cache')
+
+
+
+# Μέγιστος αριθμός παραγγελιών ανά αίτημα στο /api/orders/bulk/
+BULK_ORDERS_MAX = config('BULK_ORDERS_MAX', default=5000, cast=int)
+
+# /api/batch/: μέγιστος αριθμός GET ανά batch και threads για παράλληλη εκτέλεση (1 = σειριακά)
+BATCH_MAX_REQUESTS = config('BATCH_MAX_REQUESTS', default=20, cast=int)
+BATCH_WORKERS = config('BATCH_WORKERS', default=4, cast=int)
+
+# Ίδια αναφορά που ολοκληρώθηκε πριν λιγότερο από τόσα δευτερόλεπτα επαναχρησιμοποιείται
+REPORT_FRESHNESS_SECONDS = config('REPORT_FRESHNESS_SECONDS', default=300, cast=int)
+# Αναφορά σε εξέλιξη για περισσότερο από τόσα δευτερόλεπτα θεωρείται ότι ο worker της σταμάτησε:
+# ξαναμπαίνει στην ουρά, έως REPORT_MAX_ATTEMPTS φορές
+REPORT_LEASE_SECONDS = config('REPORT_LEASE_SECONDS', default=900, cast=int)
+REPORT_MAX_ATTEMPTS = config('REPORT_MAX_ATTEMPTS', default=3, cast=int)
 
 
 CORS_ALLOWED_ORIGINS = [